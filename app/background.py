@@ -0,0 +1,173 @@
+# app/background.py
+
+"""
+Efeitos colaterais executados depois da resposta (webhooks, eventos do
+dashboard), em filas nomeadas com prioridade e concorrência limitada.
+
+Cada fila tem um tamanho máximo e um número fixo de workers; dentro de uma
+fila, menor prioridade roda antes (FIFO entre iguais). Fila cheia descarta a
+tarefa em vez de segurar a requisição. As tarefas rodam num contexto limpo:
+não herdam o prazo nem o rastreamento de D1 da requisição que as criou.
+
+O lifespan inicia os workers e, no shutdown, drena o que já foi enfileirado
+por até BACKGROUND_DRAIN_TIMEOUT segundos antes de cancelar o restante.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from app.config import settings
+from app.metrics import (
+    BACKGROUND_QUEUE_LENGTH, BACKGROUND_TASKS, BACKGROUND_TASK_DURATION, BACKGROUND_TASK_WAIT
+)
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+
+class QueueConfig(NamedTuple):
+    concurrency: int = 1
+    maxsize: int = 1000
+
+
+class _Job(NamedTuple):
+    priority: int
+    seq: int
+    enqueued_at: float
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    args: tuple
+    kwargs: dict
+
+
+class BackgroundTaskManager:
+    def __init__(self, queues: Dict[str, QueueConfig], task_timeout: float = 30.0):
+        self.configs = queues
+        self.task_timeout = task_timeout
+        self._queues: Dict[str, asyncio.PriorityQueue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._accepting = False
+        self._seq = itertools.count()
+
+    @property
+    def running(self) -> bool:
+        return self._accepting and self._loop is asyncio.get_running_loop()
+
+    async def start(self) -> None:
+        self._start()
+
+    def _start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queues = {}
+        self._workers = []
+        # Contexto vazio: os workers não carregam ContextVars de quem os criou
+        empty = contextvars.Context()
+        for name, config in self.configs.items():
+            self._queues[name] = asyncio.PriorityQueue(maxsize=config.maxsize)
+            BACKGROUND_QUEUE_LENGTH.set(0, name)
+            for i in range(config.concurrency):
+                self._workers.append(
+                    self._loop.create_task(self._work(name), name=f"background-{name}-{i}", context=empty)
+                )
+        self._accepting = True
+
+    def submit(self, queue: str, fn: Callable[..., Awaitable[Any]], *args,
+               priority: int = PRIORITY_NORMAL, name: Optional[str] = None, **kwargs) -> bool:
+        """
+        Enfileira fn(*args, **kwargs) sem esperar. Retorna False se a fila
+        estiver cheia ou o gerenciador estiver encerrando (tarefa descartada).
+        """
+        if queue not in self.configs:
+            raise KeyError(f"Fila de tarefas desconhecida: {queue}")
+
+        if not self.running:
+            if self._loop is not None and self._loop is asyncio.get_running_loop():
+                # Encerrando: nada novo entra depois do início do drain
+                BACKGROUND_TASKS.inc(queue, "dropped")
+                logger.warning(f"Tarefa {name or fn.__name__} descartada: encerrando")
+                return False
+            # Sem lifespan (testes, benchmarks in-process) ou loop novo
+            self._start()
+
+        job = _Job(priority, next(self._seq), time.perf_counter(), name or fn.__name__, fn, args, kwargs)
+        try:
+            self._queues[queue].put_nowait(job)
+        except asyncio.QueueFull:
+            BACKGROUND_TASKS.inc(queue, "dropped")
+            logger.warning(f"Fila {queue} cheia: tarefa {job.name} descartada")
+            return False
+
+        BACKGROUND_QUEUE_LENGTH.inc(queue)
+        return True
+
+    async def _work(self, queue_name: str) -> None:
+        queue = self._queues[queue_name]
+        while True:
+            job = await queue.get()
+            BACKGROUND_QUEUE_LENGTH.dec(queue_name)
+            started = time.perf_counter()
+            BACKGROUND_TASK_WAIT.observe(started - job.enqueued_at, queue_name)
+            status = "error"
+            try:
+                await asyncio.wait_for(job.fn(*job.args, **job.kwargs), self.task_timeout)
+                status = "ok"
+            except asyncio.TimeoutError:
+                status = "timeout"
+                logger.error(f"Tarefa {job.name} ({queue_name}) excedeu {self.task_timeout}s")
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            except Exception as e:
+                logger.exception(f"Tarefa {job.name} ({queue_name}) falhou: {e}")
+            finally:
+                BACKGROUND_TASK_DURATION.observe(time.perf_counter() - started, queue_name)
+                BACKGROUND_TASKS.inc(queue_name, status)
+                queue.task_done()
+
+    def pending(self) -> Dict[str, int]:
+        return {name: queue.qsize() for name, queue in self._queues.items()}
+
+    async def stop(self, timeout: float = 10.0) -> int:
+        """Para de aceitar tarefas, drena as filas até `timeout` e cancela o resto"""
+        if not self._workers:
+            return 0
+        self._accepting = False
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues.values())), timeout
+            )
+        except asyncio.TimeoutError:
+            pass
+
+        dropped = 0
+        for name, queue in self._queues.items():
+            left = queue.qsize()
+            if left:
+                dropped += left
+                BACKGROUND_TASKS.inc(name, "dropped", amount=left)
+                BACKGROUND_QUEUE_LENGTH.set(0, name)
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if dropped:
+            logger.warning(f"{dropped} tarefas em segundo plano descartadas no shutdown")
+        return dropped
+
+
+# Instância global
+background_tasks = BackgroundTaskManager(
+    {name: QueueConfig(**config) for name, config in settings.BACKGROUND_QUEUES.items()},
+    task_timeout=settings.BACKGROUND_TASK_TIMEOUT
+)
@@ -13,6 +13,11 @@ class Settings(BaseSettings):
     APP_SECRET_KEY: str = "your-secret-key-change-in-production"
     APP_ADMIN_MAIL: str = "admin@meucfo.ai"
     APP_ADMIN_PASS: str = "admin123"
+    APP_PROFILE_STARTUP: bool = False  # registra o custo de cada fase do boot
+    
+    # Servidor (perfil multi-processo em app/server.py)
+    WEB_CONCURRENCY: int = 1  # workers do gunicorn; acima de 1 o estado compartilhado exige Redis
+    DB_MIGRATE_ON_STARTUP: bool = True  # False quando o gerente de processos já migrou antes do fork
     
     # Cloudflare D1
     # Cloudflare D1
@@ -20,23 +25,95 @@ class Settings(BaseSettings):
     CLOUDFLARE_DATABASE_ID: str = ""
     CLOUDFLARE_API_TOKEN: str = ""
     
+    # Resiliência do D1 (prazo por requisição, retry de leituras, circuit breaker, hedge)
+    REQUEST_DEADLINE: float = 15.0  # segundos de D1 por requisição HTTP; 0 desliga
+    D1_TIMEOUT: float = 10.0  # segundos por tentativa, limitado pelo prazo restante
+    D1_READ_RETRIES: int = 2  # novas tentativas de leitura em erro transitório (rede, 429, 5xx)
+    D1_RETRY_BACKOFF: float = 0.1  # base do backoff exponencial com jitter (s)
+    D1_RETRY_BACKOFF_MAX: float = 2.0
+    D1_HEDGE_AFTER: float = 0.5  # segundos até duplicar uma leitura lenta; 0 desliga
+    D1_BREAKER_FAILURES: int = 5  # falhas consecutivas para abrir o circuito
+    D1_BREAKER_RECOVERY: float = 10.0  # segundos com o circuito aberto antes do teste
+    
+    # Réplica de leitura local das tabelas quentes do D1 (app/replica.py)
+    REPLICA_ENABLED: bool = False
+    REPLICA_PATH: str = ":memory:"  # uma réplica por worker; em arquivo, use {pid} no nome
+    REPLICA_REFRESH_INTERVAL: float = 2.0  # segundos entre sincronizações incrementais
+    REPLICA_MAX_STALENESS: float = 10.0  # segundos; acima disso as leituras voltam ao D1
+    
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: Optional[str] = None
     REDIS_USERNAME: Optional[str] = None
     
-
+    # Financial Modeling Prep (dados de mercado)
+    FMP_API_KEY: str = ""
+    FMP_BASE_URL: str = "https://financialmodelingprep.com/api/v3"
+    FMP_PROVIDER: str = "fmp"  # "fmp" ou "fake" (offline, para testes e benchmarks)
+    FMP_CACHE_TTL: int = 300  # segundos
+    FMP_CACHE_SIZE: int = 1000  # entradas (símbolo, intervalo) por worker
+    FMP_MAX_CONCURRENCY: int = 4
+    FMP_MAX_RETRIES: int = 3
+    FMP_MAX_BACKOFF: float = 30.0  # teto da espera em 429, mesmo com Retry-After maior
     
     # Webhook URLs
     N8N_WEBHOOK_URL: str = "https://your-n8n-instance.com/webhook"
     LLM_WEBHOOK_URL: str = "https://your-llm-service.com/analyze"
     
+    # Autenticação
+    AUTH_TOKEN_CACHE_SIZE: int = 10000  # tokens JWT verificados mantidos em memória
+    AUTH_REVOCATION_CHECK_INTERVAL: float = 5.0  # segundos entre consultas à revogação no Redis
+    STREAM_TICKET_TTL: int = 30  # segundos de validade do ticket de uso único do stream SSE
+    
+    # Tarefas em segundo plano (webhooks, eventos) executadas após a resposta
+    BACKGROUND_QUEUES: dict = {
+        "webhooks": {"concurrency": 4, "maxsize": 1000},
+        "events": {"concurrency": 1, "maxsize": 1000},  # um worker: eventos saem em ordem
+    }
+    BACKGROUND_TASK_TIMEOUT: float = 30.0  # segundos por tarefa
+    BACKGROUND_DRAIN_TIMEOUT: float = 10.0  # segundos drenando as filas no shutdown
+    
     # Rate Limiting
     RATE_LIMIT_LOGIN_ATTEMPTS: int = 5
     RATE_LIMIT_LOGIN_WINDOW: int = 900  # 15 minutos em segundos
     RATE_LIMIT_API_CALLS: int = 100
     RATE_LIMIT_API_WINDOW: int = 3600  # 1 hora
     
+    # Logging (fila assíncrona; níveis por módulo, ex.: {"httpx": "WARNING"})
+    LOG_LEVEL: Optional[str] = None  # padrão: INFO em prod, DEBUG nos demais
+    LOG_FORMAT: str = "json"  # "json" ou "text"
+    LOG_LEVELS: dict = {"httpx": "WARNING", "httpcore": "WARNING", "asyncio": "WARNING"}
+    LOG_QUEUE_SIZE: int = 10000
+    
+    # Rastreamento de queries D1 por requisição
+    D1_TRACE_ENABLED: bool = True
+    D1_TRACE_MAX_QUERIES: int = 5  # acima disso a requisição é sinalizada
+    D1_TRACE_SLOW_REQUEST_MS: int = 1000
+    
+    # Log de queries D1 (amostrado, com redação de parâmetros sensíveis)
+    D1_QUERY_LOG_SAMPLE_RATE: float = 0.1  # 0 desliga, 1 registra todas
+    D1_QUERY_LOG_LEVELS: dict = {"read": "DEBUG", "write": "INFO", "ddl": "INFO"}
+    
+    # Compressão e cache HTTP
+    COMPRESSION_MIN_SIZE: int = 500  # bytes; corpos menores vão sem compressão
+    COMPRESSION_GZIP_LEVEL: int = 6
+    STATIC_MAX_AGE: int = 31536000  # 1 ano para URLs versionadas (?v=)
+    
+    # Monitor do event loop (atraso contínuo + pilha de callbacks que bloqueiam)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.25  # segundos entre sondas
+    LOOP_MONITOR_STALL_THRESHOLD: float = 0.1  # segundos parado para registrar a pilha
+    
+    # /metrics: com token, exige "Authorization: Bearer <token>"; sem token, só loopback
+    METRICS_TOKEN: str = ""
+    
+    # Profiling sob demanda (/api/admin/profile/*, só administradores)
+    PROFILING_ENABLED: bool = False
+    
+    # Templates
+    TEMPLATE_BYTECODE_DIR: str = ".cache/jinja"  # vazio desliga o cache de bytecode em disco
+    PAGE_CACHE_TTL: int = 3600  # segundos; 0 desliga o cache de páginas renderizadas
+    
     # CORS
     CORS_ORIGINS: list = ["*"]
     
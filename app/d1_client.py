@@ -2,17 +2,39 @@
 
 import os
 import json
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
-import httpx
+import time
 from datetime import datetime
 
 from app.config import settings
+from app.metrics import D1_QUERIES, D1_QUERY_DURATION, D1_RETRIES, D1_HEDGED_READS
+from app.d1_trace import record_query
+from app.d1_logging import query_logger, classify
+from app.utils.singleflight import SingleFlight
+from app.resilience import CircuitBreaker, DeadlineExceeded, backoff, deadline, hedged, remaining
 
 logger = logging.getLogger(__name__)
 
+# D1 aceita no máximo 100 parâmetros por statement
+D1_MAX_PARAMS = 100
+
+class D1TransientError(Exception):
+    """Falha que pode passar sozinha: rede, timeout, 429 ou 5xx"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _retry_after(response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
 class D1Client:
-    def __init__(self):
+    def __init__(self, transport=None):
         # Strip whitespace, quotes (single/double), and slashes from IDs
         self.account_id = settings.CLOUDFLARE_ACCOUNT_ID.strip().strip("'").strip('"').strip("/")
         self.database_id = settings.CLOUDFLARE_DATABASE_ID.strip().strip("'").strip('"').strip("/")
@@ -23,11 +45,80 @@ class D1Client:
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
+        # Transporte httpx alternativo (testes)
+        self.transport = transport
+        self.breaker = CircuitBreaker(
+            "d1",
+            failure_threshold=settings.D1_BREAKER_FAILURES,
+            recovery_time=settings.D1_BREAKER_RECOVERY
+        )
         # Log REPR to see invisible characters
         logger.info(f"D1 Client URL REPR: {repr(self.base_url)}")
 
+    async def _request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Uma ida ao D1 com o tempo que resta do prazo. Erros transitórios levantam
+        D1TransientError; erros da query (4xx, success=false) voltam como resultado.
+        """
+        import httpx
+        
+        timeout = remaining(settings.D1_TIMEOUT)
+        if timeout <= 0:
+            raise DeadlineExceeded()
+        
+        # O timeout do httpx vale por fase (conexão, leitura...); wait_for limita o total
+        async with httpx.AsyncClient(timeout=timeout, transport=self.transport) as client:
+            try:
+                response = await asyncio.wait_for(
+                    client.post(
+                        f"{self.base_url}/query",
+                        headers=self.headers,
+                        json=payload
+                    ),
+                    timeout
+                )
+            except asyncio.TimeoutError:
+                raise D1TransientError(f"Timeout após {timeout:.2f}s")
+            except httpx.HTTPError as e:
+                raise D1TransientError(f"{type(e).__name__}: {e}")
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            raise D1TransientError(
+                f"HTTP {response.status_code}: {response.text[:200]}", _retry_after(response)
+            )
+        
+        if response.status_code >= 400:
+            logger.error(f"D1 Error Status: {response.status_code}")
+            logger.error(f"D1 Error Body: {response.text}")
+            return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
+        
+        result = response.json()
+        
+        if not result.get("success"):
+            logger.error(f"Erro no D1: {result.get('errors', [])}")
+            return {"success": False, "errors": result.get("errors", [])}
+        
+        return result.get("result", [])[0] if result.get("result") else {}
+
+    async def _attempt(self, payload: Dict[str, Any], is_read: bool) -> Dict[str, Any]:
+        """Uma tentativa; leituras que passam de D1_HEDGE_AFTER ganham uma cópia"""
+        hedge_after = settings.D1_HEDGE_AFTER
+        if (
+            is_read and hedge_after > 0
+            and self.breaker.state == CircuitBreaker.CLOSED
+            and remaining() > hedge_after
+        ):
+            return await hedged(lambda: self._request(payload), hedge_after, D1_HEDGED_READS.inc)
+        return await self._request(payload)
+
     async def execute(self, sql: str, params: Optional[List] = None) -> Dict[str, Any]:
-        """Executa uma query SQL no D1"""
+        """
+        Executa uma query SQL no D1.
+        
+        Leituras são repetidas (D1_READ_RETRIES, backoff com jitter) em erros
+        transitórios; escritas nunca, pois não sabemos se foram aplicadas. Com o
+        circuito aberto ou o prazo da requisição esgotado, falha na hora.
+        """
         # Sempre enviar params como lista, mesmo que vazia
         safe_params = params if params is not None else []
         
@@ -35,37 +126,64 @@ class D1Client:
             "sql": sql,
             "params": safe_params
         }
+        is_read = classify(sql) == "read"
+        attempts = 1 + (settings.D1_READ_RETRIES if is_read else 0)
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                # Log Payload (debug)
-                logger.info(f"D1 Executing. Payload: {json.dumps(payload)}")
-                
-                response = await client.post(
-                    f"{self.base_url}/query",
-                    headers=self.headers,
-                    json=payload
-                )
-                
-                if response.status_code >= 400:
-                    logger.error(f"D1 Error Status: {response.status_code}")
-                    logger.error(f"D1 Error Body: {response.text}")
-                    return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
+        start = time.perf_counter()
+        status = "error"
+        rows = 0
+        try:
+            for attempt in range(attempts):
+                if not self.breaker.allow():
+                    status = "circuit_open"
+                    return {"success": False, "error": "D1 indisponível (circuito aberto)"}
                 
-                result = response.json()
+                try:
+                    data = await self._attempt(payload, is_read)
+                except D1TransientError as e:
+                    self.breaker.record_failure()
+                    delay = e.retry_after if e.retry_after is not None else backoff(
+                        attempt, settings.D1_RETRY_BACKOFF, settings.D1_RETRY_BACKOFF_MAX
+                    )
+                    # Fora de uma requisição não há prazo: o Retry-After também tem teto
+                    delay = min(delay, settings.D1_RETRY_BACKOFF_MAX)
+                    if attempt + 1 < attempts and remaining() > delay:
+                        D1_RETRIES.inc()
+                        logger.warning(f"Erro transitório no D1 ({e}); nova tentativa em {delay:.2f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    logger.error(f"Erro ao executar query no D1: {str(e)}")
+                    return {"success": False, "error": str(e)}
+                except DeadlineExceeded:
+                    self.breaker.release()
+                    status = "deadline"
+                    logger.warning("Prazo da requisição esgotado antes da query no D1")
+                    return {"success": False, "error": "Prazo da requisição esgotado"}
+                except asyncio.CancelledError:
+                    self.breaker.release()
+                    raise
+                except Exception as e:
+                    self.breaker.record_failure()
+                    logger.error(f"Erro ao executar query no D1: {str(e)}")
+                    return {"success": False, "error": str(e)}
                 
-                if not result.get("success"):
-                    logger.error(f"Erro no D1: {result.get('errors', [])}")
-                    return {"success": False, "errors": result.get("errors", [])}
-                
-                return result.get("result", [])[0] if result.get("result") else {}
-                
-            except Exception as e:
-                logger.error(f"Erro ao executar query no D1: {str(e)}")
-                return {"success": False, "error": str(e)}
+                # O D1 respondeu (mesmo que a query tenha falhado): serviço saudável
+                self.breaker.record_success()
+                if data.get("success", True):
+                    status = "ok"
+                    rows = len(data.get("results") or [])
+                return data
+        finally:
+            elapsed = time.perf_counter() - start
+            D1_QUERIES.inc(status)
+            D1_QUERY_DURATION.observe(elapsed)
+            record_query(sql, elapsed, rows, status == "ok")
+            query_logger.log(sql, safe_params, elapsed, status, rows)
     
     async def execute_many(self, sql: str, params_list: List[List]) -> Dict[str, Any]:
         """Executa múltiplas queries em batch"""
+        import httpx
+        
         async with httpx.AsyncClient(timeout=30.0) as client:
             try:
                 response = await client.post(
@@ -85,131 +203,51 @@ class D1Client:
 # Instância global
 d1_client = D1Client()
 
-async def execute_sql(sql: str, params: Optional[List] = None) -> Dict[str, Any]:
-    """Função helper para executar SQL"""
-    return await d1_client.execute(sql, params)
+# Leituras idênticas em andamento (mesma SQL e parâmetros) compartilham uma chamada
+_read_flight = SingleFlight(
+    "d1_singleflight",
+    timeout=(settings.REQUEST_DEADLINE or settings.D1_TIMEOUT) + settings.D1_TIMEOUT
+)
 
-async def init_db():
-    """Inicializa o banco de dados criando tabelas se não existirem"""
-    
-    # Tabela de usuários
-    users_table = """
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        type TEXT NOT NULL,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        phone TEXT NOT NULL,
-        document TEXT NOT NULL,
-        area TEXT,
-        cep TEXT,
-        address TEXT,
-        state TEXT,
-        city TEXT,
-        number_complement TEXT,
-        profile INTEGER DEFAULT 1,
-        password TEXT NOT NULL,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-    """
-    
-    # Tabela de preços (para dashboard financeiro)
-    prices_table = """
-    CREATE TABLE IF NOT EXISTS prices (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        symbol TEXT NOT NULL,
-        date TEXT NOT NULL,
-        close REAL NOT NULL,
-        volume INTEGER,
-        created_at TEXT DEFAULT (datetime('now')),
-        UNIQUE(symbol, date)
-    )
+async def execute_sql(sql: str, params: Optional[List] = None, coalesce: bool = False) -> Dict[str, Any]:
     """
+    Função helper para executar SQL.
     
-    # Tabela de dados de precificação
-    pricing_data_table = """
-    CREATE TABLE IF NOT EXISTS pricing_data (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        business_type TEXT NOT NULL,
-        product_cost REAL NOT NULL,
-        shipping_insurance REAL DEFAULT 0,
-        icms_purchase_percent REAL DEFAULT 0,
-        ipi_percent REAL DEFAULT 0,
-        variable_expenses REAL DEFAULT 0,
-        fixed_expenses_percent REAL DEFAULT 0,
-        sale_taxes_percent REAL DEFAULT 0,
-        net_profit_percent REAL DEFAULT 0,
-        product_type TEXT,
-        tax_regime TEXT,
-        origin_state TEXT,
-        destination_state TEXT,
-        calculated_price REAL,
-        margin REAL,
-        created_at TEXT DEFAULT (datetime('now')),
-        FOREIGN KEY (user_id) REFERENCES users(id)
-    )
+    coalesce=True é opt-in e vale só para leituras: chamadas concorrentes com a
+    mesma SQL e parâmetros recebem o mesmo resultado (que não deve ser mutado).
+    Escritas nunca são coalescidas, mesmo com a flag.
     """
-    
-    # Tabela de análise competitiva
-    competitive_analysis_table = """
-    CREATE TABLE IF NOT EXISTS competitive_analysis (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        business_data TEXT NOT NULL,
-        products_data TEXT NOT NULL,
-        sales_history TEXT NOT NULL,
-        cost_structure TEXT NOT NULL,
-        suppliers_data TEXT NOT NULL,
-        analysis_results TEXT,
-        webhook_response TEXT,
-        status TEXT DEFAULT 'pending',
-        created_at TEXT DEFAULT (datetime('now')),
-        FOREIGN KEY (user_id) REFERENCES users(id)
-    )
-    """
-    
-    # Tabela de logs de webhook
-    webhook_logs_table = """
-    CREATE TABLE IF NOT EXISTS webhook_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        webhook_type TEXT NOT NULL,
-        payload TEXT NOT NULL,
-        response TEXT,
-        status_code INTEGER,
-        created_at TEXT DEFAULT (datetime('now'))
-    )
-    """
-    
-    tables = [
-        users_table,
-        prices_table,
-        pricing_data_table,
-        competitive_analysis_table,
-        webhook_logs_table
-    ]
-    
-    for table_sql in tables:
-        result = await execute_sql(table_sql)
-        if not result.get("success"):
-            logger.warning(f"Erro ao criar tabela: {result.get('error')}")
-    
-    # Criar usuário admin padrão se não existir
-    from app.services.auth import hash_password
-    admin_check = await execute_sql(
-        "SELECT id FROM users WHERE email = ?",
-        [settings.APP_ADMIN_MAIL]
-    )
-    
-    if admin_check.get("success") and not admin_check.get("results"):
-        admin_pass_hash = hash_password(settings.APP_ADMIN_PASS)
-        await execute_sql(
-            """
-            INSERT INTO users (email, password, name, profile, type, phone, document)
-            VALUES (?, ?, ?, 2, 'PF', '000000000', '00000000000')
-            """,
-            [settings.APP_ADMIN_MAIL, admin_pass_hash, "Administrador"]
+    if coalesce and classify(sql) == "read":
+        return await _coalesced_read(sql, params)
+    return await d1_client.execute(sql, params)
+
+async def _shared_read(sql: str, params: Optional[List]) -> Dict[str, Any]:
+    # Contexto vazio (SingleFlight): o prazo é o de uma requisição inteira, não o do primeiro chamador
+    if settings.REQUEST_DEADLINE:
+        with deadline(settings.REQUEST_DEADLINE):
+            return await d1_client.execute(sql, params)
+    return await d1_client.execute(sql, params)
+
+async def _coalesced_read(sql: str, params: Optional[List]) -> Dict[str, Any]:
+    """Leitura compartilhada; cada chamador espera até o próprio prazo e a registra no próprio trace"""
+    key = (sql, tuple(params) if params else ())
+    budget = remaining()
+    start = time.perf_counter()
+    try:
+        result = await _read_flight.do(
+            key, lambda: _shared_read(sql, params),
+            wait=None if budget == float("inf") else max(budget, 0)
         )
-        logger.info("Usuário admin criado com sucesso")
+    except asyncio.TimeoutError:
+        record_query(sql, time.perf_counter() - start, 0, False)
+        return {"success": False, "error": "Prazo da requisição esgotado"}
     
-    logger.info("Banco de dados inicializado com sucesso")
+    success = bool(result.get("success", True))
+    rows = len(result.get("results") or []) if success else 0
+    record_query(sql, time.perf_counter() - start, rows, success)
+    return result
+
+async def init_db():
+    """Aplica as migrações pendentes (uma única consulta quando o schema já está em dia)"""
+    from app.migrations import migrate
+    await migrate()
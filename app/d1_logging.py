@@ -0,0 +1,147 @@
+# app/d1_logging.py
+
+import json
+import logging
+import random
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Sequence
+
+from app.config import settings
+
+QUERY_LOGGER_NAME = "app.d1.queries"
+
+# Colunas cujo valor nunca deve ir para o log
+SENSITIVE_COLUMNS = frozenset({"password", "password_hash", "token", "api_token", "secret", "document"})
+REDACTED = "***"
+
+# Hashes bcrypt e JWTs são redigidos mesmo sem coluna identificável
+_SECRET_VALUE = re.compile(r"^(\$2[abxy]?\$|eyJ)")
+_COMPARISON = re.compile(r"(\w+)\s*(?:=|<>|!=|>=|<=|<|>|\bLIKE\b)\s*\?", re.IGNORECASE)
+_INSERT = re.compile(r"INSERT\s+(?:OR\s+\w+\s+)?INTO\s+\w+\s*\(([^)]*)\)", re.IGNORECASE)
+
+_READ_KEYWORDS = ("SELECT", "PRAGMA", "EXPLAIN")
+_WRITE_KEYWORDS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "UPSERT")
+
+# Literais, identificadores entre aspas, comentários, parênteses e palavras
+_SQL_TOKEN = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\]|--[^\n]*|/\*.*?\*/|[()]|\w+",
+    re.DOTALL
+)
+
+
+def _statement_after_ctes(sql: str) -> str:
+    """
+    Primeira palavra-chave de nível zero após a lista de CTEs de um WITH.
+    Sem nenhuma reconhecível, "" (classificada como ddl: nunca repetida).
+    """
+    depth = 0
+    for token in _SQL_TOKEN.findall(sql):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth == 0 and token.upper() in ("SELECT",) + _WRITE_KEYWORDS:
+            return token.upper()
+    return ""
+
+
+@lru_cache(maxsize=512)
+def classify(sql: str) -> str:
+    """
+    Classe da query: read, write ou ddl. WITH é classificado pelo statement
+    que segue as CTEs: WITH ... INSERT/UPDATE/DELETE é escrita.
+    """
+    keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    if keyword == "WITH":
+        keyword = _statement_after_ctes(sql)
+    if keyword in _READ_KEYWORDS:
+        return "read"
+    if keyword in _WRITE_KEYWORDS:
+        return "write"
+    return "ddl"
+
+
+@lru_cache(maxsize=512)
+def _sensitive_positions(sql: str) -> FrozenSet[int]:
+    """Índices dos placeholders que correspondem a colunas sensíveis"""
+    placeholders = [m.start() for m in re.finditer(r"\?", sql)]
+
+    insert = _INSERT.search(sql)
+    if insert:
+        columns = [c.strip().lower() for c in insert.group(1).split(",")]
+        # Inserções multi-row repetem as colunas a cada tupla
+        return frozenset(
+            i for i in range(len(placeholders))
+            if columns[i % len(columns)] in SENSITIVE_COLUMNS
+        )
+
+    index_by_offset = {offset: i for i, offset in enumerate(placeholders)}
+    positions = set()
+    for match in _COMPARISON.finditer(sql):
+        if match.group(1).lower() in SENSITIVE_COLUMNS:
+            positions.add(index_by_offset[match.end() - 1])
+    return frozenset(positions)
+
+
+def redact_params(sql: str, params: Sequence) -> List:
+    positions = _sensitive_positions(sql)
+    return [
+        REDACTED if i in positions or (isinstance(v, str) and _SECRET_VALUE.match(v)) else v
+        for i, v in enumerate(params)
+    ]
+
+
+class _LazyQuery:
+    """Só serializa a query quando o registro é de fato formatado (na thread do listener de log)"""
+    __slots__ = ("kind", "sql", "params", "duration", "status", "rows")
+
+    def __init__(self, kind, sql, params, duration, status, rows):
+        self.kind = kind
+        self.sql = sql
+        self.params = params
+        self.duration = duration
+        self.status = status
+        self.rows = rows
+
+    def __str__(self) -> str:
+        return json.dumps({
+            "kind": self.kind,
+            "sql": " ".join(self.sql.split()),
+            "params": redact_params(self.sql, self.params),
+            "duration_ms": round(self.duration * 1000, 2),
+            "rows": self.rows,
+            "status": self.status
+        }, default=str)
+
+
+class QueryLogger:
+    """
+    Log estruturado e amostrado das queries D1, com nível por classe de query.
+    A entrega é assíncrona pela fila do pipeline de logging (app.logging_config).
+    """
+
+    def __init__(self, levels: Dict[str, str], sample_rate: float):
+        self.logger = logging.getLogger(QUERY_LOGGER_NAME)
+        self.levels = {kind: logging.getLevelName(level.upper()) for kind, level in levels.items()}
+        self.sample_rate = sample_rate
+
+    def log(self, sql: str, params: Sequence, duration: float, status: str, rows: int) -> None:
+        if status == "ok":
+            # Amostragem antes de qualquer outro trabalho; falhas são sempre registradas
+            if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+                return
+            kind = classify(sql)
+            level = self.levels.get(kind, logging.DEBUG)
+        else:
+            kind = classify(sql)
+            level = logging.WARNING
+
+        if not self.logger.isEnabledFor(level):
+            return
+
+        self.logger.log(level, "D1 query %s", _LazyQuery(kind, sql, list(params), duration, status, rows))
+
+
+# Instância global
+query_logger = QueryLogger(settings.D1_QUERY_LOG_LEVELS, settings.D1_QUERY_LOG_SAMPLE_RATE)
@@ -0,0 +1,76 @@
+# app/d1_trace.py
+
+import re
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@lru_cache(maxsize=512)
+def fingerprint(sql: str) -> str:
+    """Normaliza a SQL (espaços, literais, listas IN) para agrupar queries equivalentes"""
+    normalized = _STRING_LITERAL.sub("?", sql)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass
+class QueryRecord:
+    fingerprint: str
+    duration: float
+    rows: int
+    success: bool
+
+
+@dataclass
+class QueryTrace:
+    """Queries D1 executadas durante uma requisição"""
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_time(self) -> float:
+        return sum(q.duration for q in self.queries)
+
+    def repeated(self) -> List[tuple]:
+        """Fingerprints executados mais de uma vez (candidatos a N+1)"""
+        counts = Counter(q.fingerprint for q in self.queries)
+        return [(fp, n) for fp, n in counts.most_common() if n > 1]
+
+    def summary(self) -> str:
+        lines = [f"{self.count} queries D1 em {self.total_time * 1000:.1f}ms"]
+        for q in self.queries:
+            lines.append(f"  {q.duration * 1000:7.1f}ms {q.rows:5d} rows  {q.fingerprint[:120]}")
+        for fp, n in self.repeated():
+            lines.append(f"  repetida {n}x: {fp[:120]}")
+        return "\n".join(lines)
+
+
+_current_trace: ContextVar[Optional[QueryTrace]] = ContextVar("d1_query_trace", default=None)
+
+
+def start_trace() -> QueryTrace:
+    trace = QueryTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[QueryTrace]:
+    return _current_trace.get()
+
+
+def record_query(sql: str, duration: float, rows: int, success: bool) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.queries.append(QueryRecord(fingerprint(sql), duration, rows, success))
@@ -0,0 +1,260 @@
+# app/http_cache.py
+
+import gzip
+import hashlib
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli  # opcional: sem o pacote, só gzip é oferecido
+except ImportError:
+    brotli = None
+
+STATIC_DIR = "app/static"
+STATIC_PREFIX = "/static"
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Sufixo acrescentado ao ETag da resposta comprimida (a representação muda)
+_ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() != coding:
+            continue
+        params = params.strip().replace(" ", "")
+        return params not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Codificação preferida pelo servidor entre as aceitas pelo cliente"""
+    if brotli is not None and _accepts(accept_encoding, "br"):
+        return "br"
+    if _accepts(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    # mtime=0 mantém a saída determinística para o mesmo corpo
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match com comparação fraca (RFC 9110)"""
+    if if_none_match.strip() == "*":
+        return True
+    target = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        value = candidate.strip()
+        if value.startswith("W/"):
+            value = value[2:]
+        if value.strip('"') == target:
+            return True
+    return False
+
+
+def strip_encoding_suffix(if_none_match: str) -> str:
+    """Remove o sufixo -gzip/-br dos ETags enviados, para a camada interna compará-los"""
+    tags = []
+    for candidate in if_none_match.split(","):
+        value = candidate.strip()
+        for suffix in _ENCODING_SUFFIXES:
+            if value.endswith(suffix + '"'):
+                value = value[:-len(suffix) - 1] + '"'
+                break
+        tags.append(value)
+    return ", ".join(tags)
+
+
+class CompressionMiddleware:
+    """
+    Comprime (br/gzip) respostas de corpo único acima de minimum_size.
+    Respostas em streaming (SSE, arquivos grandes) passam sem alteração,
+    para não segurar eventos no buffer do compressor. Corpos com ETag têm a
+    versão comprimida guardada num LRU pequeno (estáticos e JSON repetidos).
+    """
+
+    def __init__(self, app, minimum_size: int = 500, gzip_level: int = 6,
+                 brotli_quality: int = 4, cache_size: int = 256):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if "if-none-match" in request_headers:
+            scope = dict(scope)
+            scope["headers"] = [
+                (name, strip_encoding_suffix(value.decode("latin-1")).encode("latin-1"))
+                if name == b"if-none-match" else (name, value)
+                for name, value in scope["headers"]
+            ]
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body" and start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(scope=start)
+                content_type = headers.get("content-type", "")
+                upstream_encoded = "content-encoding" in headers
+
+                if content_type.startswith(COMPRESSIBLE_TYPES):
+                    headers.add_vary_header("Accept-Encoding")
+                    body = message.get("body", b"")
+                    if (
+                        encoding is not None
+                        and not message.get("more_body", False)
+                        and len(body) >= self.minimum_size
+                        and not upstream_encoded
+                    ):
+                        message = {**message, "body": self._compress(body, encoding, headers.get("etag"))}
+                        headers["Content-Encoding"] = encoding
+                        headers["Content-Length"] = str(len(message["body"]))
+
+                # O sufixo depende só da codificação negociada, não do content-type nem
+                # do tamanho: um 304 (sem content-type) precisa do mesmo ETag do 200
+                if encoding is not None and "etag" in headers and not upstream_encoded:
+                    headers["ETag"] = headers["etag"][:-1] + f'-{encoding}"'
+                    headers.add_vary_header("Accept-Encoding")
+
+                await send(start)
+
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, body: bytes, encoding: str, etag: Optional[str]) -> bytes:
+        if etag is None:
+            return compress(body, encoding, self.gzip_level, self.brotli_quality)
+
+        key = (etag, encoding)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+        self._cache[key] = compressed
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compressed
+
+
+class ConditionalGetMiddleware:
+    """
+    ETag forte (hash do corpo) para respostas JSON de GET, com 304 quando o
+    If-None-Match confere. Os dados são do usuário: o cliente sempre revalida.
+    """
+
+    def __init__(self, app, cache_control: str = "private, no-cache"):
+        self.app = app
+        self.cache_control = cache_control
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message = None
+
+        async def send_with_etag(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body" and start_message is not None:
+                start, start_message = start_message, None
+                headers = MutableHeaders(scope=start)
+
+                if (
+                    start["status"] == 200
+                    and not message.get("more_body", False)
+                    and headers.get("content-type", "").startswith("application/json")
+                    and "etag" not in headers
+                ):
+                    etag = compute_etag(message.get("body", b""))
+                    headers["ETag"] = etag
+                    headers.setdefault("Cache-Control", self.cache_control)
+
+                    if if_none_match and etag_matches(if_none_match, etag):
+                        del headers["content-length"]
+                        del headers["content-type"]
+                        await send({**start, "status": 304})
+                        await send({"type": "http.response.body", "body": b""})
+                        return
+
+                await send(start)
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+@lru_cache(maxsize=None)
+def _fingerprint(path: str) -> str:
+    with open(os.path.join(STATIC_DIR, path), "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=6).hexdigest()
+
+
+def static_url(path: str) -> str:
+    """URL do estático com a versão do conteúdo (?v=hash) para cache de longo prazo"""
+    path = path.lstrip("/")
+    try:
+        return f"{STATIC_PREFIX}/{path}?v={_fingerprint(path)}"
+    except OSError:
+        return f"{STATIC_PREFIX}/{path}"
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    URLs versionadas (?v=) são imutáveis e ficam em cache por max_age; as demais
+    revalidam com ETag/Last-Modified (já tratados pelo StaticFiles).
+    """
+
+    def __init__(self, *args, max_age: int = 31536000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if b"v=" in scope.get("query_string", b""):
+            response.headers["Cache-Control"] = f"public, max-age={self.max_age}, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,104 @@
+# app/logging_config.py
+
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Union
+
+from app.metrics import LOG_RECORDS_DROPPED
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Enfileira registros sem bloquear o event loop. Acima da marca d'água,
+    registros abaixo de WARNING são descartados; com a fila cheia, qualquer
+    registro é descartado (e contabilizado em log_records_dropped_total).
+
+    A formatação fica para a thread do listener: `prepare` não monta a
+    mensagem, então os argumentos do log não devem ser mutados depois.
+    """
+
+    def __init__(self, log_queue: queue.Queue, high_water: float = 0.8):
+        super().__init__(log_queue)
+        self.high_water = int(log_queue.maxsize * high_water) if log_queue.maxsize else 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.high_water and record.levelno < logging.WARNING and self.queue.qsize() >= self.high_water:
+            LOG_RECORDS_DROPPED.inc(record.levelname)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(record.levelname)
+
+
+def setup_logging(
+    level: Union[int, str] = logging.INFO,
+    module_levels: Optional[Dict[str, str]] = None,
+    fmt: str = "json",
+    queue_size: int = 10000
+) -> QueueListener:
+    """
+    Configura o root logger para entregar os registros via fila; a escrita em
+    stderr acontece na thread do QueueListener.
+    """
+    global _listener
+    shutdown_logging()
+
+    if fmt == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(BoundedQueueHandler(log_queue))
+    root.setLevel(level)
+
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e encerra a thread do listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,104 @@
+# app/loop_monitor.py
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from app.config import settings
+from app.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """
+    Monitor contínuo do event loop, barato o bastante para produção:
+
+    - uma sonda no loop dorme `interval` e registra o atraso ao acordar
+      (histograma event_loop_lag_seconds);
+    - uma thread vigia o último batimento da sonda e, quando o loop fica
+      parado mais que `stall_threshold`, captura a pilha da thread do loop
+      (o callback que está bloqueando), uma vez por travamento.
+    """
+
+    def __init__(self, interval: float = 0.25, stall_threshold: float = 0.1, history: int = 50):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.stalls: Deque[Dict] = deque(maxlen=history)
+        self._beat = 0.0
+        self._reported_beat = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._watchdog.join()
+        self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            EVENT_LOOP_LAG.observe(lag)
+            if self._reported_beat == self._beat and self.stalls:
+                # O travamento registrado pela thread terminou: duração real
+                self.stalls[-1]["blocked_ms"] = round(lag * 1000, 1)
+            self._beat = now
+
+    def _watch(self) -> None:
+        check_every = min(self.interval, self.stall_threshold) / 2
+        while not self._stop.wait(check_every):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.stall_threshold or beat == self._reported_beat:
+                continue
+            self._reported_beat = beat
+            self._record_stall(blocked)
+
+    def _record_stall(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack: List[str] = traceback.format_stack(frame) if frame is not None else []
+        EVENT_LOOP_STALLS.inc()
+        self.stalls.append({
+            "at": time.time(),
+            "blocked_ms": round(blocked * 1000, 1),
+            "stack": [line.rstrip() for line in stack],
+        })
+        logger.warning(
+            f"Event loop bloqueado há {blocked * 1000:.0f}ms; pilha do loop:\n{''.join(stack[-15:])}"
+        )
+
+
+# Instância global
+loop_monitor = LoopMonitor(settings.LOOP_MONITOR_INTERVAL, settings.LOOP_MONITOR_STALL_THRESHOLD)
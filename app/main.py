@@ -5,61 +5,131 @@ import os
 import time
 import json
 import logging
-from contextlib import asynccontextmanager
+import secrets
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+
+_IMPORT_STARTED = time.perf_counter()
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
-from fastapi import FastAPI, Request, Depends
+from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
-import redis.asyncio as redis
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 
 from app.config import settings
 from app.d1_client import init_db, execute_sql
-from app.routers import auth, admin, dashboard, pricing, analysis
-from app.rate_limit import init_redis
+from app.routers import auth, admin, dashboard, pricing, analysis, queries
+from app.rate_limit import init_redis, InstrumentedRedis
+from app.metrics import registry, HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from app.d1_trace import start_trace
+from app.resilience import deadline
+from app.logging_config import setup_logging
+from app.utils.events import event_broker
+from app.utils.cache_bus import cache_bus
+from app.replica import read_replica
+from app.utils.local_redis import LocalRedis
+from app.loop_monitor import loop_monitor
+from app.background import background_tasks
+from app.services.fmp_service import fmp_service
+from app.templating import render_page
+from app.responses import FastJSONResponse
+from app.http_cache import CompressionMiddleware, ConditionalGetMiddleware, CachedStaticFiles
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO if settings.APP_ENV == "prod" else logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Configuração de logging (fila + listener: o event loop nunca escreve em stderr)
+setup_logging(
+    level=settings.LOG_LEVEL or ("INFO" if settings.APP_ENV == "prod" else "DEBUG"),
+    module_levels=settings.LOG_LEVELS,
+    fmt=settings.LOG_FORMAT,
+    queue_size=settings.LOG_QUEUE_SIZE
 )
 logger = logging.getLogger(__name__)
 
+# Tempos de inicialização (APP_PROFILE_STARTUP=true para registrar no log)
+startup_timings = {"import app.main": 0.0}
+
+@contextmanager
+def _startup_phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = time.perf_counter() - start
+
+def _log_startup_profile():
+    total = sum(startup_timings.values())
+    lines = [f"  {name:<28}{elapsed * 1000:9.1f}ms" for name, elapsed in startup_timings.items()]
+    heavy = [m for m in ("jinja2", "passlib", "jose", "httpx", "numpy", "redis") if m in sys.modules]
+    logger.info(
+        f"Perfil de inicialização ({total * 1000:.1f}ms):\n" + "\n".join(lines) +
+        f"\n  módulos pesados já carregados: {', '.join(heavy) or 'nenhum'}"
+        "\n  custo por módulo: python -m benchmarks.bench_startup"
+    )
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Inicializando aplicação MeuCFO.ai")
     
-    # Inicializar banco de dados
-    await init_db()
-    logger.info("Banco de dados D1 inicializado")
+    # Inicializar banco de dados (no gunicorn, o master já migrou antes do fork)
+    if settings.DB_MIGRATE_ON_STARTUP:
+        with _startup_phase("migrações D1"):
+            await init_db()
+        logger.info("Banco de dados D1 inicializado")
     
     # Inicializar Redis
-    try:
-        app.state.redis = await init_redis()
-        logger.info("Redis inicializado para rate limiting")
-    except Exception as e:
-        logger.warning(f"Não foi possível conectar ao Redis: {e}")
-        # Mock redis for dev without redis
-        class MockRedis:
-            async def get(self, *args, **kwargs): return None
-            async def set(self, *args, **kwargs): return None
-            async def close(self): pass
-            async def incr(self, *args, **kwargs): return 1
-            async def expire(self, *args, **kwargs): pass
-            async def ttl(self, *args, **kwargs): return 0
-            async def delete(self, *args, **kwargs): pass
-        app.state.redis = MockRedis()
+    with _startup_phase("redis"):
+        try:
+            app.state.redis = await init_redis()
+            logger.info("Redis inicializado para rate limiting")
+        except Exception as e:
+            if settings.WEB_CONCURRENCY > 1:
+                message = (
+                    f"Redis indisponível com {settings.WEB_CONCURRENCY} workers: limites de login, "
+                    f"revogação de tokens e invalidação de cache ficariam por worker ({e})"
+                )
+                if settings.APP_ENV == "prod":
+                    raise RuntimeError(message)
+                logger.error(message)
+            else:
+                logger.warning(f"Não foi possível conectar ao Redis: {e}")
+            app.state.redis = LocalRedis()
+    
+    app.state.redis = InstrumentedRedis(app.state.redis)
+    
+    # Invalidação de caches em memória entre workers (Redis pub/sub)
+    await cache_bus.start(app.state.redis)
+    
+    # Réplica de leitura local das tabelas quentes (opcional)
+    if settings.REPLICA_ENABLED:
+        with _startup_phase("réplica de leitura"):
+            await read_replica.start(settings.REPLICA_PATH, settings.REPLICA_REFRESH_INTERVAL)
+    
+    # Eventos em tempo real do dashboard (Redis pub/sub ou fallback local)
+    with _startup_phase("eventos do dashboard"):
+        await event_broker.start(app.state.redis)
+    
+    # Filas de efeitos colaterais pós-resposta (webhooks, eventos)
+    await background_tasks.start()
+    
+    # Atraso do event loop e pilha de callbacks que o bloqueiam
+    if settings.LOOP_MONITOR_ENABLED:
+        await loop_monitor.start()
+    
+    if settings.APP_PROFILE_STARTUP:
+        _log_startup_profile()
     
     yield
     
     # Shutdown
+    await loop_monitor.stop()
+    await background_tasks.stop(settings.BACKGROUND_DRAIN_TIMEOUT)
+    await event_broker.stop()
+    await read_replica.stop()
+    await cache_bus.stop()
+    await fmp_service.close()
     if hasattr(app.state, 'redis'):
         await app.state.redis.close()
         logger.info("Redis fechado")
@@ -71,6 +141,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs" if settings.APP_ENV == "dev" else None,
     redoc_url="/api/redoc" if settings.APP_ENV == "dev" else None,
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -82,36 +153,75 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL
+)
 
 # Montar arquivos estáticos e templates se diretórios existirem
 if os.path.exists("app/static"):
-    app.mount("/static", StaticFiles(directory="app/static"), name="static")
-
-# Configurar templates
-if os.path.exists("app/templates"):
-    templates = Jinja2Templates(directory="app/templates")
-else:
-    # Fallback to avoid crash if templates dir missing during dev
-    templates = None
+    app.mount(
+        "/static",
+        CachedStaticFiles(directory="app/static", max_age=settings.STATIC_MAX_AGE),
+        name="static"
+    )
 
-# Middleware personalizado para logging
+# Middleware personalizado para logging e métricas
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
+    start_time = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    status_code = 500
+    trace = start_trace() if settings.D1_TRACE_ENABLED else None
+    # Prazo total de D1 da requisição (herdado pela task que roda a rota)
+    budget = deadline(settings.REQUEST_DEADLINE) if settings.REQUEST_DEADLINE > 0 else nullcontext()
     try:
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
+        with budget:
+            response = await call_next(request)
+        status_code = response.status_code
+        if trace is not None and trace.count:
+            _report_query_trace(request, response, trace, time.perf_counter() - start_time)
+        return response
+    except Exception as e:
+        logger.exception(f"Request failed: {e}")
+        raise e
+    finally:
+        process_time = time.perf_counter() - start_time
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        HTTP_REQUEST_DURATION.observe(
+            process_time, request.method, _route_label(request), status_code
+        )
         logger.info(
             f"{request.method} {request.url.path} - "
-            f"Status: {response.status_code} - "
+            f"Status: {status_code} - "
             f"Tempo: {process_time:.3f}s"
         )
-        return response
-    except Exception as e:
-        logger.error(f"Request failed: {e}")
-        import traceback
-        traceback.print_exc()
-        raise e
+
+def _report_query_trace(request: Request, response, trace, elapsed: float):
+    """Expõe o custo em D1 da requisição e sinaliza excesso de queries ou lentidão"""
+    response.headers["X-D1-Query-Count"] = str(trace.count)
+    response.headers["Server-Timing"] = (
+        f'd1;dur={trace.total_time * 1000:.1f};desc="{trace.count} queries"'
+    )
+    
+    too_many = trace.count > settings.D1_TRACE_MAX_QUERIES
+    too_slow = elapsed * 1000 > settings.D1_TRACE_SLOW_REQUEST_MS
+    if too_many or too_slow or trace.repeated():
+        logger.warning(
+            f"{request.method} {request.url.path} - possível N+1 ou requisição lenta "
+            f"({elapsed:.3f}s): {trace.summary()}"
+        )
+
+def _route_label(request: Request) -> str:
+    """Template da rota (ex.: /api/pricing/calculations/{calc_id}) para limitar a cardinalidade"""
+    route = request.scope.get("route")
+    if route is not None:
+        return route.path
+    if request.url.path.startswith("/static/"):
+        return "/static"
+    return "<unmatched>"
 
 # Incluir routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Autenticação"])
@@ -119,26 +229,25 @@ app.include_router(admin.router, prefix="/api/admin", tags=["Administração"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(pricing.router, prefix="/api/pricing", tags=["Precificação"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["Análise"])
+app.include_router(queries.router, prefix="/api/queries", tags=["Consultas"])
 
 
 # Rotas principais
 @app.get("/", response_class=HTMLResponse)
 async def landing_page(request: Request):
-    if templates:
-        return templates.TemplateResponse(
-            "landing.html",
-            {"request": request, "title": "MeuCFO.ai - Inteligência Financeira", "current_user": None}
-        )
-    return "Templates not loaded"
+    return render_page(
+        request,
+        "landing.html",
+        {"title": "MeuCFO.ai - Inteligência Financeira", "current_user": None}
+    )
 
 @app.get("/dashboard", response_class=HTMLResponse, name="dashboard")
 async def dashboard_page(request: Request):
-    if templates:
-        return templates.TemplateResponse(
-            "dashboard.html",
-            {"request": request, "title": "MeuCFO.ai - Dashboard", "current_user": None}
-        )
-    return "Templates not loaded"
+    return render_page(
+        request,
+        "dashboard.html",
+        {"title": "MeuCFO.ai - Dashboard", "current_user": None}
+    )
 
 @app.get("/api/health")
 async def health_check():
@@ -149,6 +258,26 @@ async def health_check():
         "timestamp": time.time()
     }
 
+_LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+def _metrics_allowed(request: Request) -> bool:
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and secrets.compare_digest(token, settings.METRICS_TOKEN)
+    # Sem token configurado: apenas scrapes locais (sidecar/agente no mesmo host)
+    return request.client is not None and request.client.host in _LOOPBACK_HOSTS
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Métricas deste worker no formato texto do Prometheus (label worker = pid)"""
+    if not _metrics_allowed(request):
+        # 404 em vez de 401: não anuncia o endpoint
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(
+        registry.render({"worker": str(os.getpid())}),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 @app.get("/api/config")
 async def get_config():
     """Retorna configurações não sensíveis para o frontend"""
@@ -163,48 +292,6 @@ async def get_config():
         }
     }
 
-from pydantic import BaseModel
-class D1Query(BaseModel):
-    sql: str
-    params: list = []
-
-@app.post("/api/d1/query")
-async def proxy_d1_query(query: D1Query):
-    """
-    Proxy temporário para permitir que o frontend execute SQL diretamente.
-    ATENÇÃO: Isso deve ser substituído por rotas específicas no futuro por segurança.
-    """
-    try:
-        # Usar o cliente D1 já configurado
-        result = await execute_sql(query.sql, query.params)
-        
-        # O cliente D1 retorna o objeto 'result' interno da Cloudflare ou um dict customizado
-        # Precisamos garantir que retorne no formato que o frontend espera (envelope Cloudflare)
-        
-        # Se result já tem "success", provavelmente é a resposta crua
-        if "success" in result:
-             return result
-             
-        # Caso contrário, encapsular (o execute_sql as vezes retorna só o data)
-        # Verificando app/d1_client.py: execute() retorna result.get("result", [])[0] se sucesso
-        # O frontend espera a resposta COMPLETA da API da Cloudflare: { success: true, part: ..., result: [...] }
-        
-        # Vamos usar o client diretamente para ter a resposta crua para esse proxy
-        from app.d1_client import d1_client
-        raw_response = await d1_client.execute(query.sql, query.params)
-        
-        # Verificar se houve erro no execute
-        if isinstance(raw_response, dict) and "success" in raw_response and raw_response["success"] is False:
-            return raw_response
-
-        # O d1_client.execute atual já retorna a estrutura processada das linhas
-        # O frontend espera: { success: true, result: [ { results: [rows], meta: ... } ] }
-        return {"success": True, "result": [raw_response]}
-        
-    except Exception as e:
-        logger.error(f"Erro no proxy D1: {e}")
-        return {"success": False, "errors": [{"message": str(e)}]}
-
 @app.get("/api/debug/users")
 async def debug_users():
     """Rota temporária para listar usuários"""
@@ -241,7 +328,7 @@ async def debug_test_id():
     
     return {
         "user_int_found": user_int is not None,
-        "user_int_data": user_int,
+        "user_int_data": user_int.as_dict() if user_int else None,
         "raw_query_str_found": len(sql_result_str.get("results", [])) > 0 if sql_result_str.get("success") else "error",
         "raw_query_str_result": sql_result_str
     }
@@ -265,6 +352,8 @@ async def debug_logs():
     except Exception as e:
         return {"error": str(e), "cmd": journalctl_cmd}
 
+startup_timings["import app.main"] = time.perf_counter() - _IMPORT_STARTED
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
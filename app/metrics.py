@@ -0,0 +1,269 @@
+# app/metrics.py
+
+"""
+Métricas da aplicação no formato texto do Prometheus.
+
+O registro é por processo e, em geral, sem locks: as atualizações acontecem
+no event loop, e cada evento custa apenas um lookup em dict (e um bisect nos
+histogramas), ficando na casa de poucos microssegundos. Métricas atualizadas
+fora do loop (logging em qualquer thread, watchdog do loop_monitor) são
+criadas com thread_safe=True e usam um lock.
+
+Com vários workers (gunicorn), cada processo tem o seu registro e /metrics
+responde pelo worker que recebeu a requisição: toda série leva o label
+worker (pid). Os contadores de um worker só crescem; some-os por worker no
+Prometheus (sum without (worker)) em vez de tratar scrapes alternados como
+reinícios.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Buckets padrão de latência (segundos)
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, *extra: str) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    pairs.extend(e for e in extra if e)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def collect(self, extra: str = "") -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}"
+            for labels, value in list(self._values.items())
+        ]
+
+
+class ThreadSafeCounter(Counter):
+    """Counter incrementado de outras threads além do event loop"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            super().inc(*labels, amount=amount)
+
+    def collect(self, extra: str = "") -> List[str]:
+        with self._lock:
+            return super().collect(extra)
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [contagem por bucket (+Inf no final), soma]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def collect(self, extra: str = "") -> List[str]:
+        lines = []
+        bounds = self.buckets + (float("inf"),)
+        for labels, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, extra, le)} {cumulative}"
+                )
+            label_str = _format_labels(self.labelnames, labels, extra)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), thread_safe: bool = False
+    ) -> Counter:
+        cls = ThreadSafeCounter if thread_safe else Counter
+        return self._register(cls(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, constant_labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Exporta todas as métricas no formato texto 0.0.4 do Prometheus;
+        constant_labels (ex.: worker) é acrescentado a todas as séries.
+        """
+        extra = ",".join(f'{k}="{_escape(v)}"' for k, v in (constant_labels or {}).items())
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.collect(extra))
+        return "\n".join(lines) + "\n"
+
+
+# Instância global
+registry = MetricsRegistry()
+
+# HTTP
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota",
+    ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requisições HTTP em andamento"
+)
+
+# Cloudflare D1
+D1_QUERIES = registry.counter(
+    "d1_queries_total", "Queries executadas no D1", ("status",)
+)
+D1_QUERY_DURATION = registry.histogram(
+    "d1_query_duration_seconds", "Latência das queries no D1"
+)
+D1_RETRIES = registry.counter(
+    "d1_retries_total", "Novas tentativas de leitura após erro transitório no D1"
+)
+D1_HEDGED_READS = registry.counter(
+    "d1_hedged_reads_total", "Leituras lentas que ganharam uma cópia (hedge)"
+)
+
+# Circuit breakers (estado: 0 fechado, 1 semiaberto, 2 aberto)
+CIRCUIT_BREAKER_STATE = registry.gauge(
+    "circuit_breaker_state", "Estado atual do circuit breaker", ("name",)
+)
+CIRCUIT_BREAKER_TRANSITIONS = registry.counter(
+    "circuit_breaker_transitions_total", "Mudanças de estado do circuit breaker", ("name", "state")
+)
+CIRCUIT_BREAKER_REJECTED = registry.counter(
+    "circuit_breaker_rejected_total", "Chamadas rejeitadas com o circuito aberto", ("name",)
+)
+
+# Redis
+REDIS_OPERATIONS = registry.counter(
+    "redis_operations_total", "Comandos enviados ao Redis", ("command", "status")
+)
+
+# Webhooks
+WEBHOOK_DISPATCHES = registry.counter(
+    "webhook_dispatches_total", "Webhooks disparados", ("event", "status")
+)
+WEBHOOK_DURATION = registry.histogram(
+    "webhook_duration_seconds", "Latência dos webhooks", ("event",)
+)
+
+# Tarefas em segundo plano (app/background.py)
+BACKGROUND_QUEUE_LENGTH = registry.gauge(
+    "background_queue_length", "Tarefas aguardando na fila", ("queue",)
+)
+BACKGROUND_TASKS = registry.counter(
+    "background_tasks_total", "Tarefas em segundo plano por resultado", ("queue", "status")
+)
+BACKGROUND_TASK_WAIT = registry.histogram(
+    "background_task_wait_seconds", "Tempo entre enfileirar e iniciar a tarefa", ("queue",)
+)
+BACKGROUND_TASK_DURATION = registry.histogram(
+    "background_task_duration_seconds", "Duração da execução da tarefa", ("queue",)
+)
+
+# Caches (taxa de acerto = hit / (hit + miss))
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Consultas aos caches da aplicação", ("cache", "result")
+)
+
+# Réplica de leitura local (idade = time() - valor)
+REPLICA_LAST_SYNC = registry.gauge(
+    "replica_last_sync_timestamp_seconds", "Horário da última sincronização da réplica", ("table",)
+)
+
+# Logging
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total", "Registros de log descartados por fila cheia", ("level",),
+    thread_safe=True
+)
+
+# Event loop
+EVENT_LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "Atraso do event loop medido pela sonda periódica",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+EVENT_LOOP_STALLS = registry.counter(
+    "event_loop_stalls_total", "Callbacks que bloquearam o event loop acima do limite",
+    thread_safe=True
+)
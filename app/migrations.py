@@ -0,0 +1,336 @@
+# app/migrations.py
+
+"""
+Migrações versionadas do schema D1.
+
+No boot, uma única consulta a schema_version decide se há algo a aplicar.
+Cada migração precisa ser idempotente (IF NOT EXISTS, INSERT ... WHERE NOT
+EXISTS), porque vários workers podem aplicá-la ao mesmo tempo; o registro
+da versão usa INSERT OR IGNORE e o primeiro worker a concluir prevalece.
+"""
+
+import logging
+from typing import Awaitable, Callable, List, NamedTuple, Union
+
+from app.config import settings
+from app.d1_client import execute_sql
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    applied_at TEXT DEFAULT (datetime('now'))
+)
+"""
+
+# Tabela de usuários
+USERS_TABLE = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    phone TEXT NOT NULL,
+    document TEXT NOT NULL,
+    area TEXT,
+    cep TEXT,
+    address TEXT,
+    state TEXT,
+    city TEXT,
+    number_complement TEXT,
+    profile INTEGER DEFAULT 1,
+    password TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Tabela de preços (para dashboard financeiro)
+PRICES_TABLE = """
+CREATE TABLE IF NOT EXISTS prices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    close REAL NOT NULL,
+    volume INTEGER,
+    created_at TEXT DEFAULT (datetime('now')),
+    UNIQUE(symbol, date)
+)
+"""
+
+# Tabela de dados de precificação
+PRICING_DATA_TABLE = """
+CREATE TABLE IF NOT EXISTS pricing_data (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    business_type TEXT NOT NULL,
+    product_cost REAL NOT NULL,
+    shipping_insurance REAL DEFAULT 0,
+    icms_purchase_percent REAL DEFAULT 0,
+    ipi_percent REAL DEFAULT 0,
+    variable_expenses REAL DEFAULT 0,
+    fixed_expenses_percent REAL DEFAULT 0,
+    sale_taxes_percent REAL DEFAULT 0,
+    net_profit_percent REAL DEFAULT 0,
+    product_type TEXT,
+    tax_regime TEXT,
+    origin_state TEXT,
+    destination_state TEXT,
+    calculated_price REAL,
+    margin REAL,
+    created_at TEXT DEFAULT (datetime('now')),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+)
+"""
+
+# Tabela de análise competitiva
+COMPETITIVE_ANALYSIS_TABLE = """
+CREATE TABLE IF NOT EXISTS competitive_analysis (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    business_data TEXT NOT NULL,
+    products_data TEXT NOT NULL,
+    sales_history TEXT NOT NULL,
+    cost_structure TEXT NOT NULL,
+    suppliers_data TEXT NOT NULL,
+    analysis_results TEXT,
+    webhook_response TEXT,
+    status TEXT DEFAULT 'pending',
+    created_at TEXT DEFAULT (datetime('now')),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+)
+"""
+
+# Tabela de logs de webhook
+WEBHOOK_LOGS_TABLE = """
+CREATE TABLE IF NOT EXISTS webhook_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    webhook_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    response TEXT,
+    status_code INTEGER,
+    created_at TEXT DEFAULT (datetime('now'))
+)
+"""
+
+async def _seed_admin() -> dict:
+    """Cria o usuário admin padrão se ainda não existir"""
+    from app.services.auth import hash_password
+
+    return await execute_sql(
+        """
+        INSERT INTO users (email, password, name, profile, type, phone, document)
+        SELECT ?, ?, ?, 2, 'PF', '000000000', '00000000000'
+        WHERE NOT EXISTS (SELECT 1 FROM users WHERE email = ?)
+        """,
+        [settings.APP_ADMIN_MAIL, hash_password(settings.APP_ADMIN_PASS), "Administrador", settings.APP_ADMIN_MAIL]
+    )
+
+
+# Rastreamento de mudanças para réplicas de leitura (app/replica.py): cada
+# escrita em users recebe a próxima versão de replica_clock; exclusões deixam
+# uma lápide com a versão em que ocorreram.
+REPLICA_CLOCK_TABLE = """
+CREATE TABLE IF NOT EXISTS replica_clock (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+REPLICA_TOMBSTONES_TABLE = """
+CREATE TABLE IF NOT EXISTS replica_tombstones (
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    version INTEGER NOT NULL
+)
+"""
+
+USERS_VERSION_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS users_replica_insert AFTER INSERT ON users
+    BEGIN
+        UPDATE replica_clock SET version = version + 1 WHERE name = 'users';
+        UPDATE users SET row_version = (SELECT version FROM replica_clock WHERE name = 'users')
+        WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_replica_update AFTER UPDATE ON users
+    WHEN NEW.row_version = OLD.row_version
+    BEGIN
+        UPDATE replica_clock SET version = version + 1 WHERE name = 'users';
+        UPDATE users SET row_version = (SELECT version FROM replica_clock WHERE name = 'users')
+        WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_replica_delete AFTER DELETE ON users
+    BEGIN
+        UPDATE replica_clock SET version = version + 1 WHERE name = 'users';
+        INSERT INTO replica_tombstones (table_name, row_id, version)
+        VALUES ('users', OLD.id, (SELECT version FROM replica_clock WHERE name = 'users'));
+    END
+    """,
+]
+
+def _add_column(table: str, column: str, definition: str) -> Callable[[], Awaitable[dict]]:
+    """
+    ALTER TABLE não tem IF NOT EXISTS: o passo só adiciona a coluna se ela
+    ainda não existir. Outro worker pode adicioná-la entre a checagem e o
+    ALTER; "duplicate column name" conta então como sucesso.
+    """
+    async def step() -> dict:
+        result = await execute_sql(
+            f"SELECT 1 FROM pragma_table_info('{table}') WHERE name = ?", [column]
+        )
+        if not result.get("success") or result.get("results"):
+            return result
+        result = await execute_sql(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        error = str(result.get("error") or result.get("errors") or "")
+        if not result.get("success") and "duplicate column name" in error.lower():
+            return {"success": True, "results": [], "meta": {}}
+        return result
+    return step
+
+
+# Tombstones mais antigos que isso são apagados pelo próprio gatilho de exclusão.
+# replica_clock.pruned_version guarda a maior versão apagada: uma réplica que
+# ainda não passou dela perdeu exclusões e precisa de uma cópia completa.
+REPLICA_TOMBSTONE_RETENTION = 7 * 24 * 3600  # segundos
+
+_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+_EXPIRED_TOMBSTONES = (
+    f"table_name = 'users' AND (deleted_at IS NULL OR deleted_at < {_NOW} - {REPLICA_TOMBSTONE_RETENTION})"
+)
+
+USERS_DELETE_TRIGGER_WITH_RETENTION = f"""
+CREATE TRIGGER IF NOT EXISTS users_replica_delete AFTER DELETE ON users
+BEGIN
+    UPDATE replica_clock SET version = version + 1 WHERE name = 'users';
+    INSERT INTO replica_tombstones (table_name, row_id, version, deleted_at)
+    VALUES ('users', OLD.id, (SELECT version FROM replica_clock WHERE name = 'users'), {_NOW});
+    UPDATE replica_clock SET pruned_version = MAX(pruned_version, (
+        SELECT COALESCE(MAX(version), 0) FROM replica_tombstones WHERE {_EXPIRED_TOMBSTONES}
+    )) WHERE name = 'users';
+    DELETE FROM replica_tombstones WHERE {_EXPIRED_TOMBSTONES};
+END
+"""
+
+
+Step = Union[str, Callable[[], Awaitable[dict]]]
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    steps: List[Step]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "schema inicial", [
+        USERS_TABLE,
+        PRICES_TABLE,
+        PRICING_DATA_TABLE,
+        COMPETITIVE_ANALYSIS_TABLE,
+        WEBHOOK_LOGS_TABLE,
+    ]),
+    Migration(2, "usuário admin padrão", [_seed_admin]),
+    Migration(3, "índices de consultas por usuário e data", [
+        "CREATE INDEX IF NOT EXISTS idx_pricing_data_user_created ON pricing_data (user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_competitive_analysis_user ON competitive_analysis (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_webhook_logs_created ON webhook_logs (created_at)",
+    ]),
+    # Listagem paginada por status (keyset em id); a busca por prefixo usa o índice UNIQUE de email
+    Migration(4, "índice de usuários por perfil", [
+        "CREATE INDEX IF NOT EXISTS idx_users_profile ON users (profile)",
+    ]),
+    Migration(5, "versão de linha em users para réplicas de leitura", [
+        REPLICA_CLOCK_TABLE,
+        REPLICA_TOMBSTONES_TABLE,
+        "INSERT OR IGNORE INTO replica_clock (name, version) VALUES ('users', 0)",
+        _add_column("users", "row_version", "INTEGER NOT NULL DEFAULT 0"),
+        "CREATE INDEX IF NOT EXISTS idx_users_row_version ON users (row_version)",
+        "CREATE INDEX IF NOT EXISTS idx_replica_tombstones ON replica_tombstones (table_name, version)",
+        *USERS_VERSION_TRIGGERS,
+    ]),
+    Migration(6, "retenção dos tombstones da réplica de leitura", [
+        _add_column("replica_tombstones", "deleted_at", "INTEGER"),
+        _add_column("replica_clock", "pruned_version", "INTEGER NOT NULL DEFAULT 0"),
+        "CREATE INDEX IF NOT EXISTS idx_replica_tombstones_deleted ON replica_tombstones (table_name, deleted_at)",
+        "DROP TRIGGER IF EXISTS users_replica_delete",
+        USERS_DELETE_TRIGGER_WITH_RETENTION,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def _error_message(result: dict) -> str:
+    return str(result.get("error") or result.get("errors") or "")
+
+
+async def current_version() -> int:
+    """Versão aplicada do schema; 0 em um banco novo. Levanta RuntimeError se o D1 falhar."""
+    result = await execute_sql("SELECT MAX(version) AS version FROM schema_version")
+
+    if result.get("success"):
+        rows = result.get("results") or []
+        return (rows[0].get("version") or 0) if rows else 0
+
+    if "no such table" in _error_message(result):
+        return 0
+    raise RuntimeError(f"Não foi possível ler schema_version: {_error_message(result)}")
+
+
+async def _apply(migration: Migration) -> bool:
+    for step in migration.steps:
+        result = await (execute_sql(step) if isinstance(step, str) else step())
+        if not result.get("success"):
+            logger.error(
+                f"Migração {migration.version} ({migration.description}) falhou: {_error_message(result)}"
+            )
+            return False
+
+    await execute_sql(
+        "INSERT OR IGNORE INTO schema_version (version, description) VALUES (?, ?)",
+        [migration.version, migration.description]
+    )
+    logger.info(f"Migração {migration.version} aplicada: {migration.description}")
+    return True
+
+
+async def migrate() -> int:
+    """Aplica as migrações pendentes e retorna a versão final do schema"""
+    try:
+        version = await current_version()
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 0
+
+    if version >= LATEST_VERSION:
+        logger.info(f"Schema D1 em dia (versão {version})")
+        return version
+
+    if version == 0:
+        result = await execute_sql(SCHEMA_VERSION_TABLE)
+        if not result.get("success"):
+            logger.error(f"Erro ao criar schema_version: {_error_message(result)}")
+            return 0
+
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        if not await _apply(migration):
+            break
+        version = migration.version
+
+    logger.info(f"Banco de dados na versão {version}")
+    return version
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+
+    sys.exit(0 if asyncio.run(migrate()) >= LATEST_VERSION else 1)
@@ -1,7 +1,7 @@
 # app/models/user.py
 
-from pydantic import BaseModel, EmailStr, field_validator, model_validator
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -64,3 +64,18 @@ class TokenData(BaseModel):
     email: Optional[str] = None
     user_id: Optional[int] = None
     is_admin: Optional[bool] = False
+
+class UserSummary(BaseModel):
+    id: int
+    email: str
+    name: Optional[str] = None
+    type: Optional[str] = None
+    profile: int
+    created_at: Optional[str] = None
+
+class UserPage(BaseModel):
+    users: List[UserSummary]
+    next_cursor: Optional[str] = None
+
+class UserIdsRequest(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=1000)
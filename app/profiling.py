@@ -0,0 +1,194 @@
+# app/profiling.py
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Nada aqui roda em segundo plano: cada captura começa e termina dentro da
+# requisição que a pediu, então o custo com o profiler ocioso é zero.
+
+_CWD = os.getcwd() + os.sep
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_CWD):
+        return filename[len(_CWD):]
+    marker = "site-packages" + os.sep
+    index = filename.find(marker)
+    return filename[index + len(marker):] if index >= 0 else filename
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def folded(stacks: Counter) -> str:
+    """Formato "pilha;colapsada peso" (flamegraph.pl, speedscope, inferno)"""
+    return "\n".join(f"{stack} {weight}" for stack, weight in stacks.most_common()) + "\n"
+
+
+class SamplingProfiler:
+    """
+    Amostra a pilha de uma thread (a do event loop) a cada `interval` segundos
+    a partir de uma thread auxiliar, sem instrumentar o código.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+async def profile_cpu(seconds: float, interval: float = 0.005) -> SamplingProfiler:
+    """Perfil de CPU do event loop durante `seconds`"""
+    profiler = SamplingProfiler(threading.get_ident(), interval)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    return profiler
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Captura os avisos "Executing <Handle ...> took X seconds" do modo debug do asyncio"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        if message.startswith("Executing"):
+            self.messages.append(message)
+
+
+async def profile_loop(seconds: float, slow_callback: float = 0.1, probe_interval: float = 0.01) -> Dict:
+    """
+    Atraso do event loop medido por uma sonda (sleep de probe_interval) e
+    callbacks mais lentos que slow_callback, via modo debug do asyncio só
+    durante a captura.
+    """
+    loop = asyncio.get_running_loop()
+    asyncio_logger = logging.getLogger("asyncio")
+    handler = _SlowCallbackHandler()
+
+    previous_debug = loop.get_debug()
+    previous_threshold = loop.slow_callback_duration
+    previous_level = asyncio_logger.level
+    loop.slow_callback_duration = slow_callback
+    loop.set_debug(True)
+    asyncio_logger.addHandler(handler)
+    if asyncio_logger.getEffectiveLevel() > logging.WARNING:
+        asyncio_logger.setLevel(logging.WARNING)
+
+    lags: List[float] = []
+    try:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(probe_interval)
+            lags.append(max(0.0, time.perf_counter() - start - probe_interval))
+    finally:
+        loop.set_debug(previous_debug)
+        loop.slow_callback_duration = previous_threshold
+        asyncio_logger.removeHandler(handler)
+        asyncio_logger.setLevel(previous_level)
+
+    lags.sort()
+    return {
+        "seconds": seconds,
+        "probes": len(lags),
+        "lag_ms": {
+            "p50": _percentile(lags, 50) * 1000,
+            "p99": _percentile(lags, 99) * 1000,
+            "max": _percentile(lags, 100) * 1000,
+        },
+        "slow_callback_ms": slow_callback * 1000,
+        "slow_callbacks": handler.messages,
+    }
+
+
+async def profile_memory(seconds: float, top: int = 25, frames: int = 16) -> Dict:
+    """
+    Alocações feitas durante `seconds` (tracemalloc ligado só na janela).
+    Retorna as linhas que mais alocaram e as pilhas em formato colapsado.
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start(frames)
+    try:
+        # Snapshot e comparação percorrem todo o heap: ficam fora do event loop
+        baseline = await asyncio.to_thread(tracemalloc.take_snapshot)
+        await asyncio.sleep(seconds)
+        snapshot = await asyncio.to_thread(tracemalloc.take_snapshot)
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    top_lines, stacks = await asyncio.to_thread(_compare_snapshots, baseline, snapshot, top)
+    return {"seconds": seconds, "top": top_lines, "stacks": stacks}
+
+
+def _compare_snapshots(baseline, snapshot, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    snapshot = snapshot.filter_traces(ignore)
+    baseline = baseline.filter_traces(ignore)
+
+    top_lines = [
+        {
+            "location": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count_diff,
+        }
+        for stat in snapshot.compare_to(baseline, "lineno")[:top]
+        if stat.size_diff > 0
+    ]
+
+    stacks: Counter = Counter()
+    for stat in snapshot.compare_to(baseline, "traceback"):
+        if stat.size_diff <= 0:
+            continue
+        stack = ";".join(
+            f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback
+        )
+        stacks[stack] += stat.size_diff
+
+    return top_lines, stacks
@@ -1,12 +1,49 @@
 # app/rate_limit.py
 
-import redis.asyncio as redis
-from typing import Optional, Tuple
+from typing import Optional, Tuple, TYPE_CHECKING
+import functools
+import inspect
 import time
 from app.config import settings
+from app.metrics import REDIS_OPERATIONS
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
+class InstrumentedRedis:
+    """Proxy que contabiliza os comandos enviados ao cliente Redis (real ou mock)"""
+    def __init__(self, client):
+        self._client = client
+    
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        
+        # Os comandos do redis.asyncio são funções comuns que retornam awaitables
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return self._track(name, result)
+            return result
+        
+        # Cachear o wrapper para as próximas chamadas
+        setattr(self, name, wrapper)
+        return wrapper
+    
+    @staticmethod
+    async def _track(name, awaitable):
+        try:
+            result = await awaitable
+        except Exception:
+            REDIS_OPERATIONS.inc(name, "error")
+            raise
+        REDIS_OPERATIONS.inc(name, "ok")
+        return result
 
 class RateLimiter:
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: "redis.Redis"):
         self.redis = redis_client
     
     async def check_login_limit(self, identifier: str, max_attempts: int = None, window: int = None) -> Tuple[bool, Optional[int]]:
@@ -74,8 +111,10 @@ class RateLimiter:
         
         return True, None
 
-async def init_redis() -> redis.Redis:
+async def init_redis() -> "redis.Redis":
     """Inicializa conexão Redis"""
+    import redis.asyncio as redis
+    
     try:
         redis_client = redis.from_url(
             settings.REDIS_URL,
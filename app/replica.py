@@ -0,0 +1,237 @@
+# app/replica.py
+
+"""
+Réplica de leitura local (SQLite embutido) das tabelas quentes do D1.
+
+As tabelas de REPLICATED_TABLES são copiadas por inteiro na primeira
+sincronização e depois atualizadas a cada REPLICA_REFRESH_INTERVAL pelo
+rastreamento de mudanças das migrações 5 e 6 (row_version + replica_tombstones,
+com retenção limitada: uma réplica mais atrasada que ela é copiada de novo).
+Uma leitura designada só é servida localmente enquanto a última sincronização
+da tabela tiver no máximo REPLICA_MAX_STALENESS segundos; fora disso, ou se a
+linha não estiver na réplica, vai ao D1. Escritas continuam indo ao D1 e
+apagam as linhas locais (em todos os workers, via cache_bus) até a próxima
+sincronização trazer a versão nova.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.d1_client import execute_sql
+from app.metrics import CACHE_REQUESTS, REPLICA_LAST_SYNC
+from app.utils.cache_bus import cache_bus
+
+logger = logging.getLogger(__name__)
+
+SYNC_BATCH = 500
+
+
+class ReplicatedTable(NamedTuple):
+    name: str
+    key: str = "id"
+    lookups: Tuple[str, ...] = ()  # colunas consultadas por igualdade (ganham índice local)
+
+
+# Tabelas com row_version e gatilhos de rastreamento no D1
+REPLICATED_TABLES: Dict[str, ReplicatedTable] = {
+    "users": ReplicatedTable("users", lookups=("email",)),
+}
+
+
+async def _query(sql: str, params: Optional[List] = None) -> List[Dict[str, Any]]:
+    result = await execute_sql(sql, params)
+    if not result.get("success"):
+        raise RuntimeError(result.get("error") or result.get("errors") or "erro no D1")
+    return result.get("results") or []
+
+
+class ReadReplica:
+    def __init__(self, tables: Dict[str, ReplicatedTable] = REPLICATED_TABLES):
+        self.tables = tables
+        self.conn: Optional[sqlite3.Connection] = None
+        self.versions: Dict[str, int] = {}
+        self.synced_at: Dict[str, float] = {}
+        self._refresher: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.conn is not None
+
+    async def start(self, path: str = ":memory:", refresh_interval: float = 2.0) -> None:
+        """Abre o SQLite local, faz a cópia inicial e agenda as sincronizações"""
+        path = path.format(pid=os.getpid())
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            # A réplica de users contém hashes de senha
+            os.chmod(path, 0o600)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+
+        await self.sync_all()
+        self._refresher = asyncio.create_task(self._refresh_loop(refresh_interval))
+        logger.info(f"Réplica de leitura ativa para {', '.join(self.tables)} em {path}")
+
+    async def stop(self) -> None:
+        if self._refresher:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._refresher = None
+
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        self.versions.clear()
+        self.synced_at.clear()
+
+    async def sync_all(self) -> None:
+        for name in self.tables:
+            try:
+                await self.sync(name)
+            except Exception as e:
+                logger.warning(f"Falha ao sincronizar a réplica de {name}: {e}")
+
+    async def sync(self, name: str) -> int:
+        """Aplica as mudanças desde a última versão (cópia completa na primeira vez)"""
+        table = self.tables[name]
+        # O relógio é lido antes dos dados: o que mudar durante a cópia vem na próxima
+        rows = await _query("SELECT version, pruned_version FROM replica_clock WHERE name = ?", [name])
+        clock = rows[0]["version"] if rows else 0
+        pruned = rows[0]["pruned_version"] if rows else 0
+
+        if name in self.versions and self.versions[name] >= pruned:
+            applied = await self._pull(table, self.versions[name], clock)
+        else:
+            if name in self.versions:
+                # Exclusões desde a última sincronização já saíram da retenção
+                logger.warning(f"Réplica de {name} atrás da retenção de tombstones, copiando de novo")
+            applied = await self._snapshot(table)
+
+        self.versions[name] = clock
+        self.synced_at[name] = time.monotonic()
+        REPLICA_LAST_SYNC.set(time.time(), name)
+        return applied
+
+    async def _snapshot(self, table: ReplicatedTable) -> int:
+        columns = [row["name"] for row in await _query(f"SELECT name FROM pragma_table_info('{table.name}')")]
+        if not columns:
+            raise RuntimeError(f"tabela {table.name} não existe no D1")
+
+        self.conn.execute(f"DROP TABLE IF EXISTS {table.name}")
+        self.conn.execute(
+            f"CREATE TABLE {table.name} ({', '.join(columns)}, PRIMARY KEY ({table.key}))"
+        )
+        for column in table.lookups:
+            self.conn.execute(f"CREATE INDEX idx_{table.name}_{column} ON {table.name} ({column})")
+
+        copied, last_key = 0, None
+        while True:
+            where = f"WHERE {table.key} > ?" if last_key is not None else ""
+            params = [last_key] if last_key is not None else []
+            rows = await _query(
+                f"SELECT * FROM {table.name} {where} ORDER BY {table.key} LIMIT ?",
+                [*params, SYNC_BATCH]
+            )
+            self._upsert(table, rows)
+            copied += len(rows)
+            if len(rows) < SYNC_BATCH:
+                break
+            last_key = rows[-1][table.key]
+
+        self.conn.commit()
+        return copied
+
+    async def _pull(self, table: ReplicatedTable, since: int, until: int) -> int:
+        if until <= since:
+            return 0
+
+        applied, cursor = 0, since
+        while True:
+            rows = await _query(
+                f"SELECT * FROM {table.name} WHERE row_version > ? AND row_version <= ? "
+                f"ORDER BY row_version LIMIT ?",
+                [cursor, until, SYNC_BATCH]
+            )
+            self._upsert(table, rows)
+            applied += len(rows)
+            if len(rows) < SYNC_BATCH:
+                break
+            cursor = rows[-1]["row_version"]
+
+        tombstones = await _query(
+            "SELECT row_id FROM replica_tombstones WHERE table_name = ? AND version > ? AND version <= ?",
+            [table.name, since, until]
+        )
+        if tombstones:
+            self.conn.executemany(
+                f"DELETE FROM {table.name} WHERE {table.key} = ?",
+                [(row["row_id"],) for row in tombstones]
+            )
+            applied += len(tombstones)
+
+        self.conn.commit()
+        return applied
+
+    def _upsert(self, table: ReplicatedTable, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        columns = list(rows[0])
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {table.name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['?'] * len(columns))})",
+            [[row[c] for c in columns] for row in rows]
+        )
+
+    async def _refresh_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.sync_all()
+
+    def lookup(self, name: str, column: str, value: Any) -> Optional[Dict[str, Any]]:
+        """
+        Linha local com column = value, ou None quando a leitura deve ir ao D1
+        (réplica desligada ou defasada, ou linha ausente/invalidada).
+        """
+        table = self.tables.get(name)
+        synced_at = self.synced_at.get(name)
+        if self.conn is None or table is None or synced_at is None:
+            return None
+        if column != table.key and column not in table.lookups:
+            raise ValueError(f"{name}.{column} não é uma coluna de consulta da réplica")
+
+        if time.monotonic() - synced_at > settings.REPLICA_MAX_STALENESS:
+            CACHE_REQUESTS.inc(f"replica_{name}", "stale")
+            return None
+
+        row = self.conn.execute(
+            f"SELECT * FROM {name} WHERE {column} = ? LIMIT 1", [value]
+        ).fetchone()
+        CACHE_REQUESTS.inc(f"replica_{name}", "hit" if row is not None else "miss")
+        return dict(row) if row is not None else None
+
+    def invalidate(self, table: str, keys: Sequence[Any]) -> int:
+        """Remove as linhas locais (após escrita no D1) até a próxima sincronização"""
+        spec = self.tables.get(table)
+        if self.conn is None or spec is None or table not in self.synced_at:
+            return 0
+        cursor = self.conn.executemany(
+            f"DELETE FROM {table} WHERE {spec.key} = ?", [(key,) for key in keys]
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+
+# Instância global
+read_replica = ReadReplica()
+
+# Escritas feitas em outros workers também apagam as linhas locais
+cache_bus.register("replica", read_replica.invalidate)
@@ -0,0 +1,142 @@
+# app/repositories/named_queries.py
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.d1_client import execute_sql
+from app.utils.cache_bus import cache_bus
+from app.utils.ttl_cache import TTLCache
+
+
+class QueryParamError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class QueryParam:
+    name: str
+    type: type = str
+    default: Any = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    normalize: Optional[Callable[[Any], Any]] = None  # aplicado após a conversão de tipo
+
+    def coerce(self, raw: Any) -> Any:
+        if raw is None:
+            if self.default is None:
+                raise QueryParamError(f"Parâmetro obrigatório: {self.name}")
+            return self.default
+
+        try:
+            value = self.type(raw)
+        except (TypeError, ValueError, OverflowError):
+            # OverflowError: {"limit": 1e999} chega do JSON como inf
+            raise QueryParamError(f"Parâmetro inválido: {self.name}")
+        if self.normalize is not None:
+            value = self.normalize(value)
+
+        if self.minimum is not None and value < self.minimum:
+            raise QueryParamError(f"{self.name} deve ser >= {self.minimum}")
+        if self.maximum is not None and value > self.maximum:
+            raise QueryParamError(f"{self.name} deve ser <= {self.maximum}")
+        return value
+
+
+@dataclass(frozen=True)
+class NamedQuery:
+    """
+    Consulta revisada exposta ao frontend. Com user_scoped, o user_id do token
+    é sempre o primeiro parâmetro da SQL (nunca vem do cliente).
+    cache_ttl=0 desativa o cache.
+    """
+    sql: str
+    params: Tuple[QueryParam, ...] = ()
+    user_scoped: bool = True
+    cache_ttl: int = 0
+
+
+NAMED_QUERIES: Dict[str, NamedQuery] = {
+    "pricing.recent": NamedQuery(
+        """
+        SELECT id, business_type, product_cost, calculated_price, margin, created_at
+        FROM pricing_data WHERE user_id = ?
+        ORDER BY created_at DESC LIMIT ?
+        """,
+        params=(QueryParam("limit", int, default=5, minimum=1, maximum=100),),
+        cache_ttl=30
+    ),
+    "pricing.summary": NamedQuery(
+        """
+        SELECT COUNT(*) AS total, AVG(margin) AS avg_margin,
+               AVG(calculated_price) AS avg_price, MAX(created_at) AS last_calculation
+        FROM pricing_data WHERE user_id = ?
+        """,
+        cache_ttl=60
+    ),
+    "analysis.recent": NamedQuery(
+        """
+        SELECT id, status, created_at
+        FROM competitive_analysis WHERE user_id = ?
+        ORDER BY created_at DESC LIMIT ?
+        """,
+        params=(QueryParam("limit", int, default=5, minimum=1, maximum=50),),
+        cache_ttl=30
+    ),
+    "prices.latest": NamedQuery(
+        """
+        SELECT symbol, date, close, volume
+        FROM prices WHERE symbol = ?
+        ORDER BY date DESC LIMIT 1
+        """,
+        # prices guarda os símbolos em maiúsculas
+        params=(QueryParam("symbol", str, normalize=str.upper),),
+        user_scoped=False,
+        cache_ttl=300
+    ),
+}
+
+# Resultados por (query_id, user_id, parâmetros)
+query_cache = TTLCache("named_queries")
+
+
+class NamedQueryRepository:
+    @staticmethod
+    def bind(query: NamedQuery, user_id: int, raw_params: Dict[str, Any]) -> List[Any]:
+        unknown = set(raw_params) - {p.name for p in query.params}
+        if unknown:
+            raise QueryParamError(f"Parâmetros desconhecidos: {', '.join(sorted(unknown))}")
+
+        values = [param.coerce(raw_params.get(param.name)) for param in query.params]
+        return [user_id, *values] if query.user_scoped else values
+
+    @staticmethod
+    async def run(query_id: str, user_id: int, raw_params: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa a consulta nomeada com no máximo uma chamada ao D1 (nenhuma em cache hit)"""
+        query = NAMED_QUERIES[query_id]
+        params = NamedQueryRepository.bind(query, user_id, raw_params)
+
+        cache_key = (query_id, user_id if query.user_scoped else None, tuple(params))
+        if query.cache_ttl:
+            cached = query_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        result = await execute_sql(query.sql, params, coalesce=True)
+        if not result.get("success"):
+            return {"success": False, "error": "Erro ao executar consulta"}
+
+        response = {"success": True, "results": result.get("results", [])}
+        if query.cache_ttl:
+            query_cache.set(cache_key, response, query.cache_ttl)
+        return response
+
+    @staticmethod
+    def invalidate_user(user_id: int, prefix: str = "") -> int:
+        """Descarta resultados em cache do usuário (ex.: após gravar um cálculo)"""
+        return query_cache.invalidate(
+            lambda key: key[1] == user_id and key[0].startswith(prefix)
+        )
+
+
+# Cálculos gravados por outros workers também invalidam o cache deste
+cache_bus.register("named_queries", NamedQueryRepository.invalidate_user)
@@ -1,5 +1,133 @@
 # app/repositories/prices.py
-# Placeholder for PricesRepository
+
+import logging
+from typing import Dict, List, Optional, Sequence
+from app.d1_client import execute_sql, D1_MAX_PARAMS
+
+logger = logging.getLogger(__name__)
+
+BAR_COLUMNS = 4  # symbol, date, close, volume
+UPSERT_BATCH_SIZE = D1_MAX_PARAMS // BAR_COLUMNS
+RANGE_BATCH_SIZE = D1_MAX_PARAMS - 2  # símbolos por consulta, deixando espaço para as datas
+
+
+class PricesQueryError(Exception):
+    """Consulta de preços falhou no D1 (distinto de um intervalo sem barras)"""
 
 class PricesRepository:
-    pass
+    """
+    Séries diárias de preços. As consultas por símbolo e intervalo de datas
+    usam o índice criado pelo UNIQUE(symbol, date) da tabela prices.
+    """
+
+    @staticmethod
+    async def bulk_upsert(bars: Sequence[dict]) -> int:
+        """
+        Insere ou atualiza barras diárias em statements multi-row e retorna
+        quantas foram gravadas. Um lote que falha não interrompe os demais,
+        mas no fim levanta PricesQueryError com os símbolos afetados.
+        """
+        written = 0
+        failed: Dict[str, None] = {}
+        errors = []
+
+        for start in range(0, len(bars), UPSERT_BATCH_SIZE):
+            batch = bars[start:start + UPSERT_BATCH_SIZE]
+            placeholders = ", ".join(["(?, ?, ?, ?)"] * len(batch))
+            sql = f"""
+            INSERT INTO prices (symbol, date, close, volume)
+            VALUES {placeholders}
+            ON CONFLICT(symbol, date) DO UPDATE SET
+                close = excluded.close,
+                volume = excluded.volume
+            """
+
+            params = []
+            for bar in batch:
+                params.extend([
+                    bar["symbol"].upper(),
+                    bar["date"],
+                    float(bar["close"]),
+                    bar.get("volume")
+                ])
+
+            result = await execute_sql(sql, params)
+            if result.get("success"):
+                written += len(batch)
+            else:
+                errors.append(result.get("error") or result.get("errors"))
+                failed.update(dict.fromkeys(bar["symbol"].upper() for bar in batch))
+
+        if failed:
+            raise PricesQueryError(
+                f"{len(bars) - written} barras não gravadas ({', '.join(failed)}): {errors[0]}"
+            )
+        return written
+
+    @staticmethod
+    async def get_range(
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[dict]:
+        """Barras de um símbolo em ordem cronológica, opcionalmente limitadas por data (YYYY-MM-DD)"""
+        ranges = await PricesRepository.get_ranges([symbol], start_date, end_date)
+        return ranges.get(symbol.upper(), [])
+
+    @staticmethod
+    async def get_ranges(
+        symbols: Sequence[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict[str, List[dict]]:
+        """
+        Barras de vários símbolos agrupadas por símbolo, em consultas com
+        IN (...) dentro do limite de parâmetros do D1. Levanta
+        PricesQueryError se algum lote falhar.
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        if not symbols:
+            return {}
+
+        date_conditions, date_params = [], []
+        if start_date:
+            date_conditions.append("date >= ?")
+            date_params.append(start_date)
+        if end_date:
+            date_conditions.append("date <= ?")
+            date_params.append(end_date)
+
+        grouped: Dict[str, List[dict]] = {symbol: [] for symbol in symbols}
+
+        for start in range(0, len(symbols), RANGE_BATCH_SIZE):
+            batch = symbols[start:start + RANGE_BATCH_SIZE]
+            conditions = [f"symbol IN ({', '.join(['?'] * len(batch))})", *date_conditions]
+
+            result = await execute_sql(
+                f"""
+                SELECT symbol, date, close, volume FROM prices
+                WHERE {' AND '.join(conditions)}
+                ORDER BY symbol, date
+                """,
+                [*batch, *date_params],
+                coalesce=True
+            )
+            if not result.get("success"):
+                raise PricesQueryError(result.get("error") or result.get("errors") or "erro no D1")
+
+            for row in result.get("results") or []:
+                grouped.setdefault(row["symbol"], []).append(row)
+
+        return grouped
+
+    @staticmethod
+    async def get_latest_date(symbol: str) -> Optional[str]:
+        result = await execute_sql(
+            "SELECT MAX(date) AS date FROM prices WHERE symbol = ?",
+            [symbol.upper()],
+            coalesce=True
+        )
+
+        if result.get("success") and result.get("results"):
+            return result["results"][0].get("date")
+        return None
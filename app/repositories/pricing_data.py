@@ -52,7 +52,8 @@ class PricingDataRepository:
             ORDER BY created_at DESC 
             LIMIT ?
             """,
-            [user_id, limit]
+            [user_id, limit],
+            coalesce=True
         )
         
         if result.get("success") and result.get("results"):
@@ -68,7 +69,7 @@ class PricingDataRepository:
             sql = "SELECT * FROM pricing_data WHERE id = ?"
             params = [calc_id]
         
-        result = await execute_sql(sql, params)
+        result = await execute_sql(sql, params, coalesce=True)
         
         if result.get("success") and result.get("results"):
             return result["results"][0]
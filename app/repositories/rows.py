@@ -0,0 +1,61 @@
+# app/repositories/rows.py
+
+from typing import Any, Dict, Optional, Tuple
+
+
+class Row:
+    """
+    Linha do D1 como objeto leve (__slots__, sem validação) para uso interno
+    dos repositórios. Os modelos Pydantic ficam só na fronteira da API, que
+    os valida a partir dos atributos (from_attributes).
+
+    FIELDS reúne os __slots__ da hierarquia e define a projeção do SELECT.
+    """
+    __slots__ = ()
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            for name in klass.__dict__.get("__slots__", ()):
+                if name not in fields:
+                    fields.append(name)
+        cls.FIELDS = tuple(fields)
+
+    @classmethod
+    def columns(cls) -> str:
+        return ", ".join(cls.FIELDS)
+
+    @classmethod
+    def from_row(cls, data: Dict[str, Any]):
+        row = object.__new__(cls)
+        for name in cls.FIELDS:
+            setattr(row, name, data.get(name))
+        return row
+
+    @classmethod
+    def first(cls, result: dict) -> Optional["Row"]:
+        """Primeira linha de um resultado do execute_sql, ou None"""
+        if result.get("success") and result.get("results"):
+            return cls.from_row(result["results"][0])
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+
+class UserRow(Row):
+    """Colunas de users usadas pela aplicação (sem endereço)"""
+    __slots__ = ("id", "email", "password", "profile", "name", "phone", "document", "type", "created_at")
+
+    @property
+    def is_admin(self) -> bool:
+        return self.profile == 2
+
+    @property
+    def is_approved(self) -> bool:
+        return True  # Frontend não tem is_approved, auto-aprova
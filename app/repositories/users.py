@@ -1,34 +1,61 @@
 # app/repositories/users.py
 
-from typing import Optional, List
+import base64
+import json
+from typing import Optional, List, Sequence, Tuple
 from datetime import datetime
-from app.d1_client import execute_sql
-from app.models.user import UserInDB
+from app.d1_client import execute_sql, D1_MAX_PARAMS
+from app.replica import read_replica
+from app.repositories.rows import UserRow
+from app.utils.cache_bus import cache_bus
+
+# Colunas da listagem administrativa (nunca a senha)
+USER_SUMMARY_COLUMNS = "id, email, name, type, profile, created_at"
+
+# Limite superior do intervalo de um prefixo: prefixo + maior code point
+PREFIX_UPPER_BOUND = "\U0010ffff"
+
+class UsersQueryError(Exception):
+    """Consulta ou escrita administrativa falhou no D1 (distinto de "nenhum usuário")"""
 
 class UserRepository:
     @staticmethod
-    async def get_by_email(email: str) -> Optional[UserInDB]:
+    async def get_by_email(email: str) -> Optional[UserRow]:
+        local = read_replica.lookup("users", "email", email)
+        if local is not None:
+            return UserRow.from_row(local)
+        
         result = await execute_sql(
-            "SELECT * FROM users WHERE email = ?",
-            [email]
+            f"SELECT {UserRow.columns()} FROM users WHERE email = ?",
+            [email],
+            coalesce=True
         )
-        
-        if result.get("success") and result.get("results"):
-            user_data = result["results"][0]
-            return UserInDB(**user_data)
-        return None
+        return UserRow.first(result)
     
     @staticmethod
-    async def get_by_id(user_id: int) -> Optional[UserInDB]:
+    async def get_by_id(user_id: int) -> Optional[UserRow]:
+        local = read_replica.lookup("users", "id", user_id)
+        if local is not None:
+            return UserRow.from_row(local)
+        
         result = await execute_sql(
-            "SELECT * FROM users WHERE id = ?",
-            [user_id]
+            f"SELECT {UserRow.columns()} FROM users WHERE id = ?",
+            [user_id],
+            coalesce=True
         )
+        return UserRow.first(result)
+    
+    @staticmethod
+    async def email_exists(email: str) -> bool:
+        if read_replica.lookup("users", "email", email) is not None:
+            return True
         
-        if result.get("success") and result.get("results"):
-            user_data = result["results"][0]
-            return UserInDB(**user_data)
-        return None
+        result = await execute_sql(
+            "SELECT 1 FROM users WHERE email = ? LIMIT 1",
+            [email],
+            coalesce=True
+        )
+        return bool(result.get("success") and result.get("results"))
     
     @staticmethod
     async def create(user_data: dict) -> Optional[int]:
@@ -63,41 +90,118 @@ class UserRepository:
         # )
     
     @staticmethod
-    async def get_pending_approvals() -> List[UserInDB]:
+    async def list_users(
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        email_prefix: Optional[str] = None,
+        pending_only: bool = False
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Página de usuários (sem a senha) e o cursor da próxima página.
+
+        Sem busca, a paginação é por id decrescente (keyset, sem OFFSET); com
+        email_prefix, por email crescente dentro do intervalo do prefixo, que
+        usa o índice UNIQUE de email. Cursor inválido levanta ValueError;
+        falha no D1 levanta UsersQueryError.
+        """
+        conditions = []
+        params: list = []
+        
+        if pending_only:
+            conditions.append("profile = 0")
+        
+        if email_prefix:
+            conditions.append("email >= ? AND email < ?")
+            params.extend([email_prefix, email_prefix + PREFIX_UPPER_BOUND])
+            order_by = "email ASC"
+            if cursor:
+                conditions.append("email > ?")
+                params.append(_decode_cursor(cursor, str))
+        else:
+            order_by = "id DESC"
+            if cursor:
+                conditions.append("id < ?")
+                params.append(_decode_cursor(cursor, int))
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit + 1)
+        
         result = await execute_sql(
-            "SELECT * FROM users WHERE profile = 0 ORDER BY created_at DESC"
+            f"SELECT {USER_SUMMARY_COLUMNS} FROM users {where} ORDER BY {order_by} LIMIT ?",
+            params,
+            coalesce=True
         )
         
-        users = []
-        if result.get("success") and result.get("results"):
-            for user_data in result["results"]:
-                users.append(UserInDB(**user_data))
-        return users
+        if not result.get("success"):
+            raise UsersQueryError(result.get("error") or result.get("errors") or "erro no D1")
+        
+        rows = result.get("results") or []
+        if len(rows) <= limit:
+            return rows, None
+        
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, _encode_cursor(last["email"] if email_prefix else last["id"])
     
     @staticmethod
-    async def approve_user(user_id: int) -> bool:
-        result = await execute_sql(
-            "UPDATE users SET profile = 1 WHERE id = ?",
-            [user_id]
+    async def approve_users(user_ids: Sequence[int]) -> int:
+        """Aprova usuários pendentes em lotes; retorna quantos foram alterados"""
+        return await _batched(
+            "UPDATE users SET profile = 1 WHERE profile = 0 AND id IN ({ids})", user_ids
         )
-        return result.get("success", False)
     
     @staticmethod
-    async def reject_user(user_id: int) -> bool:
-        result = await execute_sql(
-            "DELETE FROM users WHERE id = ? AND profile != 2",
-            [user_id]
+    async def reject_users(user_ids: Sequence[int]) -> int:
+        """Remove usuários (nunca administradores) em lotes; retorna quantos foram removidos"""
+        return await _batched(
+            "DELETE FROM users WHERE profile != 2 AND id IN ({ids})", user_ids
         )
-        return result.get("success", False)
     
     @staticmethod
-    async def get_all_users() -> List[UserInDB]:
+    async def approve_user(user_id: int) -> bool:
+        return await UserRepository.approve_users([user_id]) > 0
+    
+    @staticmethod
+    async def reject_user(user_id: int) -> bool:
+        return await UserRepository.reject_users([user_id]) > 0
+
+
+async def _batched(sql_template: str, user_ids: Sequence[int]) -> int:
+    """
+    Executa o statement com IN (...) em lotes dentro do limite de parâmetros
+    do D1. Se um lote falhar, os seguintes não são enviados e UsersQueryError
+    informa quantas linhas os anteriores já alteraram.
+    """
+    ids = list(dict.fromkeys(int(i) for i in user_ids))
+    changed = 0
+    error = None
+    
+    for start in range(0, len(ids), D1_MAX_PARAMS):
+        batch = ids[start:start + D1_MAX_PARAMS]
         result = await execute_sql(
-            "SELECT * FROM users ORDER BY created_at DESC"
+            sql_template.format(ids=", ".join(["?"] * len(batch))),
+            batch
         )
-        
-        users = []
-        if result.get("success") and result.get("results"):
-            for user_data in result["results"]:
-                users.append(UserInDB(**user_data))
-        return users
+        if not result.get("success"):
+            error = result.get("error") or result.get("errors") or "erro no D1"
+            break
+        changed += result.get("meta", {}).get("changes", 0)
+    
+    # Réplicas de leitura: as linhas alteradas passam a ser lidas do D1
+    if changed:
+        await cache_bus.invalidate("replica", table="users", keys=ids)
+    if error is not None:
+        raise UsersQueryError(f"{error} ({changed} usuários alterados antes da falha)")
+    return changed
+
+def _encode_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, expected: type):
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+    if not isinstance(value, expected) or isinstance(value, bool):
+        raise ValueError("Cursor inválido")
+    return value
@@ -0,0 +1,158 @@
+# app/resilience.py
+
+"""
+Prazo por requisição, backoff com jitter, circuit breaker e hedge para
+chamadas a serviços remotos (D1).
+
+O prazo vive num ContextVar: o middleware HTTP define o limite total da
+requisição e cada chamada remota usa como timeout o menor entre o seu próprio
+limite e o que ainda resta, então uma dependência lenta nunca segura a
+requisição além do prazo.
+"""
+
+import asyncio
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app.metrics import CIRCUIT_BREAKER_REJECTED, CIRCUIT_BREAKER_STATE, CIRCUIT_BREAKER_TRANSITIONS
+
+T = TypeVar("T")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Limita o tempo restante do contexto atual (nunca estende um prazo já definido)"""
+    current = _deadline.get()
+    candidate = time.monotonic() + seconds
+    token = _deadline.set(candidate if current is None else min(current, candidate))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(limit: float = float("inf")) -> float:
+    """Segundos disponíveis: o menor entre `limit` e o prazo da requisição"""
+    current = _deadline.get()
+    if current is None:
+        return limit
+    return min(limit, current - time.monotonic())
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """Backoff exponencial com jitter completo: uniforme(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Abre após `failure_threshold` falhas consecutivas e rejeita chamadas por
+    `recovery_time` segundos. Depois disso fica semiaberto: até
+    `half_open_max_calls` chamadas de teste passam; sucesso fecha o circuito,
+    falha o reabre.
+
+    Cada chamada liberada por allow() termina em exatamente um de
+    record_success(), record_failure() ou release() (sem resultado, ex.: cancelada).
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_time: float = 10.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.half_open_max_calls = half_open_max_calls
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        CIRCUIT_BREAKER_STATE.set(0, name)
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_time:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        self._state = state
+        self._probes = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        CIRCUIT_BREAKER_STATE.set(self._STATE_VALUES[state], self.name)
+        CIRCUIT_BREAKER_TRANSITIONS.inc(self.name, state)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        CIRCUIT_BREAKER_REJECTED.inc(self.name)
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._transition(self.OPEN)
+
+    def release(self) -> None:
+        if self._state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def reset(self) -> None:
+        self.failures = 0
+        self._transition(self.CLOSED)
+
+
+async def hedged(call: Callable[[], Awaitable[T]], delay: float,
+                 on_hedge: Optional[Callable[[], None]] = None) -> T:
+    """
+    Executa `call`; se não terminar em `delay` segundos, dispara uma cópia e
+    fica com o primeiro resultado bem-sucedido. A outra é cancelada. Só para
+    operações idempotentes (leituras).
+    """
+    first = asyncio.ensure_future(call())
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result()
+
+        if on_hedge is not None:
+            on_hedge()
+        tasks.append(asyncio.ensure_future(call()))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,50 @@
+# app/responses.py
+
+import json
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Tipos que nem orjson nem json serializam sozinhos"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada com orjson (json da stdlib se não instalado).
+    Um modelo Pydantic passado direto vira bytes pelo serializador do
+    pydantic-core, sem o jsonable_encoder. Retornar esta resposta de um
+    endpoint dispensa a validação do response_model: use só com dados já
+    no formato de saída.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+        return json.dumps(
+            content,
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
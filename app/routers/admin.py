@@ -1,9 +1,148 @@
 # app/routers/admin.py
 
-from fastapi import APIRouter
+import asyncio
+import logging
+import os
+import time
+
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.models.user import UserIdsRequest, UserPage
+from app.repositories.users import UserRepository, UsersQueryError
+from app.responses import FastJSONResponse
+from app.routers.auth import get_current_admin
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Uma captura por vez por worker (as capturas alteram estado global do processo)
+_profile_lock = asyncio.Lock()
 
 @router.get("/")
 async def admin_home():
     return {"message": "Admin area"}
+
+@router.get("/users", response_model=UserPage)
+async def list_users(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    email_prefix: Optional[str] = Query(None, min_length=1, max_length=254),
+    status_filter: Literal["all", "pending"] = Query("all", alias="status"),
+    admin: dict = Depends(get_current_admin)
+):
+    """Lista usuários paginada por cursor; next_cursor é nulo na última página"""
+    try:
+        users, next_cursor = await UserRepository.list_users(
+            limit, cursor, email_prefix, pending_only=status_filter == "pending"
+        )
+    except UsersQueryError as e:
+        raise _unavailable(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return FastJSONResponse({"users": users, "next_cursor": next_cursor})
+
+@router.post("/users/approve")
+async def approve_users(body: UserIdsRequest, admin: dict = Depends(get_current_admin)):
+    """Aprova vários usuários pendentes de uma vez"""
+    try:
+        return {"updated": await UserRepository.approve_users(body.ids)}
+    except UsersQueryError as e:
+        raise _unavailable(e)
+
+@router.post("/users/reject")
+async def reject_users(body: UserIdsRequest, admin: dict = Depends(get_current_admin)):
+    """Remove vários usuários de uma vez (administradores são preservados)"""
+    try:
+        return {"removed": await UserRepository.reject_users(body.ids)}
+    except UsersQueryError as e:
+        raise _unavailable(e)
+
+def _unavailable(error: UsersQueryError) -> HTTPException:
+    logger.error(f"Operação administrativa falhou no D1: {error}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Banco de dados indisponível no momento"
+    )
+
+def _ensure_profiling():
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling desativado (PROFILING_ENABLED=false)"
+        )
+    if _profile_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Já existe uma captura em andamento neste worker"
+        )
+
+def _download(body: str, kind: str) -> PlainTextResponse:
+    filename = f"{kind}-{os.getpid()}-{int(time.time())}.folded"
+    return PlainTextResponse(
+        body,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/loop/stalls")
+async def loop_stalls(admin: dict = Depends(get_current_admin)):
+    """Travamentos recentes do event loop registrados pelo monitor contínuo"""
+    from app.loop_monitor import loop_monitor
+
+    return {
+        "running": loop_monitor.running,
+        "stall_threshold_ms": loop_monitor.stall_threshold * 1000,
+        "stalls": list(loop_monitor.stalls)
+    }
+
+@router.get("/profile/cpu")
+async def profile_cpu(
+    seconds: float = Query(10.0, ge=0.5, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    admin: dict = Depends(get_current_admin)
+):
+    """Perfil de CPU amostrado do event loop deste worker, em pilhas colapsadas (flamegraph)"""
+    _ensure_profiling()
+    from app import profiling
+
+    async with _profile_lock:
+        profiler = await profiling.profile_cpu(seconds, interval_ms / 1000)
+    return _download(profiling.folded(profiler.stacks), "cpu")
+
+@router.get("/profile/loop")
+async def profile_loop(
+    seconds: float = Query(10.0, ge=0.5, le=60),
+    slow_callback_ms: float = Query(100.0, ge=1, le=10000),
+    admin: dict = Depends(get_current_admin)
+):
+    """Atraso do event loop e callbacks lentos durante a janela"""
+    _ensure_profiling()
+    from app import profiling
+
+    async with _profile_lock:
+        return await profiling.profile_loop(seconds, slow_callback_ms / 1000)
+
+@router.get("/profile/memory")
+async def profile_memory(
+    seconds: float = Query(10.0, ge=0.5, le=60),
+    top: int = Query(25, ge=1, le=200),
+    format: str = Query("json", pattern="^(json|folded)$"),
+    admin: dict = Depends(get_current_admin)
+):
+    """Maiores alocações (tracemalloc) feitas durante a janela"""
+    _ensure_profiling()
+    from app import profiling
+
+    async with _profile_lock:
+        result = await profiling.profile_memory(seconds, top)
+
+    if format == "folded":
+        return _download(profiling.folded(result.pop("stacks")), "memory")
+    result.pop("stacks")
+    return result
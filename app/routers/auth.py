@@ -4,24 +4,28 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+import logging
 
 from app.models.user import UserCreate, UserLogin, Token, UserResponse
 from app.repositories.users import UserRepository
 from app.services.auth import (
-    hash_password, verify_password, create_access_token, verify_token
+    hash_password, verify_password, create_access_token, authenticate_token, revoke_token
 )
 from app.rate_limit import RateLimiter
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
     """Obtém o usuário atual do token JWT"""
     token = credentials.credentials
-    token_data = verify_token(token)
+    token_data = await authenticate_token(token, getattr(request.app.state, "redis", None))
     
     return {
         "user_id": token_data.user_id,
@@ -29,13 +33,21 @@ def get_current_user(
         "is_admin": token_data.is_admin
     }
 
+async def get_current_admin(current_user: dict = Depends(get_current_user)) -> dict:
+    """Exige que o usuário do token seja administrador"""
+    if not current_user.get("is_admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito a administradores"
+        )
+    return current_user
+
 @router.post("/register", response_model=UserResponse)
 async def register(user_data: UserCreate, request: Request):
     """Registro de novo usuário"""
     
     # Verificar se usuário já existe
-    existing_user = await UserRepository.get_by_email(user_data.email)
-    if existing_user:
+    if await UserRepository.email_exists(user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email já registrado"
@@ -65,7 +77,7 @@ async def register(user_data: UserCreate, request: Request):
     
     # Log de registro
     client_ip = request.client.host if request.client else "unknown"
-    print(f"Novo usuário registrado: {user.email} from {client_ip}")
+    logger.info(f"Novo usuário registrado: {user.email} from {client_ip}")
     
     return user
 
@@ -129,22 +141,25 @@ async def login(login_data: UserLogin, request: Request):
     return Token(
         access_token=access_token,
         token_type="bearer",
-        user=user
+        user=UserResponse.model_validate(user)
     )
 
 @router.post("/logout")
-async def logout(request: Request, current_user: dict = Depends(get_current_user)):
+async def logout(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user)
+):
     """Logout de usuário"""
-    # Em implementação JWT com cookies, invalidar o token
-    # Para esta implementação, o frontend deve remover o token
+    # Revoga o token até o exp; o frontend também deve removê-lo
+    await revoke_token(credentials.credentials, getattr(request.app.state, "redis", None))
     return {"message": "Logout realizado com sucesso"}
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Obtém informações do usuário atual"""
-    print(f"DEBUG: /me called for user_id: {current_user['user_id']} ({type(current_user['user_id'])})")
+    logger.debug("/me chamado para user_id %s", current_user["user_id"])
     user = await UserRepository.get_by_id(current_user["user_id"])
-    print(f"DEBUG: Repository returned: {user}")
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,16 +1,38 @@
 # app/routers/dashboard.py
 
-from fastapi import APIRouter
+import asyncio
+import logging
+import re
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.repositories.prices import PricesQueryError, PricesRepository
+from app.routers.auth import get_current_user
+from app.services.auth import issue_stream_ticket, redeem_stream_ticket
+from app.services.fmp_service import MarketDataError, fmp_service
+from app.utils.events import event_broker, format_sse
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Intervalo de keep-alive das conexões SSE (segundos)
+STREAM_KEEPALIVE = 15
+
+# Máximo de símbolos por consulta ao painel de mercado (cada um pode virar uma busca no provedor)
+MARKET_MAX_SYMBOLS = 50
+
+# Símbolos vão para o path da URL do provedor: só o formato de tickers é aceito
+SYMBOL_PATTERN = re.compile(r"[A-Z0-9.\-]{1,15}")
+
 @router.get("/settings")
 async def dashboard_settings():
     return {"message": "Dashboard settings"}
 
-# Adicionar endpoint /metrics usado no JS
-@router.get("/metrics")
-async def dashboard_metrics():
+def _build_metrics() -> dict:
     return {
         "success": True,
         "metrics": {
@@ -25,3 +47,101 @@ async def dashboard_metrics():
             "profit": [12000, 15000, 18000, 20000, 19000, 25000]
         }
     }
+
+# Adicionar endpoint /metrics usado no JS
+@router.get("/metrics")
+async def dashboard_metrics():
+    return _build_metrics()
+
+@router.post("/stream-ticket")
+async def dashboard_stream_ticket(request: Request, current_user: dict = Depends(get_current_user)):
+    """Ticket de uso único para abrir /stream (o token de acesso nunca vai na URL)"""
+    ticket = await issue_stream_ticket(current_user["user_id"], request.app.state.redis)
+    return {"ticket": ticket, "expires_in": settings.STREAM_TICKET_TTL}
+
+@router.get("/stream")
+async def dashboard_stream(request: Request, ticket: str = Query(..., max_length=64)):
+    """
+    Stream SSE com o snapshot das métricas na conexão e novos cálculos do
+    usuário. As métricas do painel são estáticas, então não há deltas a
+    empurrar depois do snapshot. EventSource não envia headers: a conexão é
+    autorizada por um ticket de uso único obtido em POST /stream-ticket.
+    """
+    user_id = await redeem_stream_ticket(ticket, request.app.state.redis)
+
+    async def event_stream():
+        queue = event_broker.subscribe(user_id)
+        try:
+            yield format_sse("metrics", _build_metrics())
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield format_sse(event, data)
+        finally:
+            event_broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/market")
+async def dashboard_market(
+    symbols: str = Query(..., description="Símbolos separados por vírgula"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    window: int = Query(20, ge=2, le=252),
+    refresh: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Séries e indicadores (retornos, média móvel, volatilidade) do painel de mercado"""
+    # NumPy só é carregado quando o painel de mercado é usado
+    from app.services.price_analytics import PriceAnalyticsService
+    
+    requested = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if len(requested) > MARKET_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Máximo de {MARKET_MAX_SYMBOLS} símbolos por consulta"
+        )
+    invalid = [s for s in requested if not SYMBOL_PATTERN.fullmatch(s)]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Símbolos inválidos: {', '.join(invalid[:5])}"
+        )
+
+    if refresh:
+        # Busca no provedor (com cache e coalescência) e grava na tabela prices
+        try:
+            ranges = await fmp_service.get_many(requested, start_date, end_date)
+        except MarketDataError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Provedor de mercado indisponível para: {', '.join(e.symbols)}"
+            )
+    else:
+        try:
+            ranges = await PricesRepository.get_ranges(requested, start_date, end_date)
+        except PricesQueryError as e:
+            logger.error(f"Erro ao consultar preços: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Dados de mercado indisponíveis no momento"
+            )
+
+    return {
+        "success": True,
+        "window": window,
+        "series": {
+            symbol: PriceAnalyticsService.summarize(rows, window)
+            for symbol, rows in ranges.items()
+        }
+    }
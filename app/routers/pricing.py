@@ -2,8 +2,8 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from typing import List
+from datetime import datetime
 import os
 
 from app.models.pricing import PricingCalculationRequest, PricingCalculationResponse
@@ -11,17 +11,22 @@ from app.services.pricing_calculator import PricingCalculatorService
 from app.repositories.pricing_data import PricingDataRepository
 from app.routers.auth import get_current_user
 from app.utils.webhook import send_webhook
+from app.utils.events import event_broker
+from app.utils.cache_bus import cache_bus
+from app.background import background_tasks
 from app.config import settings
+from app.templating import render_page
+from app.responses import FastJSONResponse
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 @router.get("/calculator", response_class=HTMLResponse, name="pricing_calculator")
 async def get_calculator(request: Request):
     """Renderiza a página da calculadora de precificação"""
-    return templates.TemplateResponse(
+    return render_page(
+        request,
         "calculator.html",
-        {"request": request, "title": "Calculadora de Precificação - MeuCFO.ai", "current_user": None}
+        {"title": "Calculadora de Precificação - MeuCFO.ai", "current_user": None}
     )
 
 @router.post("/calculate", response_model=PricingCalculationResponse)
@@ -39,25 +44,32 @@ async def calculate_price(
         current_user["user_id"], request, result.dict()
     )
     
-    # Enviar para webhook para análise adicional
+    # Notificar dashboards conectados
+    if calc_id:
+        await cache_bus.invalidate("named_queries", user_id=current_user["user_id"], prefix="pricing.")
+        background_tasks.submit(
+            "events", event_broker.publish, current_user["user_id"], "calculation", {
+                "id": calc_id,
+                "business_type": request.business_type.value,
+                "product_cost": request.product_cost,
+                "calculated_price": result.calculated_price,
+                "margin": result.margin,
+                "created_at": datetime.utcnow().isoformat()
+            }
+        )
+    
+    # Enviar para webhook para análise adicional (depois da resposta)
     webhook_data = {
         "calculation_id": calc_id,
         "user_id": current_user["user_id"],
         "request": request.dict(),
         "result": result.dict()
     }
-    
-    # Enviar assincronamente (não bloquear resposta)
-    import asyncio
-    asyncio.create_task(
-        send_webhook(
-            "pricing_calculation",
-            webhook_data,
-            settings.N8N_WEBHOOK_URL
-        )
+    background_tasks.submit(
+        "webhooks", send_webhook, "pricing_calculation", webhook_data, settings.N8N_WEBHOOK_URL
     )
     
-    return result
+    return FastJSONResponse(result)
 
 @router.get("/calculations")
 async def get_user_calculations(
@@ -69,10 +81,10 @@ async def get_user_calculations(
         current_user["user_id"], limit
     )
     
-    return {
+    return FastJSONResponse({
         "calculations": calculations,
         "count": len(calculations)
-    }
+    })
 
 @router.get("/calculations/{calc_id}")
 async def get_calculation(
@@ -120,11 +132,11 @@ async def simulate_price_changes(
             "result": result.dict()
         })
     
-    return {
+    return FastJSONResponse({
         "base_result": PricingCalculatorService.calculate_price(base_request).dict(),
         "simulations": simulations,
         "variation_analysis": _analyze_variations(simulations)
-    }
+    })
 
 def _analyze_variations(simulations: List[dict]) -> dict:
     """Analisa o impacto das variações"""
@@ -0,0 +1,46 @@
+# app/routers/queries.py
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+
+from app.repositories.named_queries import NAMED_QUERIES, NamedQueryRepository, QueryParamError
+from app.routers.auth import get_current_user
+
+router = APIRouter()
+
+@router.get("/")
+async def list_queries(current_user: dict = Depends(get_current_user)):
+    """Lista as consultas disponíveis e seus parâmetros"""
+    return {
+        query_id: {"params": [p.name for p in query.params], "cache_ttl": query.cache_ttl}
+        for query_id, query in NAMED_QUERIES.items()
+    }
+
+@router.post("/{query_id}")
+async def run_query(
+    query_id: str,
+    params: Dict[str, Any] = Body(default_factory=dict),
+    current_user: dict = Depends(get_current_user)
+):
+    """Executa uma consulta nomeada (substitui o antigo proxy de SQL livre)"""
+    if query_id not in NAMED_QUERIES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Consulta não encontrada"
+        )
+    
+    try:
+        result = await NamedQueryRepository.run(query_id, current_user["user_id"], params)
+    except QueryParamError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    if not result.get("success"):
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=result.get("error")
+        )
+    return result
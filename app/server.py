@@ -0,0 +1,56 @@
+# app/server.py
+
+"""
+Perfil de produção multi-processo: gunicorn gerencia N workers uvicorn.
+
+O master não importa a aplicação (preload desligado): antes do fork ele roda
+as migrações e a pré-compilação dos templates em subprocessos, uma única vez,
+e exporta DB_MIGRATE_ON_STARTUP=false e WEB_CONCURRENCY para os workers. Cada
+worker importa app.main depois do fork e executa o próprio lifespan (Redis,
+pub/sub, monitor do event loop) com clientes que não são compartilhados.
+
+Estado entre workers: limites de login/API e revogação de tokens ficam no
+Redis; caches em memória são invalidados via app.utils.cache_bus.
+
+Uso: gunicorn -c python:app.server app.main:app
+     WEB_CONCURRENCY=4 gunicorn -c python:app.server app.main:app
+"""
+
+import os
+import subprocess
+import sys
+
+
+def default_workers() -> int:
+    """Um worker por CPU disponível para o processo (respeita o cpuset do container)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('APP_PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY") or default_workers())
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = False
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+accesslog = None  # o middleware de métricas/logs da aplicação já registra as requisições
+
+
+def _run_once(module: str, server) -> None:
+    result = subprocess.run([sys.executable, "-m", module])
+    if result.returncode != 0:
+        server.log.error(f"python -m {module} falhou (código {result.returncode})")
+        sys.exit(result.returncode)
+
+
+def on_starting(server):
+    """Roda no master antes do fork dos workers"""
+    if os.environ.get("DB_MIGRATE_ON_STARTUP", "true").lower() not in ("0", "false"):
+        _run_once("app.migrations", server)
+        os.environ["DB_MIGRATE_ON_STARTUP"] = "false"
+    _run_once("app.templating", server)
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+    server.log.info(f"Migrações e templates prontos; iniciando {server.cfg.workers} workers")
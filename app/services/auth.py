@@ -1,59 +1,229 @@
 # app/services/auth.py
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import hashlib
+import logging
+import secrets
+import time
 from fastapi import HTTPException, status
 
 from app.config import settings
+from app.metrics import CACHE_REQUESTS
 from app.models.user import TokenData
 
-# Configuração de hash de senha
-pwd_context = CryptContext(
-    schemes=["bcrypt", "bcrypt_sha256"],
-    default="bcrypt",
-    deprecated="auto",
-)
+logger = logging.getLogger(__name__)
+
+ACCESS_TOKEN_EXPIRE = timedelta(hours=24)
+
+# passlib/bcrypt e python-jose são importados no primeiro uso, não no boot do worker
+
+@lru_cache(maxsize=1)
+def _pwd_context():
+    """Configuração de hash de senha"""
+    from passlib.context import CryptContext
+    return CryptContext(
+        schemes=["bcrypt", "bcrypt_sha256"],
+        default="bcrypt",
+        deprecated="auto",
+    )
 
 def hash_password(password: str) -> str:
     """Gera hash da senha"""
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha corresponde ao hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Cria token JWT"""
+    from jose import jwt
+    
     to_encode = data.copy()
     
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(hours=24)
+        expire = datetime.utcnow() + ACCESS_TOKEN_EXPIRE
     
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.APP_SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-def verify_token(token: str) -> TokenData:
-    """Verifica e decodifica token JWT"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+class _CachedToken:
+    __slots__ = ("exp", "data", "revoked", "revocation_checked_at")
+    
+    def __init__(self, exp: float, data: TokenData):
+        self.exp = exp
+        self.data = data
+        self.revoked = False
+        self.revocation_checked_at = float("-inf")
+
+class TokenCache:
+    """LRU de tokens já verificados, indexado pelo digest do token e válido até o exp"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, _CachedToken]" = OrderedDict()
+    
+    def get(self, digest: bytes) -> Optional[_CachedToken]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        if entry.exp <= time.time():
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return entry
+    
+    def put(self, digest: bytes, entry: _CachedToken) -> None:
+        self._entries[digest] = entry
+        self._entries.move_to_end(digest)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+def token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def _decode_token(token: str) -> _CachedToken:
+    from jose import JWTError, jwt
     
     try:
         payload = jwt.decode(token, settings.APP_SECRET_KEY, algorithms=["HS256"])
-        email: str = payload.get("sub")
-        user_id: int = payload.get("user_id")
-        is_admin: bool = payload.get("is_admin", False)
-        
-        if email is None or user_id is None:
-            raise credentials_exception
-        
-        return TokenData(email=email, user_id=user_id, is_admin=is_admin)
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    
+    email: str = payload.get("sub")
+    user_id: int = payload.get("user_id")
+    is_admin: bool = payload.get("is_admin", False)
+    
+    if email is None or user_id is None:
+        raise _credentials_exception()
+    
+    # Sem exp o token não é mantido no cache
+    exp = payload.get("exp") or 0
+    return _CachedToken(float(exp), TokenData(email=email, user_id=user_id, is_admin=is_admin))
+
+def _verified_entry(token: str, digest: bytes) -> _CachedToken:
+    entry = token_cache.get(digest)
+    
+    if entry is None:
+        CACHE_REQUESTS.inc("jwt", "miss")
+        entry = _decode_token(token)
+        if entry.exp:
+            token_cache.put(digest, entry)
+    else:
+        CACHE_REQUESTS.inc("jwt", "hit")
+    
+    if entry.revoked:
+        raise _credentials_exception()
+    return entry
+
+def verify_token(token: str) -> TokenData:
+    """Verifica e decodifica token JWT (com cache dos tokens já verificados)"""
+    return _verified_entry(token, token_digest(token)).data
+
+def _revocation_key(digest: bytes) -> str:
+    return f"revoked_token:{digest.hex()}"
+
+async def _check_revocation(digest: bytes, entry: Optional[_CachedToken], redis_client) -> bool:
+    now = time.monotonic()
+    
+    if entry is not None:
+        if entry.revoked:
+            return True
+        if now - entry.revocation_checked_at < settings.AUTH_REVOCATION_CHECK_INTERVAL:
+            return False
+    
+    if redis_client is None:
+        return False
+    
+    try:
+        revoked = await redis_client.get(_revocation_key(digest)) is not None
+    except Exception as e:
+        logger.warning(f"Não foi possível consultar revogação de token: {e}")
+        return False
+    
+    if entry is not None:
+        entry.revoked = revoked
+        entry.revocation_checked_at = now
+    return revoked
+
+async def is_token_revoked(token: str, redis_client) -> bool:
+    """
+    Consulta a lista de revogação no Redis. O resultado negativo fica no cache
+    do token por AUTH_REVOCATION_CHECK_INTERVAL segundos, então a maioria das
+    requisições não vai ao Redis.
+    """
+    digest = token_digest(token)
+    return await _check_revocation(digest, token_cache.get(digest), redis_client)
+
+async def authenticate_token(token: str, redis_client) -> TokenData:
+    """Valida o token e garante que ele não foi revogado"""
+    digest = token_digest(token)
+    entry = _verified_entry(token, digest)
+    if await _check_revocation(digest, entry, redis_client):
+        raise _credentials_exception()
+    return entry.data
+
+async def revoke_token(token: str, redis_client) -> None:
+    """Revoga o token até o seu exp (logout)"""
+    digest = token_digest(token)
+    entry = token_cache.get(digest) or _decode_token(token)
+    
+    ttl = max(1, int(entry.exp - time.time())) if entry.exp else int(ACCESS_TOKEN_EXPIRE.total_seconds())
+    if redis_client is not None:
+        try:
+            await redis_client.set(_revocation_key(digest), "1", ex=ttl)
+        except Exception as e:
+            logger.warning(f"Não foi possível registrar revogação no Redis: {e}")
+    
+    entry.revoked = True
+    if entry.exp:
+        token_cache.put(digest, entry)
+
+def _stream_ticket_key(ticket: str) -> str:
+    return f"stream_ticket:{ticket}"
+
+async def issue_stream_ticket(user_id: int, redis_client) -> str:
+    """
+    Ticket opaco de uso único para abrir o stream SSE. EventSource não envia
+    headers e a URL acaba em logs de acesso e proxies, então ela carrega este
+    ticket de STREAM_TICKET_TTL segundos em vez do token de acesso.
+    """
+    ticket = secrets.token_urlsafe(32)
+    await redis_client.set(_stream_ticket_key(ticket), str(user_id), ex=settings.STREAM_TICKET_TTL)
+    return ticket
+
+async def redeem_stream_ticket(ticket: str, redis_client) -> int:
+    """Consome o ticket e retorna o user_id; 401 se inválido, expirado ou já usado"""
+    key = _stream_ticket_key(ticket)
+    try:
+        user_id = await redis_client.get(key)
+        # Só quem efetivamente apagou a chave fica com o ticket
+        claimed = user_id is not None and await redis_client.delete(key) == 1
+    except Exception as e:
+        logger.warning(f"Não foi possível validar ticket do stream: {e}")
+        claimed = False
+    
+    if not claimed:
+        raise _credentials_exception()
+    return int(user_id)
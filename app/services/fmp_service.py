@@ -1,5 +1,271 @@
 # app/services/fmp_service.py
-# Placeholder
+
+import asyncio
+import logging
+import random
+import zlib
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple, TYPE_CHECKING
+
+from app.config import settings
+from app.repositories.prices import PricesQueryError, PricesRepository
+from app.utils.singleflight import SingleFlight
+from app.utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedError(Exception):
+    """O provedor respondeu 429"""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("Rate limit do provedor de dados de mercado")
+        self.retry_after = retry_after
+
+
+class MarketDataError(Exception):
+    """Falha ao obter a série de um ou mais símbolos no provedor"""
+
+    def __init__(self, symbols: Sequence[str]):
+        super().__init__(f"Falha ao obter preços de {', '.join(symbols)}")
+        self.symbols = list(symbols)
+
+
+class MarketDataProvider(Protocol):
+    async def fetch_daily(
+        self, symbol: str, start_date: Optional[str], end_date: Optional[str]
+    ) -> List[dict]:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class FMPProvider:
+    """Cliente HTTP da Financial Modeling Prep com pool de conexões compartilhado"""
+
+    def __init__(self, api_key: str, base_url: str, max_connections: int = 10):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def fetch_daily(
+        self, symbol: str, start_date: Optional[str], end_date: Optional[str]
+    ) -> List[dict]:
+        params = {"apikey": self.api_key}
+        if start_date:
+            params["from"] = start_date
+        if end_date:
+            params["to"] = end_date
+
+        response = await self._get_client().get(f"/historical-price-full/{symbol}", params=params)
+
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            raise RateLimitedError(float(retry_after) if retry_after and retry_after.isdigit() else None)
+        response.raise_for_status()
+
+        historical = response.json().get("historical", [])
+        # A API retorna do mais recente para o mais antigo
+        return [
+            {"symbol": symbol, "date": item["date"], "close": item["close"], "volume": item.get("volume")}
+            for item in reversed(historical)
+        ]
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class FakeMarketDataProvider:
+    """
+    Provedor local e determinístico (passeio aleatório semeado pelo símbolo)
+    para testar e medir o pipeline sem rede. Aceita latência e 429s simulados.
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit_every: int = 0, days: int = 252):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.days = days
+        self.calls = 0
+
+    async def fetch_daily(
+        self, symbol: str, start_date: Optional[str], end_date: Optional[str]
+    ) -> List[dict]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rate_limit_every and self.calls % self.rate_limit_every == 0:
+            raise RateLimitedError(retry_after=0)
+
+        end = date.fromisoformat(end_date) if end_date else date.today()
+        start = date.fromisoformat(start_date) if start_date else end - timedelta(days=self.days)
+
+        rng = random.Random(zlib.crc32(symbol.encode()))
+        price = 50 + rng.random() * 100
+        bars = []
+        current = start
+        while current <= end:
+            price *= 1 + rng.gauss(0, 0.015)
+            if current.weekday() < 5:
+                bars.append({
+                    "symbol": symbol,
+                    "date": current.isoformat(),
+                    "close": round(price, 4),
+                    "volume": rng.randint(10_000, 1_000_000)
+                })
+            current += timedelta(days=1)
+        return bars
+
+    async def close(self) -> None:
+        pass
+
+
+CacheKey = Tuple[str, Optional[str], Optional[str]]
+
 
 class FMPService:
-    pass
+    """
+    Dados de mercado com cache TTL/LRU por símbolo e intervalo, coalescência
+    de requisições concorrentes, concorrência limitada e backoff em 429
+    (limitado a max_backoff, sem ocupar vaga de concorrência durante a
+    espera). Os dados obtidos são gravados na tabela prices (write-through).
+    """
+
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        cache_ttl: float = 300,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        max_backoff: float = 30.0,
+        cache_size: int = 1000,
+        persist: bool = True
+    ):
+        self.provider = provider
+        self.cache_ttl = cache_ttl
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.persist = persist
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache = TTLCache("fmp", maxsize=cache_size)
+        self._flight = SingleFlight("fmp_singleflight")
+
+    async def get_daily_prices(
+        self, symbol: str, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> List[dict]:
+        key = (symbol.upper(), start_date, end_date)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        return await self._flight.do(key, lambda: self._load(key))
+
+    async def get_many(
+        self, symbols: Sequence[str], start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> Dict[str, List[dict]]:
+        unique = list(dict.fromkeys(s.upper() for s in symbols))
+        results = await asyncio.gather(
+            *(self.get_daily_prices(s, start_date, end_date) for s in unique),
+            return_exceptions=True
+        )
+
+        series, failed = {}, []
+        for symbol, result in zip(unique, results):
+            if isinstance(result, Exception):
+                logger.error(f"Erro ao obter preços de {symbol}: {result}")
+                failed.append(symbol)
+            else:
+                series[symbol] = result
+
+        if failed:
+            raise MarketDataError(failed)
+        return series
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        if symbol is None:
+            self._cache.invalidate()
+            return
+        symbol = symbol.upper()
+        self._cache.invalidate(lambda key: key[0] == symbol)
+
+    async def close(self) -> None:
+        await self.provider.close()
+
+    async def _load(self, key: CacheKey) -> List[dict]:
+        symbol, start_date, end_date = key
+
+        bars = await self._fetch_with_backoff(symbol, start_date, end_date)
+
+        if self.persist and bars:
+            try:
+                await PricesRepository.bulk_upsert(bars)
+            except PricesQueryError as e:
+                # Os dados do provedor continuam válidos para esta resposta, mas
+                # sem cache: a próxima busca tenta gravar de novo
+                logger.error(f"Write-through de preços de {symbol} falhou: {e}")
+                return bars
+
+        self._cache.set(key, bars, self.cache_ttl)
+        return bars
+
+    async def _fetch_with_backoff(
+        self, symbol: str, start_date: Optional[str], end_date: Optional[str]
+    ) -> List[dict]:
+        attempt = 0
+        while True:
+            try:
+                # A vaga só é ocupada durante a chamada; a espera do backoff fica fora
+                async with self._semaphore:
+                    return await self.provider.fetch_daily(symbol, start_date, end_date)
+            except RateLimitedError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = e.retry_after
+                if delay is None:
+                    delay = self.backoff_base * (2 ** attempt) * (0.5 + random.random())
+                # Retry-After do provedor não pode estacionar a busca indefinidamente
+                delay = min(delay, self.max_backoff)
+                logger.warning(f"FMP 429 para {symbol}, nova tentativa em {delay:.2f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+def create_provider() -> MarketDataProvider:
+    if settings.FMP_PROVIDER == "fake":
+        logger.info("Usando provedor de mercado local (FMP_PROVIDER=fake)")
+        return FakeMarketDataProvider()
+    return FMPProvider(settings.FMP_API_KEY, settings.FMP_BASE_URL, settings.FMP_MAX_CONCURRENCY * 2)
+
+
+# Instância global
+fmp_service = FMPService(
+    create_provider(),
+    cache_ttl=settings.FMP_CACHE_TTL,
+    max_concurrency=settings.FMP_MAX_CONCURRENCY,
+    max_retries=settings.FMP_MAX_RETRIES,
+    max_backoff=settings.FMP_MAX_BACKOFF,
+    cache_size=settings.FMP_CACHE_SIZE
+)
@@ -0,0 +1,88 @@
+# app/services/price_analytics.py
+
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+# Pregões por ano, usado para anualizar a volatilidade
+TRADING_DAYS = 252
+
+class PriceAnalyticsService:
+    """Indicadores de séries de preços calculados de forma vetorizada com NumPy"""
+
+    @staticmethod
+    def to_arrays(rows: List[dict]) -> Tuple[List[str], np.ndarray]:
+        """Converte linhas do repositório em (datas, fechamentos) com array float64 contíguo"""
+        dates = [row["date"] for row in rows]
+        close = np.fromiter((row["close"] for row in rows), dtype=np.float64, count=len(rows))
+        return dates, close
+
+    @staticmethod
+    def returns(close: np.ndarray, periods: int = 1) -> np.ndarray:
+        """Retornos simples sobre `periods` pregões; as primeiras posições ficam NaN"""
+        out = np.full(close.shape, np.nan)
+        if periods < len(close):
+            out[periods:] = close[periods:] / close[:-periods] - 1.0
+        return out
+
+    @staticmethod
+    def moving_average(close: np.ndarray, window: int) -> np.ndarray:
+        """Média móvel simples via soma acumulada (O(n))"""
+        out = np.full(close.shape, np.nan)
+        if window <= 0 or window > len(close):
+            return out
+
+        csum = np.cumsum(np.insert(close, 0, 0.0))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+        return out
+
+    @staticmethod
+    def rolling_volatility(close: np.ndarray, window: int, annualize: bool = True) -> np.ndarray:
+        """Desvio padrão amostral móvel dos log-retornos, anualizado por padrão"""
+        out = np.full(close.shape, np.nan)
+        if window < 2 or window >= len(close):
+            return out
+
+        log_returns = np.diff(np.log(close))
+        windows = np.lib.stride_tricks.sliding_window_view(log_returns, window)
+        vol = windows.std(axis=1, ddof=1)
+        if annualize:
+            vol *= np.sqrt(TRADING_DAYS)
+
+        # Retorno i corresponde ao fechamento i + 1
+        out[window:] = vol
+        return out
+
+    @staticmethod
+    def summarize(rows: List[dict], window: int = 20) -> Dict[str, Any]:
+        """Série e indicadores prontos para o painel de mercado"""
+        dates, close = PriceAnalyticsService.to_arrays(rows)
+
+        if len(close) == 0:
+            return {"dates": [], "close": [], "indicators": {}, "stats": {}}
+
+        daily = PriceAnalyticsService.returns(close)
+
+        indicators = {
+            "return_1d": daily,
+            "return_window": PriceAnalyticsService.returns(close, window),
+            "moving_average": PriceAnalyticsService.moving_average(close, window),
+            "volatility": PriceAnalyticsService.rolling_volatility(close, window)
+        }
+
+        valid = daily[~np.isnan(daily)]
+        stats = {
+            "last_close": float(close[-1]),
+            "period_return": float(close[-1] / close[0] - 1.0),
+            "volatility": float(valid.std(ddof=1) * np.sqrt(TRADING_DAYS)) if len(valid) > 1 else None
+        }
+
+        return {
+            "dates": dates,
+            "close": close.tolist(),
+            "indicators": {name: _to_json(values) for name, values in indicators.items()},
+            "stats": stats
+        }
+
+def _to_json(values: np.ndarray) -> List[Any]:
+    """NaN não é JSON válido: converte para None"""
+    return np.where(np.isnan(values), None, np.round(values, 6)).tolist()
@@ -0,0 +1,91 @@
+# app/templating.py
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from app.config import settings
+from app.utils.ttl_cache import TTLCache
+
+TEMPLATES_DIR = "app/templates"
+
+# Páginas renderizadas por (template, hash do contexto)
+_page_cache = TTLCache("pages", maxsize=256)
+
+@lru_cache(maxsize=1)
+def get_templates():
+    """
+    Ambiente Jinja2 único da aplicação, criado no primeiro render.
+    Retorna None se o diretório de templates não existir (dev).
+
+    Com TEMPLATE_BYTECODE_DIR, o bytecode compilado fica em disco e é
+    reaproveitado pelos workers (o Jinja invalida pelo checksum da fonte).
+    """
+    if not os.path.exists(TEMPLATES_DIR):
+        return None
+
+    from fastapi.templating import Jinja2Templates
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+    from app.http_cache import static_url
+
+    bytecode_cache = None
+    if settings.TEMPLATE_BYTECODE_DIR:
+        os.makedirs(settings.TEMPLATE_BYTECODE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(settings.TEMPLATE_BYTECODE_DIR)
+
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        bytecode_cache=bytecode_cache,
+        auto_reload=settings.APP_ENV == "dev"
+    )
+    templates = Jinja2Templates(env=env)
+    templates.env.globals["static_url"] = static_url
+    return templates
+
+def precompile_templates() -> int:
+    """Compila todos os templates para o cache de bytecode (rodar no deploy)"""
+    templates = get_templates()
+    if templates is None:
+        return 0
+
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
+
+def _context_key(context: dict) -> str:
+    encoded = json.dumps(context, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+def render_page(request, name: str, context: dict):
+    """
+    Renderiza uma página cujo HTML depende só do contexto informado (não do
+    request). O resultado fica em cache por PAGE_CACHE_TTL; se o Jinja recarregar
+    o template (edição em dev, novo deploy), a entrada antiga é descartada.
+    """
+    from fastapi.responses import HTMLResponse
+
+    templates = get_templates()
+    if templates is None:
+        return HTMLResponse("Templates not loaded")
+
+    template = templates.get_template(name)
+    key = (name, _context_key(context))
+
+    cached = _page_cache.get(key) if settings.PAGE_CACHE_TTL > 0 else None
+    if cached is not None and cached[0] is template:
+        return HTMLResponse(cached[1])
+
+    body = template.render({"request": request, **context}).encode()
+    if settings.PAGE_CACHE_TTL > 0:
+        _page_cache.set(key, (template, body), settings.PAGE_CACHE_TTL)
+    return HTMLResponse(body)
+
+def clear_page_cache() -> int:
+    return _page_cache.invalidate()
+
+
+if __name__ == "__main__":
+    print(f"{precompile_templates()} templates compilados em {settings.TEMPLATE_BYTECODE_DIR}")
@@ -0,0 +1,61 @@
+# app/utils/cache_bus.py
+
+import logging
+import os
+import uuid
+from typing import Any, Callable, Dict
+
+from app.utils.pubsub import ChannelSubscriber
+
+logger = logging.getLogger(__name__)
+
+CACHE_CHANNEL = "cache_invalidation"
+
+
+class CacheBus(ChannelSubscriber):
+    """
+    Propaga invalidações de caches em memória entre os workers.
+
+    Cada cache registra um handler pelo nome. invalidate() aplica a invalidação
+    neste worker na hora e publica no canal do Redis; o listener dos demais
+    workers chama o mesmo handler (mensagens do próprio worker são ignoradas).
+    Sem pub/sub (LocalRedis), só o worker local é invalidado e os outros ficam
+    limitados ao TTL das entradas.
+    """
+
+    label = "Invalidação de cache"
+
+    def __init__(self, channel: str = CACHE_CHANNEL):
+        super().__init__(channel)
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+
+    def register(self, name: str, handler: Callable[..., Any]) -> None:
+        self._handlers[name] = handler
+
+    async def start(self, redis_client) -> None:
+        # O id de origem precisa ser único por processo (a instância pode vir do fork)
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        await super().start(redis_client)
+
+    async def invalidate(self, name: str, **payload: Any) -> Any:
+        """Invalida neste worker e avisa os demais; retorna o resultado do handler local"""
+        result = self._apply(name, payload)
+        await self._publish({"origin": self.origin, "cache": name, "payload": payload})
+        return result
+
+    def _apply(self, name: str, payload: Dict[str, Any]) -> Any:
+        handler = self._handlers.get(name)
+        if handler is None:
+            logger.warning(f"Invalidação para cache não registrado: {name}")
+            return None
+        return handler(**payload)
+
+    def handle(self, envelope: Dict[str, Any]) -> None:
+        if envelope.get("origin") == self.origin:
+            return
+        self._apply(envelope.get("cache"), envelope.get("payload") or {})
+
+
+# Instância global
+cache_bus = CacheBus()
@@ -0,0 +1,76 @@
+# app/utils/events.py
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Set
+
+from app.utils.pubsub import ChannelSubscriber
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CHANNEL = "dashboard_events"
+
+
+class EventBroker(ChannelSubscriber):
+    """
+    Distribui eventos do dashboard para as conexões SSE deste worker.
+
+    Com Redis disponível, os eventos são publicados no canal e um único
+    listener por worker repassa as mensagens para as filas locais, então
+    cada conexão ociosa custa apenas uma fila. Sem Redis (LocalRedis), a
+    distribuição é feita diretamente em memória.
+    """
+
+    label = "Eventos do dashboard"
+
+    def __init__(self, channel: str = DASHBOARD_CHANNEL, queue_size: int = 100):
+        super().__init__(channel)
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+
+    @property
+    def connections(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    async def publish(self, user_id: int, event: str, data: Dict[str, Any]) -> None:
+        """Publica um evento para todas as conexões do usuário"""
+        envelope = {"user_id": user_id, "event": event, "data": data}
+        # Com Redis, a entrega local vem pelo próprio listener
+        if not await self._publish(envelope):
+            self.handle(envelope)
+
+    def handle(self, envelope: Dict[str, Any]) -> None:
+        queues = self._subscribers.get(envelope.get("user_id"))
+        if not queues:
+            return
+
+        item = (envelope.get("event"), envelope.get("data"))
+        for queue in queues:
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Cliente lento: descarta em vez de acumular memória
+                pass
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Formata uma mensagem no protocolo Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# Instância global
+event_broker = EventBroker()
@@ -0,0 +1,39 @@
+# app/utils/local_d1.py
+
+import asyncio
+import random
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+
+class LocalD1Client:
+    """
+    Mesmo contrato de D1Client.execute, executado em SQLite local (testes e
+    benchmarks offline). latency e jitter (segundos) simulam a ida e volta
+    HTTP até o D1: cada query espera latency + uniforme(0, jitter) antes de
+    executar.
+    """
+
+    def __init__(self, path: str = ":memory:", latency: float = 0.0, jitter: float = 0.0):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.latency = latency
+        self.jitter = jitter
+
+    async def execute(self, sql: str, params: Optional[List] = None) -> Dict[str, Any]:
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        try:
+            cursor = self.conn.execute(sql, params or [])
+        except sqlite3.Error as e:
+            return {"success": False, "error": str(e)}
+        rows = [dict(row) for row in cursor.fetchall()]
+        self.conn.commit()
+        return {
+            "success": True,
+            "results": rows,
+            "meta": {"last_row_id": cursor.lastrowid, "changes": cursor.rowcount}
+        }
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,88 @@
+# app/utils/local_redis.py
+
+import time
+from typing import Any, Dict
+
+
+class LocalRedis:
+    """
+    Subconjunto de comandos do redis.asyncio usado pela aplicação, em memória.
+
+    Fallback para dev sem Redis: contadores e expirações funcionam, mas o
+    estado pertence ao processo. Com mais de um worker, limites de login,
+    revogação de tokens e invalidação de cache deixam de ser compartilhados.
+
+    Chaves expiradas somem ao serem lidas e, para as que nunca são lidas de
+    novo (tokens revogados, limites por IP), numa varredura feita nas
+    escritas quando o número de chaves com expiração passa do limite.
+    """
+
+    def __init__(self, sweep_threshold: int = 1000):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self.sweep_threshold = sweep_threshold
+        self._next_sweep = sweep_threshold
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def _sweep(self) -> None:
+        if len(self._expires) < self._next_sweep:
+            return
+        now = time.monotonic()
+        for key in [k for k, expires in self._expires.items() if expires <= now]:
+            self._data.pop(key, None)
+            del self._expires[key]
+        # Se quase tudo ainda vale, espera dobrar antes de varrer de novo
+        self._next_sweep = max(self.sweep_threshold, 2 * len(self._expires))
+
+    async def get(self, key):
+        return self._data.get(key) if self._alive(key) else None
+
+    async def set(self, key, value, ex=None, nx=False, **kwargs):
+        self._sweep()
+        if nx and self._alive(key):
+            return None
+        self._data[key] = value
+        if ex:
+            self._expires[key] = time.monotonic() + ex
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    async def incr(self, key, amount=1):
+        self._sweep()
+        value = int(self._data.get(key, 0) if self._alive(key) else 0) + amount
+        self._data[key] = value
+        return value
+
+    async def expire(self, key, seconds):
+        if self._alive(key):
+            self._expires[key] = time.monotonic() + seconds
+            return True
+        return False
+
+    async def ttl(self, key):
+        if not self._alive(key):
+            return -2
+        expires = self._expires.get(key)
+        return int(expires - time.monotonic()) if expires else -1
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self._data[key]
+                self._expires.pop(key, None)
+                removed += 1
+        return removed
+
+    async def ping(self):
+        return True
+
+    async def close(self):
+        pass
@@ -0,0 +1,109 @@
+# app/utils/pubsub.py
+
+import abc
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelSubscriber(abc.ABC):
+    """
+    Um listener por worker num canal pub/sub do Redis.
+
+    start() assina o canal quando o cliente tem pub/sub (LocalRedis não tem:
+    a subclasse trata tudo localmente). Cada mensagem JSON recebida vai para
+    handle(); uma mensagem que falha é registrada e descartada sem derrubar o
+    listener. Se a conexão cair, o worker volta ao modo local.
+    """
+
+    label = "Pub/sub"
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._redis = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def shared(self) -> bool:
+        return self._redis is not None
+
+    async def start(self, redis_client) -> None:
+        """Assina o canal no Redis; mantém o modo local se não for possível"""
+        if not hasattr(redis_client, "pubsub"):
+            logger.info(f"{self.label}: sem pub/sub, apenas neste worker")
+            return
+
+        try:
+            pubsub = redis_client.pubsub()
+            await pubsub.subscribe(self.channel)
+        except Exception as e:
+            logger.warning(f"{self.label}: pub/sub indisponível, apenas neste worker: {e}")
+            return
+
+        self._redis = redis_client
+        self._pubsub = pubsub
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"{self.label}: canal {self.channel} assinado")
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel)
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+        self._redis = None
+
+    async def _publish(self, envelope: Dict[str, Any]) -> bool:
+        """Publica no canal; False se não há Redis ou a publicação falhou"""
+        if self._redis is None:
+            return False
+        try:
+            await self._redis.publish(self.channel, json.dumps(envelope, default=str))
+            return True
+        except Exception as e:
+            logger.warning(f"{self.label}: falha ao publicar no Redis: {e}")
+            return False
+
+    @abc.abstractmethod
+    def handle(self, envelope: Dict[str, Any]) -> None:
+        """Aplica uma mensagem recebida do canal (publicada por qualquer worker)"""
+
+    def _receive(self, message: Any) -> None:
+        try:
+            envelope = json.loads(message)
+        except (TypeError, ValueError):
+            logger.warning(f"{self.label}: mensagem inválida descartada")
+            return
+        if not isinstance(envelope, dict):
+            return
+
+        try:
+            self.handle(envelope)
+        except Exception as e:
+            logger.exception(f"{self.label}: erro ao processar mensagem: {e}")
+
+    async def _listen(self) -> None:
+        try:
+            async for message in self._pubsub.listen():
+                if message.get("type") == "message":
+                    self._receive(message.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{self.label}: listener encerrado, voltando ao modo local: {e}")
+            self._redis = None
@@ -0,0 +1,54 @@
+# app/utils/singleflight.py
+
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.metrics import CACHE_REQUESTS
+
+
+class SingleFlight:
+    """
+    Coalesce chamadas concorrentes com a mesma chave: enquanto a primeira
+    está em andamento, as demais aguardam o mesmo resultado (ou exceção).
+    O resultado é compartilhado entre os chamadores e não deve ser mutado.
+
+    A chamada compartilhada roda num contexto vazio, não no do primeiro
+    chamador: o prazo e o rastreamento da requisição dele não valem para o
+    grupo. Ela tem o próprio `timeout`, e cada chamador pode limitar quanto
+    espera com `wait` sem afetar os demais.
+
+    Chamadas coalescidas contam como "hit" em cache_requests_total{cache=name}.
+    """
+
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                 wait: Optional[float] = None) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(
+                self._run(fn), context=contextvars.Context()
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            CACHE_REQUESTS.inc(self.name, "miss")
+        else:
+            CACHE_REQUESTS.inc(self.name, "hit")
+
+        # shield: o cancelamento (ou o timeout de espera) de um chamador não derruba os demais
+        if wait is None:
+            return await asyncio.shield(task)
+        return await asyncio.wait_for(asyncio.shield(task), wait)
+
+    async def _run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if self.timeout is None:
+            return await fn()
+        return await asyncio.wait_for(fn(), self.timeout)
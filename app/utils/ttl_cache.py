@@ -0,0 +1,54 @@
+# app/utils/ttl_cache.py
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from app.metrics import CACHE_REQUESTS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache LRU em memória com expiração por entrada. Pertence ao worker: entre
+    processos, a consistência é limitada pelo TTL de cada entrada.
+    """
+
+    def __init__(self, name: str, maxsize: int = 10000):
+        self.name = name
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING or entry[0] <= time.monotonic():
+            if entry is not _MISSING:
+                del self._entries[key]
+            CACHE_REQUESTS.inc(self.name, "miss")
+            return default
+
+        self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(self.name, "hit")
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Remove as entradas cuja chave satisfaz o predicado (todas, se omitido)"""
+        if predicate is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,12 +1,18 @@
 # app/utils/webhook.py
 
-import httpx
+import time
 import logging
 
+from app.metrics import WEBHOOK_DISPATCHES, WEBHOOK_DURATION
+
 logger = logging.getLogger(__name__)
 
 async def send_webhook(event_type: str, data: dict, url: str):
     """Sends a payload to a webhook URL asynchronously."""
+    import httpx
+    
+    start = time.perf_counter()
+    status = "error"
     async with httpx.AsyncClient() as client:
         try:
             payload = {
@@ -16,5 +22,10 @@ async def send_webhook(event_type: str, data: dict, url: str):
             response = await client.post(url, json=payload, timeout=5.0)
             if response.status_code >= 400:
                 logger.warning(f"Webhook {event_type} failed with status {response.status_code}")
+            else:
+                status = "ok"
         except Exception as e:
             logger.error(f"Error sending webhook {event_type}: {str(e)}")
+        finally:
+            WEBHOOK_DISPATCHES.inc(event_type, status)
+            WEBHOOK_DURATION.observe(time.perf_counter() - start, event_type)
@@ -0,0 +1,57 @@
+"""
+Overhead da dependência de autenticação por requisição:
+
+- decode:   jose.jwt.decode + TokenData a cada requisição (comportamento antigo)
+- cached:   authenticate_token com o LRU de tokens verificados e a revogação
+            consultada no Redis a cada AUTH_REVOCATION_CHECK_INTERVAL
+
+Uso: python -m benchmarks.bench_auth [iterações]
+"""
+
+import asyncio
+import sys
+import time
+
+from app.services import auth
+
+
+class _NullRedis:
+    async def get(self, key):
+        return None
+
+
+def bench_decode(token: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        auth._decode_token(token)
+    return time.perf_counter() - start
+
+
+def bench_cached(token: str, iterations: int) -> float:
+    redis_client = _NullRedis()
+
+    async def run():
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await auth.authenticate_token(token, redis_client)
+        return time.perf_counter() - start
+
+    auth.token_cache.clear()
+    return asyncio.run(run())
+
+
+def main(iterations: int = 20_000):
+    token = auth.create_access_token({"sub": "bench@meucfo.ai", "user_id": 1, "is_admin": False})
+    results = {
+        "decode": bench_decode(token, iterations),
+        "cached": bench_cached(token, iterations),
+    }
+
+    print(f"{'modo':<10}{'us/req':>10}")
+    for name, elapsed in results.items():
+        print(f"{name:<10}{elapsed / iterations * 1e6:>10.2f}")
+    return {name: elapsed / iterations for name, elapsed in results.items()}
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,80 @@
+"""
+Serialização das respostas grandes da API:
+
+- encoder:  jsonable_encoder + json da stdlib (JSONResponse padrão do FastAPI)
+- fast:     FastJSONResponse (orjson; modelos direto para bytes)
+
+Cargas: histórico de cálculos (/api/pricing/calculations), saída de
+/api/pricing/simulate e um PricingCalculationResponse isolado.
+
+Uso: python -m benchmarks.bench_json [iterações]
+"""
+
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.pricing import PricingCalculationRequest
+from app.responses import FastJSONResponse
+from app.services.pricing_calculator import PricingCalculatorService
+
+
+def build_payloads() -> dict:
+    request = PricingCalculationRequest(
+        business_type="varejo", product_cost=100.0, variable_expenses=5.0,
+        fixed_expenses_percent=10.0, sale_taxes_percent=8.0, net_profit_percent=15.0,
+        product_type="eletronicos", tax_regime="simples_nacional",
+        origin_state="SP", destination_state="RJ"
+    )
+    result = PricingCalculatorService.calculate_price(request)
+
+    history = {
+        "calculations": [
+            {
+                "id": i, "user_id": 1, "business_type": "varejo",
+                "product_cost": 100.0 + i, "calculated_price": 150.0 + i,
+                "margin": 33.3, "request_data": "{}", "result_data": "{}",
+                "created_at": "2024-01-01 12:00:00"
+            }
+            for i in range(500)
+        ],
+        "count": 500
+    }
+    simulation = {
+        "base_result": result.model_dump(),
+        "simulations": [
+            {"variation": {"product_cost": 100.0 + i}, "result": result.model_dump()}
+            for i in range(200)
+        ],
+        "variation_analysis": {"max_price_variation": 1.0, "recommendations": []}
+    }
+    return {"history": history, "simulation": simulation, "model": result}
+
+
+def bench(render, payload, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render(payload)
+    return (time.perf_counter() - start) / iterations
+
+
+def main(iterations: int = 200):
+    encoder = lambda payload: JSONResponse(jsonable_encoder(payload)).body
+    fast = lambda payload: FastJSONResponse(payload).body
+
+    results = {}
+    print(f"{'carga':<12}{'encoder us':>12}{'fast us':>12}{'ganho':>8}")
+    for name, payload in build_payloads().items():
+        assert len(encoder(payload)) > 0 and len(fast(payload)) > 0
+        before = bench(encoder, payload, iterations)
+        after = bench(fast, payload, iterations)
+        results[f"{name}_encoder"] = before
+        results[f"{name}_fast"] = after
+        print(f"{name:<12}{before * 1e6:>12.1f}{after * 1e6:>12.1f}{before / after:>7.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
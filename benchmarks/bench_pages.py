@@ -0,0 +1,90 @@
+"""
+Throughput dos endpoints HTML (landing, dashboard, calculadora):
+
+- render:   template renderizado a cada requisição (PAGE_CACHE_TTL=0)
+- cached:   HTML servido do cache de páginas
+
+Medido pela pilha HTTP completa (TestClient) e só em render_page, sem o
+overhead do cliente.
+- compile:  compilação a frio de todos os templates vs. carga do bytecode em disco
+
+Uso: python -m benchmarks.bench_pages [requisições]
+"""
+
+import sys
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app import templating
+from app.config import settings
+
+PAGES = ["/", "/dashboard", "/api/pricing/calculator"]
+
+
+def bench_requests(client: TestClient, requests: int) -> float:
+    for path in PAGES:
+        client.get(path)
+
+    start = time.perf_counter()
+    for i in range(requests):
+        client.get(PAGES[i % len(PAGES)])
+    return time.perf_counter() - start
+
+
+def bench_render_page(requests: int) -> float:
+    context = {"title": "MeuCFO.ai - Dashboard", "current_user": None}
+    templating.render_page(None, "dashboard.html", context)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        templating.render_page(None, "dashboard.html", context)
+    return time.perf_counter() - start
+
+
+def bench_compile() -> dict:
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        timings = {}
+        for label in ("cold", "bytecode"):
+            env = Environment(
+                loader=FileSystemLoader(templating.TEMPLATES_DIR),
+                bytecode_cache=FileSystemBytecodeCache(cache_dir)
+            )
+            start = time.perf_counter()
+            for name in env.list_templates(extensions=["html"]):
+                env.get_template(name)
+            timings[label] = time.perf_counter() - start
+    return timings
+
+
+def main(requests: int = 2_000):
+    from app.main import app
+
+    client = TestClient(app)
+    ttl = settings.PAGE_CACHE_TTL
+
+    try:
+        results = {}
+        for mode, page_ttl in (("render", 0), ("cached", 3600)):
+            settings.PAGE_CACHE_TTL = page_ttl
+            templating.clear_page_cache()
+            results[f"http_{mode}"] = bench_requests(client, requests) / requests
+            results[f"page_{mode}"] = bench_render_page(requests) / requests
+    finally:
+        settings.PAGE_CACHE_TTL = ttl
+
+    print(f"{'modo':<14}{'us/req':>10}{'req/s':>10}")
+    for name, per_request in results.items():
+        print(f"{name:<14}{per_request * 1e6:>10.1f}{1 / per_request:>10.0f}")
+
+    compile_times = bench_compile()
+    print(f"compilação a frio: {compile_times['cold'] * 1000:.1f}ms, "
+          f"carga do bytecode: {compile_times['bytecode'] * 1000:.1f}ms")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
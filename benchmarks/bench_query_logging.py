@@ -0,0 +1,85 @@
+"""
+Compara o custo, na thread do event loop, do log de queries D1:
+
+- legacy:   json.dumps do payload + logger.info síncrono (comportamento antigo)
+- queued:   QueryLogger com fila, todas as queries (sample_rate=1)
+- sampled:  QueryLogger com fila, sample_rate=0.1
+- off:      QueryLogger desligado (sample_rate=0)
+
+Uso: python -m benchmarks.bench_query_logging [iterações]
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueListener
+
+from app.d1_logging import QueryLogger
+from app.logging_config import BoundedQueueHandler
+
+SQL = """
+INSERT INTO users (email, password, name, phone, type, profile, document)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+PARAMS = ["user@example.com", "$2b$12$abcdefghijklmnopqrstuv", "Fulano", "11999999999", "PF", 1, "12345678900"]
+
+
+def _sink() -> logging.Handler:
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    return handler
+
+
+def bench_legacy(iterations: int) -> float:
+    logger = logging.getLogger("bench.legacy")
+    logger.handlers = [_sink()]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        payload = {"sql": SQL, "params": PARAMS}
+        logger.info(f"D1 Executing. Payload: {json.dumps(payload)}")
+    return time.perf_counter() - start
+
+
+def bench_query_logger(iterations: int, sample_rate: float) -> float:
+    query_logger = QueryLogger({"read": "INFO", "write": "INFO", "ddl": "INFO"}, sample_rate)
+    log_queue: queue.Queue = queue.Queue(maxsize=10000)
+    handler = BoundedQueueHandler(log_queue)
+    listener = QueueListener(log_queue, _sink())
+
+    query_logger.logger.handlers = [handler]
+    query_logger.logger.propagate = False
+    query_logger.logger.setLevel(logging.INFO)
+    listener.start()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        query_logger.log(SQL, PARAMS, 0.012, "ok", 0)
+    elapsed = time.perf_counter() - start
+
+    listener.stop()
+    query_logger.logger.handlers = []
+    query_logger.logger.propagate = True
+    return elapsed
+
+
+def main(iterations: int = 100_000):
+    results = {
+        "legacy": bench_legacy(iterations),
+        "queued": bench_query_logger(iterations, 1.0),
+        "sampled": bench_query_logger(iterations, 0.1),
+        "off": bench_query_logger(iterations, 0.0),
+    }
+
+    print(f"{'modo':<10}{'us/query':>12}{'queries/s':>14}")
+    for name, elapsed in results.items():
+        print(f"{name:<10}{elapsed / iterations * 1e6:>12.2f}{iterations / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,74 @@
+"""
+Leituras de users servidas pela réplica local vs. pelo D1:
+
+- d1:        UserRepository.get_by_email com a réplica desligada (ida ao D1,
+             simulada em SQLite local com a latência informada)
+- replica:   a mesma chamada servida pelo SQLite embutido
+- sync:      sincronização incremental sem mudanças (custo de fundo por ciclo)
+
+Uso: python -m benchmarks.bench_replica [usuários] [latência D1 em s]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("D1_QUERY_LOG_SAMPLE_RATE", "0")
+
+from app.migrations import migrate  # noqa: E402
+from app.replica import read_replica  # noqa: E402
+from app.repositories.users import UserRepository  # noqa: E402
+from benchmarks.fakes import install_local_d1  # noqa: E402
+
+
+async def timed(fn, number: int) -> float:
+    start = time.perf_counter()
+    for i in range(number):
+        await fn(i)
+    return (time.perf_counter() - start) / number
+
+
+async def run(users: int, latency: float) -> dict:
+    d1 = install_local_d1()
+    await migrate()
+    d1.conn.executemany(
+        "INSERT INTO users (email, password, name, phone, type, profile, document) "
+        "VALUES (?, 'x', 'Usuário', '', 'PF', 1, '')",
+        [(f"user{i}@meucfo.ai",) for i in range(users)]
+    )
+    d1.conn.commit()
+    d1.latency = latency
+
+    async def lookup(i):
+        assert await UserRepository.get_by_email(f"user{i % users}@meucfo.ai") is not None
+
+    results = {"d1": await timed(lookup, 50)}
+
+    start = time.perf_counter()
+    await read_replica.start(refresh_interval=3600)
+    results["snapshot"] = time.perf_counter() - start
+    try:
+        results["replica"] = await timed(lookup, 20_000)
+        results["sync"] = await timed(lambda i: read_replica.sync("users"), 20)
+    finally:
+        await read_replica.stop()
+    return results
+
+
+def main(users: int = 5000, latency: float = 0.03) -> dict:
+    results = asyncio.run(run(users, latency))
+    print(f"{users} usuários, latência D1 simulada {latency * 1000:.0f}ms")
+    print(f"cópia inicial: {results['snapshot'] * 1000:.1f}ms")
+    print(f"{'modo':<10}{'us/op':>12}")
+    for name in ("d1", "replica", "sync"):
+        print(f"{name:<10}{results[name] * 1e6:>12.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+    )
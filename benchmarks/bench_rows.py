@@ -0,0 +1,54 @@
+"""
+Custo por linha do mapeamento de users nos repositórios:
+
+- pydantic:  UserInDB(**linha) sobre SELECT * (comportamento antigo)
+- row:       UserRow.from_row sobre a projeção de UserRow.columns()
+- boundary:  UserResponse.model_validate(UserRow), a validação que sobra na
+             fronteira da API (uma vez por resposta, não por leitura interna)
+
+Uso: python -m benchmarks.bench_rows [linhas]
+"""
+
+import sys
+import time
+
+from app.models.user import UserInDB, UserResponse
+from app.repositories.rows import UserRow
+
+FULL_ROW = {
+    "id": 1, "type": "PF", "name": "Maria Souza", "email": "maria@meucfo.ai",
+    "phone": "11999990000", "document": "12345678900", "area": "Varejo",
+    "cep": "01001000", "address": "Praça da Sé", "state": "SP", "city": "São Paulo",
+    "number_complement": "100", "profile": 1,
+    "password": "$2b$12$abcdefghijklmnopqrstuuJ1mWw3Yh0s6b4S4bM5m8c9o8v7sQ2a",
+    "created_at": "2024-05-01 12:00:00"
+}
+
+
+def bench(fn, rows) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    return (time.perf_counter() - start) / len(rows)
+
+
+def main(count: int = 20_000):
+    full_rows = [dict(FULL_ROW, id=i) for i in range(count)]
+    projected = [{name: row[name] for name in UserRow.FIELDS} for row in full_rows]
+    mapped = [UserRow.from_row(row) for row in projected]
+
+    results = {
+        "pydantic": bench(lambda row: UserInDB(**row), full_rows),
+        "row": bench(UserRow.from_row, projected),
+        "boundary": bench(UserResponse.model_validate, mapped),
+    }
+
+    print(f"colunas: SELECT * = {len(FULL_ROW)}, projeção = {len(UserRow.FIELDS)}")
+    print(f"{'modo':<10}{'us/linha':>10}")
+    for name, per_row in results.items():
+        print(f"{name:<10}{per_row * 1e6:>10.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
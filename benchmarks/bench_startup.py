@@ -0,0 +1,69 @@
+"""
+Mede o custo de boot de um worker: tempo de `import app.main` em processos
+novos (python -X importtime) e os módulos mais caros.
+
+Uso: python -m benchmarks.bench_startup [execuções] [--top N]
+"""
+
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once():
+    """Importa app.main em um processo novo; retorna (parede em s, {módulo: (self_us, cumulativo_us, nível)})"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - start
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return wall, modules
+
+
+def main(runs: int = 5, top: int = 15):
+    walls, imports, samples = [], [], []
+    for _ in range(runs):
+        wall, modules = run_once()
+        walls.append(wall)
+        imports.append(modules["app.main"][1] / 1e6)
+        samples.append(modules)
+
+    print(f"execuções: {runs}")
+    print(f"import app.main (mediana): {statistics.median(imports) * 1000:.1f}ms")
+    print(f"processo completo (mediana): {statistics.median(walls) * 1000:.1f}ms")
+
+    # Custo cumulativo mediano dos módulos importados diretamente por app.*
+    names = set.intersection(*(set(s) for s in samples))
+    ranked = sorted(
+        ((statistics.median(s[name][1] for s in samples), name) for name in names if samples[0][name][2] <= 1),
+        reverse=True
+    )
+    print(f"\n{'módulo':<40}{'cumulativo':>12}")
+    for cumulative, name in ranked[:top]:
+        print(f"{name:<40}{cumulative / 1000:>10.1f}ms")
+
+    heavy = ("jinja2", "passlib", "jose", "httpx", "numpy", "redis")
+    loaded = [m for m in heavy if m in samples[0]]
+    print(f"\ndependências pesadas carregadas no boot: {', '.join(loaded) or 'nenhuma'}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    top = 15
+    if "--top" in args:
+        i = args.index("--top")
+        top = int(args[i + 1])
+        del args[i:i + 2]
+    main(int(args[0]) if args else 5, top)
@@ -0,0 +1,158 @@
+"""
+Escala de throughput por número de workers: sobe o perfil de produção
+(gunicorn + workers uvicorn, app/server.py) com 1, 2, 4... workers sobre um
+D1 em arquivo SQLite compartilhado, com latência injetada, e dispara o mix do
+benchmarks.loadtest por HTTP real contra cada configuração.
+
+O gerador de carga roda neste processo e disputa CPU com os workers: o ganho
+só aparece se a máquina tiver núcleos livres além dos workers (o relatório
+registra quantas CPUs estavam disponíveis). Sem Redis, cada worker usa o
+LocalRedis; o rate limit de login não interfere porque o mix só faz logins
+válidos.
+
+Uso: python -m benchmarks.bench_workers [--workers 1,2,4] [--concurrency 32] [--duration 10]
+                                        [--mix login=1,calculate=3,history=3,dashboard=3]
+                                        [--d1-latency 0.03] [--d1-jitter 0.02]
+                                        [--webhook-latency 0.1] [--seed 1] [--output arquivo.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("D1_QUERY_LOG_SAMPLE_RATE", "0")
+os.environ.setdefault("FMP_PROVIDER", "fake")
+
+import httpx  # noqa: E402
+
+from app.server import default_workers  # noqa: E402
+from benchmarks.fakes import install_local_d1  # noqa: E402
+from benchmarks.loadtest import DEFAULT_MIX, drive  # noqa: E402
+
+
+def prepare_database(path: str) -> None:
+    """Schema e admin no arquivo SQLite que os workers vão compartilhar"""
+    from app.migrations import migrate
+
+    d1 = install_local_d1(path)
+    d1.conn.execute("PRAGMA journal_mode=WAL")
+    asyncio.run(migrate())
+    d1.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, args, db_path: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        # Avisos de stall do monitor do loop (bcrypt no login) poluiriam a saída
+        "LOG_LEVEL": "ERROR",
+        "WEB_CONCURRENCY": str(workers),
+        "DB_MIGRATE_ON_STARTUP": "false",
+        "BENCH_D1_PATH": db_path,
+        "BENCH_D1_LATENCY": str(args.d1_latency),
+        "BENCH_D1_JITTER": str(args.d1_jitter),
+        "BENCH_WEBHOOK_LATENCY": str(args.webhook_latency),
+    }
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "-c", "python:benchmarks.gunicorn_offline",
+            "-w", str(workers), "-b", f"127.0.0.1:{port}", "--log-level", "warning",
+            "app.main:app"
+        ],
+        env=env
+    )
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"gunicorn encerrou com código {process.returncode}")
+            try:
+                if (await client.get("/api/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"servidor não respondeu em {timeout:.0f}s")
+
+
+async def measure(url: str, process: subprocess.Popen, args) -> dict:
+    await wait_ready(url, process)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        return await drive(client, args)
+
+
+def run(args) -> dict:
+    counts = [int(n) for n in args.workers.split(",")]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "d1.sqlite")
+        prepare_database(db_path)
+
+        for workers in counts:
+            port = free_port()
+            process = start_server(workers, port, args, db_path)
+            try:
+                report = asyncio.run(measure(f"http://127.0.0.1:{port}", process, args))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+            results[str(workers)] = report
+
+    base_rps = results[str(counts[0])]["rps"]
+    for report in results.values():
+        report["speedup"] = report["rps"] / base_rps if base_rps else 0.0
+
+    return {
+        "cpus": default_workers(),
+        "config": next(iter(results.values()))["config"],
+        "results": results
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default="1,2,4", help="números de workers a comparar")
+    parser.add_argument("--concurrency", type=int, default=32, help="usuários virtuais simultâneos")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos de carga por configuração")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="pesos por cenário (nome=peso,...)")
+    parser.add_argument("--d1-latency", type=float, default=0.03, help="latência base por query D1 (s)")
+    parser.add_argument("--d1-jitter", type=float, default=0.02, help="variação uniforme extra por query (s)")
+    parser.add_argument("--webhook-latency", type=float, default=0.1, help="tempo de resposta do webhook (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="grava o relatório em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+
+    print(f"CPUs disponíveis: {report['cpus']}")
+    print(f"{'workers':>8}{'req':>8}{'err':>6}{'req/s':>9}{'speedup':>9}{'p50 ms':>9}{'p99 ms':>9}")
+    for workers, r in report["results"].items():
+        print(
+            f"{workers:>8}{r['requests']:>8}{r['errors']:>6}{r['rps']:>9.1f}"
+            f"{r['speedup']:>8.2f}x{r['p50_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,49 @@
+"""
+Dublês offline para benchmarks: D1 sobre SQLite em memória, Redis em dicionário
+e transporte httpx que responde aos webhooks sem rede.
+"""
+
+import asyncio
+from contextlib import contextmanager
+
+import httpx
+
+from app import d1_client as d1_module
+from app.utils.local_d1 import LocalD1Client
+from app.utils.local_redis import LocalRedis
+
+
+def install_local_d1(path: str = ":memory:", latency: float = 0.0, jitter: float = 0.0) -> LocalD1Client:
+    """Substitui o cliente global (execute_sql o resolve a cada chamada)"""
+    client = LocalD1Client(path, latency, jitter)
+    d1_module.d1_client = client
+    return client
+
+
+# Mesmo fallback em memória que a aplicação usa sem Redis
+FakeRedis = LocalRedis
+
+
+@contextmanager
+def offline_webhooks(status_code: int = 200, latency: float = 0.0):
+    """Faz httpx.AsyncClient responder localmente (send_webhook sem rede)"""
+    original = httpx.AsyncClient
+
+    async def respond(request):
+        if latency:
+            await asyncio.sleep(latency)
+        return httpx.Response(status_code, json={"ok": True})
+
+    transport = httpx.MockTransport(respond)
+
+    class _OfflineAsyncClient(original):
+        # Clientes com transporte explícito (ex.: ASGITransport) ficam intactos
+        def __init__(self, *args, **kwargs):
+            kwargs.setdefault("transport", transport)
+            super().__init__(*args, **kwargs)
+
+    httpx.AsyncClient = _OfflineAsyncClient
+    try:
+        yield
+    finally:
+        httpx.AsyncClient = original
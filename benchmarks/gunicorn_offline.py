@@ -0,0 +1,30 @@
+"""
+Configuração do gunicorn para benchmarks: o mesmo perfil de app/server.py,
+com o D1 num arquivo SQLite compartilhado pelos workers (latência injetável)
+e webhooks respondidos localmente. benchmarks.bench_workers define
+BENCH_D1_PATH, BENCH_D1_LATENCY, BENCH_D1_JITTER e BENCH_WEBHOOK_LATENCY.
+
+Uso: gunicorn -c python:benchmarks.gunicorn_offline -w 2 app.main:app
+"""
+
+import os
+
+from app.server import *  # noqa: F401,F403
+
+# Referência mantida até o worker encerrar: se o context manager for coletado,
+# o finally restaura o httpx.AsyncClient original
+_offline_webhooks = None
+
+
+def post_worker_init(worker):
+    """Depois de importar app.main e antes do lifespan, em cada worker"""
+    global _offline_webhooks
+    from benchmarks.fakes import install_local_d1, offline_webhooks
+
+    install_local_d1(
+        os.environ["BENCH_D1_PATH"],
+        latency=float(os.environ.get("BENCH_D1_LATENCY", "0")),
+        jitter=float(os.environ.get("BENCH_D1_JITTER", "0"))
+    )
+    _offline_webhooks = offline_webhooks(latency=float(os.environ.get("BENCH_WEBHOOK_LATENCY", "0")))
+    _offline_webhooks.__enter__()
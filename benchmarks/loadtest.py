@@ -0,0 +1,234 @@
+"""
+Teste de carga offline: a aplicação roda no mesmo processo (ASGI, sem
+socket), com D1 em SQLite local com latência injetável, Redis falso e
+webhooks respondidos localmente. Usuários virtuais executam um mix de
+cenários até o fim da duração e o relatório traz throughput e p50/p95/p99
+por rota.
+
+Cenários:
+- login:      POST /api/auth/login
+- calculate:  POST /api/pricing/calculate (grava no D1 e dispara o webhook)
+- history:    GET /api/pricing/calculations?limit=50
+- dashboard:  GET /dashboard, /api/dashboard/metrics e /api/pricing/calculations?limit=5
+              (o que o navegador carrega ao abrir o dashboard)
+
+Uso: python -m benchmarks.loadtest [--concurrency 20] [--duration 10]
+                                   [--mix login=1,calculate=3,history=3,dashboard=3]
+                                   [--d1-latency 0.03] [--d1-jitter 0.02]
+                                   [--webhook-latency 0.1] [--seed 1] [--output arquivo.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("D1_QUERY_LOG_SAMPLE_RATE", "0")
+os.environ.setdefault("FMP_PROVIDER", "fake")
+
+import httpx  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.rate_limit import InstrumentedRedis  # noqa: E402
+from benchmarks.fakes import FakeRedis, install_local_d1, offline_webhooks  # noqa: E402
+from benchmarks.suite import CALCULATION  # noqa: E402
+
+DEFAULT_MIX = "login=1,calculate=3,history=3,dashboard=3"
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Cenários desconhecidos: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por posição mais próxima (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, method: str, url: str, route: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        self.latencies[route].append(time.perf_counter() - start)
+        if not ok:
+            self.errors[route] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            values.sort()
+            routes[route] = {
+                "requests": len(values),
+                "errors": self.errors.get(route, 0),
+                "rps": len(values) / elapsed,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000
+            }
+        overall = sorted(v for values in self.latencies.values() for v in values)
+        return {
+            "elapsed_s": elapsed,
+            "requests": len(overall),
+            "errors": sum(r["errors"] for r in routes.values()),
+            "rps": len(overall) / elapsed,
+            "p50_ms": percentile(overall, 50) * 1000,
+            "p99_ms": percentile(overall, 99) * 1000,
+            "routes": routes
+        }
+
+
+async def scenario_login(client, recorder, headers):
+    await recorder.request(
+        client, "POST", "/api/auth/login", "POST /api/auth/login",
+        json={"email": settings.APP_ADMIN_MAIL, "password": settings.APP_ADMIN_PASS}
+    )
+
+
+async def scenario_calculate(client, recorder, headers):
+    await recorder.request(
+        client, "POST", "/api/pricing/calculate", "POST /api/pricing/calculate",
+        json=CALCULATION, headers=headers
+    )
+
+
+async def scenario_history(client, recorder, headers):
+    await recorder.request(
+        client, "GET", "/api/pricing/calculations?limit=50", "GET /api/pricing/calculations",
+        headers=headers
+    )
+
+
+async def scenario_dashboard(client, recorder, headers):
+    await recorder.request(client, "GET", "/dashboard", "GET /dashboard")
+    await recorder.request(
+        client, "GET", "/api/dashboard/metrics", "GET /api/dashboard/metrics", headers=headers
+    )
+    await recorder.request(
+        client, "GET", "/api/pricing/calculations?limit=5", "GET /api/pricing/calculations",
+        headers=headers
+    )
+
+
+SCENARIOS = {
+    "login": scenario_login,
+    "calculate": scenario_calculate,
+    "history": scenario_history,
+    "dashboard": scenario_dashboard,
+}
+
+
+async def drive(client: httpx.AsyncClient, args) -> dict:
+    """Usuários virtuais executando o mix contra `client` (in-process ou servidor real)"""
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+
+    login = await client.post(
+        "/api/auth/login",
+        json={"email": settings.APP_ADMIN_MAIL, "password": settings.APP_ADMIN_PASS}
+    )
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    deadline = time.perf_counter() + args.duration
+
+    async def virtual_user():
+        while time.perf_counter() < deadline:
+            scenario = SCENARIOS[rng.choices(names, weights)[0]]
+            await scenario(client, recorder, headers)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    report = recorder.report(elapsed)
+    report["config"] = {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": mix,
+        "d1_latency_s": args.d1_latency,
+        "d1_jitter_s": args.d1_jitter,
+        "webhook_latency_s": args.webhook_latency,
+        "seed": args.seed
+    }
+    return report
+
+
+async def run_load(args) -> dict:
+    from app.main import app
+    from app.migrations import migrate
+
+    install_local_d1(latency=args.d1_latency, jitter=args.d1_jitter)
+    await migrate()
+    app.state.redis = InstrumentedRedis(FakeRedis())
+
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits) as client:
+        return await drive(client, args)
+
+
+def print_report(report: dict) -> None:
+    print(f"{'rota':<36}{'req':>7}{'err':>5}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for route, r in report["routes"].items():
+        print(
+            f"{route:<36}{r['requests']:>7}{r['errors']:>5}{r['rps']:>8.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}"
+        )
+    print(
+        f"total: {report['requests']} requisições, {report['errors']} erros, "
+        f"{report['rps']:.1f} req/s em {report['elapsed_s']:.1f}s"
+    )
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=20, help="usuários virtuais simultâneos")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos de carga")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="pesos por cenário (nome=peso,...)")
+    parser.add_argument("--d1-latency", type=float, default=0.03, help="latência base por query D1 (s)")
+    parser.add_argument("--d1-jitter", type=float, default=0.02, help="variação uniforme extra por query (s)")
+    parser.add_argument("--webhook-latency", type=float, default=0.1, help="tempo de resposta do webhook (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="grava o relatório em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    with offline_webhooks(latency=args.webhook_latency):
+        report = asyncio.run(run_load(args))
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
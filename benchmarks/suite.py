@@ -0,0 +1,240 @@
+"""
+Suíte de benchmarks dos caminhos de precificação, autenticação e D1, offline:
+D1 em SQLite local, Redis falso e webhooks respondidos sem rede.
+
+Casos:
+- calculate_price:   PricingCalculatorService.calculate_price por chamada
+- simulate:          POST /api/pricing/simulate com N variações
+- login:             POST /api/auth/login (bcrypt + D1 + rate limit no Redis)
+- me:                GET /api/auth/me com token válido
+- history:           GET /api/pricing/calculations com 200 cálculos
+- webhook:           send_webhook até a resposta do transporte local
+
+O resultado (mediana e mínimo por operação, em segundos) sai em JSON. Com
+--baseline, cada caso é comparado pelo mínimo entre rodadas (menos sensível a
+ruído da máquina) e a execução falha (código 1) se algum ficar mais lento que
+baseline * (1 + threshold). Cada modo tem o seu baseline (baseline.json e
+baseline.quick.json): o modo --quick roda menos iterações e seus mínimos não
+são comparáveis aos do modo completo, então um baseline de outro modo é
+ignorado com um aviso. Os números são absolutos: regenere o baseline
+(--update-baseline) ao trocar de máquina.
+
+Uso: python -m benchmarks.suite [--output arquivo.json] [--baseline benchmarks/baseline.json]
+                                [--threshold 0.25] [--update-baseline] [--quick]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple
+
+# Antes de importar a aplicação: sem log por requisição nem provedores externos
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("D1_QUERY_LOG_SAMPLE_RATE", "0")
+os.environ.setdefault("FMP_PROVIDER", "fake")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.models.pricing import PricingCalculationRequest  # noqa: E402
+from app.rate_limit import InstrumentedRedis  # noqa: E402
+from app.services.pricing_calculator import PricingCalculatorService  # noqa: E402
+from benchmarks.fakes import FakeRedis, install_local_d1, offline_webhooks  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+QUICK_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.quick.json")
+SIMULATION_VARIATIONS = 50
+HISTORY_ROWS = 200
+
+CALCULATION = {
+    "business_type": "varejo",
+    "product_cost": 100.0,
+    "shipping_insurance": 5.0,
+    "icms_purchase_percent": 12.0,
+    "variable_expenses": 3.0,
+    "fixed_expenses_percent": 10.0,
+    "sale_taxes_percent": 8.0,
+    "net_profit_percent": 15.0,
+    "product_type": "eletronicos",
+    "tax_regime": "simples_nacional",
+    "origin_state": "SP",
+    "destination_state": "RJ"
+}
+
+
+class Case(NamedTuple):
+    name: str
+    fn: Callable[[], None]
+    number: int  # operações por rodada
+    repeat: int  # rodadas (a mediana é entre rodadas)
+
+
+def setup_environment():
+    """D1 local com schema e dados, Redis falso e um token válido do admin"""
+    from app.main import app
+    from app.migrations import migrate
+
+    d1 = install_local_d1()
+    asyncio.run(migrate())
+
+    admin_id = d1.conn.execute("SELECT id FROM users WHERE profile = 2").fetchone()[0]
+    d1.conn.executemany(
+        """
+        INSERT INTO pricing_data (user_id, business_type, product_cost, product_type, tax_regime,
+                                  origin_state, destination_state, calculated_price, margin)
+        VALUES (?, 'varejo', ?, 'eletronicos', 'simples_nacional', 'SP', 'RJ', ?, 25.0)
+        """,
+        [(admin_id, 100.0 + i, 150.0 + i) for i in range(HISTORY_ROWS)]
+    )
+    d1.conn.commit()
+
+    app.state.redis = InstrumentedRedis(FakeRedis())
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": settings.APP_ADMIN_MAIL, "password": settings.APP_ADMIN_PASS}
+    )
+    response.raise_for_status()
+    token = response.json()["access_token"]
+    return client, {"Authorization": f"Bearer {token}"}
+
+
+def build_cases(quick: bool = False) -> List[Case]:
+    client, auth_headers = setup_environment()
+    scale = 0.2 if quick else 1.0
+
+    request = PricingCalculationRequest(**CALCULATION)
+    simulate_body = {
+        "base_request": CALCULATION,
+        "variations": [{"product_cost": 50.0 + i} for i in range(SIMULATION_VARIATIONS)]
+    }
+    login_body = {"email": settings.APP_ADMIN_MAIL, "password": settings.APP_ADMIN_PASS}
+    loop = asyncio.new_event_loop()
+
+    def calculate_price():
+        PricingCalculatorService.calculate_price(request)
+
+    def simulate():
+        client.post("/api/pricing/simulate", json=simulate_body, headers=auth_headers).raise_for_status()
+
+    def login():
+        client.post("/api/auth/login", json=login_body).raise_for_status()
+
+    def me():
+        client.get("/api/auth/me", headers=auth_headers).raise_for_status()
+
+    def history():
+        client.get("/api/pricing/calculations?limit=200", headers=auth_headers).raise_for_status()
+
+    def webhook():
+        from app.utils.webhook import send_webhook
+        with offline_webhooks():
+            loop.run_until_complete(send_webhook("benchmark", {"id": 1}, "http://webhook.local/hook"))
+
+    def n(value: int) -> int:
+        return max(1, int(value * scale))
+
+    return [
+        Case("calculate_price", calculate_price, n(2000), 7),
+        Case("simulate", simulate, n(50), 9),
+        Case("login", login, n(2), 5),
+        Case("me", me, n(200), 7),
+        Case("history", history, n(100), 7),
+        Case("webhook", webhook, n(200), 7),
+    ]
+
+
+def measure(case: Case) -> Dict[str, float]:
+    case.fn()  # aquecimento
+    timings = []
+    for _ in range(case.repeat):
+        start = time.perf_counter()
+        for _ in range(case.number):
+            case.fn()
+        timings.append((time.perf_counter() - start) / case.number)
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "number": case.number,
+        "repeat": case.repeat
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Casos cujo tempo mínimo piorou além do limite em relação ao baseline"""
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if current["min_s"] > reference["min_s"] * (1 + threshold):
+            regressions.append(
+                f"{name}: {current['min_s'] * 1e6:.1f}us > {reference['min_s'] * 1e6:.1f}us "
+                f"(+{(current['min_s'] / reference['min_s'] - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def run(quick: bool = False) -> dict:
+    results = {case.name: measure(case) for case in build_cases(quick)}
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick
+        },
+        "results": results
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="grava o resultado em JSON neste arquivo")
+    parser.add_argument("--baseline", default=None, help="compara com este resultado (padrão: baseline.json ou baseline.quick.json)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="piora máxima aceita (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="grava o resultado como novo baseline")
+    parser.add_argument("--quick", action="store_true", help="menos iterações (smoke test)")
+    args = parser.parse_args(argv)
+    baseline_path = args.baseline or (QUICK_BASELINE if args.quick else DEFAULT_BASELINE)
+
+    report = run(args.quick)
+
+    print(f"{'caso':<18}{'mediana us':>12}{'mínimo us':>12}")
+    for name, result in report["results"].items():
+        print(f"{name:<18}{result['median_s'] * 1e6:>12.1f}{result['min_s'] * 1e6:>12.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline atualizado: {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("quick", False) != args.quick:
+        mode = "quick" if args.quick else "completo"
+        print(f"baseline {baseline_path} é de outro modo; comparação ignorada (rodada: {mode})")
+        return 0
+    regressions = compare(report["results"], baseline["results"], args.threshold)
+    for line in regressions:
+        print(f"REGRESSÃO {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
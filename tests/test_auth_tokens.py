@@ -0,0 +1,84 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import auth
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def _token(**overrides):
+    data = {"sub": "a@b.com", "user_id": 7, "is_admin": False, **overrides}
+    return auth.create_access_token(data)
+
+
+def test_verified_tokens_are_cached():
+    auth.token_cache.clear()
+    token = _token()
+
+    first = auth.verify_token(token)
+    assert len(auth.token_cache) == 1
+    assert auth.verify_token(token) is first
+
+
+def test_expired_tokens_are_rejected():
+    auth.token_cache.clear()
+    token = auth.create_access_token({"sub": "a@b.com", "user_id": 7}, timedelta(seconds=-5))
+
+    with pytest.raises(HTTPException):
+        auth.verify_token(token)
+    assert len(auth.token_cache) == 0
+
+
+def test_revocation_is_checked_sparingly_and_honoured():
+    auth.token_cache.clear()
+    redis_client = FakeRedis()
+    token = _token(user_id=8)
+
+    async def scenario():
+        for _ in range(5):
+            await auth.authenticate_token(token, redis_client)
+        assert redis_client.gets == 1
+
+        await auth.revoke_token(token, redis_client)
+        assert any(k.startswith("revoked_token:") for k in redis_client.data)
+
+        with pytest.raises(HTTPException):
+            await auth.authenticate_token(token, redis_client)
+
+        # Outro worker (cache vazio) também enxerga a revogação pelo Redis
+        auth.token_cache.clear()
+        with pytest.raises(HTTPException):
+            await auth.authenticate_token(token, redis_client)
+
+    asyncio.run(scenario())
+
+
+def test_stream_ticket_is_single_use():
+    from app.utils.local_redis import LocalRedis
+
+    async def scenario():
+        redis = LocalRedis()
+        ticket = await auth.issue_stream_ticket(7, redis)
+        assert ticket.count(".") == 0  # opaco, não é um JWT
+        assert await auth.redeem_stream_ticket(ticket, redis) == 7
+
+        with pytest.raises(HTTPException):
+            await auth.redeem_stream_ticket(ticket, redis)
+        with pytest.raises(HTTPException):
+            await auth.redeem_stream_ticket("inventado", redis)
+
+    asyncio.run(scenario())
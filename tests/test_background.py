@@ -0,0 +1,87 @@
+import asyncio
+
+from app.background import PRIORITY_HIGH, PRIORITY_LOW, BackgroundTaskManager, QueueConfig
+from app.metrics import BACKGROUND_QUEUE_LENGTH, BACKGROUND_TASKS
+from app.resilience import deadline, remaining
+
+
+def test_priority_order_and_bounded_concurrency():
+    async def scenario():
+        manager = BackgroundTaskManager({"q": QueueConfig(concurrency=2, maxsize=10)})
+        await manager.start()
+        running, peak, order = 0, 0, []
+        release = asyncio.Event()
+
+        async def job(label):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            order.append(label)
+            running -= 1
+
+        manager.submit("q", job, "blocker-1")
+        manager.submit("q", job, "blocker-2")
+        await asyncio.sleep(0)
+        manager.submit("q", job, "low", priority=PRIORITY_LOW)
+        manager.submit("q", job, "high", priority=PRIORITY_HIGH)
+        assert BACKGROUND_QUEUE_LENGTH.value("q") == 2
+
+        await asyncio.sleep(0.01)
+        release.set()
+        assert await manager.stop(timeout=1) == 0
+        assert peak == 2
+        assert order.index("high") < order.index("low")
+
+    asyncio.run(scenario())
+
+
+def test_failures_are_counted_and_full_queue_drops():
+    async def scenario():
+        manager = BackgroundTaskManager({"f": QueueConfig(concurrency=1, maxsize=1)})
+        errors = BACKGROUND_TASKS.value("f", "error")
+        dropped = BACKGROUND_TASKS.value("f", "dropped")
+
+        async def boom():
+            raise RuntimeError("falhou")
+
+        # Sem start explícito o gerenciador sobe no primeiro submit
+        assert manager.submit("f", boom)
+        assert not manager.submit("f", boom)
+        await manager.stop(timeout=1)
+
+        assert BACKGROUND_TASKS.value("f", "error") == errors + 1
+        assert BACKGROUND_TASKS.value("f", "dropped") == dropped + 1
+
+    asyncio.run(scenario())
+
+
+def test_shutdown_drains_then_cancels_and_tasks_skip_request_context():
+    async def scenario():
+        manager = BackgroundTaskManager({"d": QueueConfig(concurrency=1, maxsize=10)})
+        done, budgets = [], []
+
+        async def quick(i):
+            budgets.append(remaining())
+            done.append(i)
+
+        async def stuck():
+            await asyncio.sleep(3600)
+
+        with deadline(0.5):
+            for i in range(3):
+                manager.submit("d", quick, i)
+        await manager.stop(timeout=1)
+        assert done == [0, 1, 2]
+        assert budgets == [float("inf")] * 3
+
+        # Depois do stop nada entra até um novo start
+        assert not manager.submit("d", quick, 98)
+        await manager.start()
+        manager.submit("d", stuck)
+        manager.submit("d", quick, 99)
+        await asyncio.sleep(0)
+        assert await manager.stop(timeout=0.05) == 1
+        assert 99 not in done
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import FakeRedis, LocalD1Client
+from benchmarks.suite import compare
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {"fast": {"min_s": 1.0}, "slow": {"min_s": 1.0}}
+    results = {"fast": {"min_s": 1.2}, "slow": {"min_s": 1.5}, "new": {"min_s": 9.0}}
+
+    regressions = compare(results, baseline, threshold=0.25)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slow:")
+
+
+def test_local_d1_matches_d1_client_contract():
+    d1 = LocalD1Client()
+
+    async def scenario():
+        await d1.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        insert = await d1.execute("INSERT INTO t (name) VALUES (?)", ["a"])
+        select = await d1.execute("SELECT * FROM t")
+        error = await d1.execute("SELECT * FROM missing")
+        return insert, select, error
+
+    insert, select, error = asyncio.run(scenario())
+    assert insert["meta"]["last_row_id"] == 1
+    assert select == {"success": True, "results": [{"id": 1, "name": "a"}], "meta": select["meta"]}
+    assert error["success"] is False
+
+
+def test_fake_redis_counters_expire():
+    redis = FakeRedis()
+
+    async def scenario():
+        assert await redis.incr("k") == 1
+        assert await redis.incr("k") == 2
+        await redis.expire("k", 0)
+        return await redis.get("k"), await redis.ttl("k")
+
+    assert asyncio.run(scenario()) == (None, -2)
+
+
+def test_loadtest_percentiles_and_mix():
+    from benchmarks.loadtest import parse_mix, percentile
+
+    values = [i / 100 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.5
+    assert percentile(values, 99) == 0.99
+    assert percentile([], 95) == 0.0
+
+    assert parse_mix("login=1,history=3") == {"login": 1.0, "history": 3.0}
+    with pytest.raises(ValueError):
+        parse_mix("checkout=1")
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from app.repositories.named_queries import NamedQueryRepository, query_cache
+from app.utils.cache_bus import CacheBus
+from app.utils.local_redis import LocalRedis
+from app.utils.pubsub import ChannelSubscriber
+
+
+class _Channel:
+    """Pub/sub em memória compartilhado por vários "workers" do mesmo teste"""
+
+    def __init__(self):
+        self.queues = []
+
+    def pubsub(self):
+        return _PubSub(self)
+
+    async def publish(self, channel, message):
+        for queue in self.queues:
+            queue.put_nowait({"type": "message", "data": message})
+        return len(self.queues)
+
+
+class _PubSub:
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, name):
+        self.channel.queues.append(self.queue)
+
+    async def unsubscribe(self, name):
+        self.channel.queues.remove(self.queue)
+
+    async def aclose(self):
+        pass
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+def test_invalidation_reaches_other_workers_once():
+    async def scenario():
+        channel = _Channel()
+        calls = {"a": [], "b": []}
+        worker_a, worker_b = CacheBus(), CacheBus()
+        worker_a.register("pages", lambda **payload: calls["a"].append(payload) or 1)
+        worker_b.register("pages", lambda **payload: calls["b"].append(payload) or 1)
+
+        await worker_a.start(channel)
+        await worker_b.start(channel)
+        assert worker_a.origin != worker_b.origin
+
+        assert await worker_a.invalidate("pages", user_id=7) == 1
+        await asyncio.sleep(0.01)
+
+        # Local na hora; o próprio worker ignora o eco do canal
+        assert calls == {"a": [{"user_id": 7}], "b": [{"user_id": 7}]}
+
+        await worker_a.stop()
+        await worker_b.stop()
+        assert channel.queues == []
+
+    asyncio.run(scenario())
+
+
+def test_failing_message_does_not_stop_the_listener():
+    async def scenario():
+        channel = _Channel()
+        received = []
+
+        def handler(user_id):
+            if user_id is None:
+                raise RuntimeError("falhou")
+            received.append(user_id)
+
+        publisher, listener = CacheBus(), CacheBus()
+        listener.register("pages", handler)
+        await publisher.start(channel)
+        await listener.start(channel)
+
+        await channel.publish("cache_invalidation", "não é json")
+        await publisher.invalidate("pages", unexpected=1)  # TypeError no handler
+        await publisher.invalidate("pages", user_id=None)  # erro do handler
+        await publisher.invalidate("pages", user_id=3)
+        await asyncio.sleep(0.01)
+
+        assert received == [3]
+        assert listener.shared
+
+        await publisher.stop()
+        await listener.stop()
+
+    asyncio.run(scenario())
+
+
+def test_without_pubsub_named_queries_are_invalidated_locally():
+    async def scenario():
+        bus = CacheBus()
+        bus.register("named_queries", NamedQueryRepository.invalidate_user)
+        await bus.start(LocalRedis())
+        assert not bus.shared
+
+        query_cache.set(("pricing.recent", 1, (1, 20)), {"success": True}, 60)
+        query_cache.set(("pricing.recent", 2, (2, 20)), {"success": True}, 60)
+
+        assert await bus.invalidate("named_queries", user_id=1, prefix="pricing.") == 1
+        assert query_cache.get(("pricing.recent", 2, (2, 20))) is not None
+        query_cache.invalidate()
+
+    asyncio.run(scenario())
+
+
+def test_local_redis_sweeps_keys_that_are_never_read_again():
+    async def scenario():
+        redis = LocalRedis(sweep_threshold=10)
+        for i in range(10):
+            await redis.set(f"revoked_token:{i}", "1", ex=0.01)
+        await asyncio.sleep(0.02)
+
+        await redis.set("rate_limit:1.2.3.4", 1, ex=60)
+        assert list(redis._data) == ["rate_limit:1.2.3.4"]
+        assert list(redis._expires) == ["rate_limit:1.2.3.4"]
+
+    asyncio.run(scenario())
+
+
+def test_subscriber_without_handle_cannot_be_instantiated():
+    class Incomplete(ChannelSubscriber):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("canal")
@@ -0,0 +1,34 @@
+import logging
+
+from app.d1_logging import QueryLogger, classify, redact_params
+
+
+def test_classify_query_kinds():
+    assert classify("  SELECT * FROM users") == "read"
+    assert classify("UPDATE users SET profile = 1 WHERE id = ?") == "write"
+    assert classify("CREATE TABLE IF NOT EXISTS t (id INTEGER)") == "ddl"
+    assert classify("WITH t(n) AS (SELECT 1) SELECT n FROM t") == "read"
+    assert classify("WITH t AS (SELECT ')') DELETE FROM users WHERE id IN (SELECT * FROM t)") == "write"
+
+
+def test_redacts_sensitive_columns_and_secret_values():
+    insert = "INSERT INTO users (email, password, name) VALUES (?, ?, ?)"
+    assert redact_params(insert, ["a@b.com", "hash", "Ana"]) == ["a@b.com", "***", "Ana"]
+
+    update = "UPDATE users SET password = ? WHERE id = ?"
+    assert redact_params(update, ["hash", 1]) == ["***", 1]
+
+    select = "SELECT * FROM users WHERE email = ?"
+    assert redact_params(select, ["$2b$12$abc"]) == ["***"]
+
+
+def test_sampling_off_still_logs_failures(caplog):
+    query_logger = QueryLogger({"read": "INFO"}, sample_rate=0)
+
+    with caplog.at_level(logging.DEBUG, logger=query_logger.logger.name):
+        query_logger.log("SELECT 1", [], 0.01, "ok", 1)
+        query_logger.log("SELECT 1", [], 0.01, "error", 0)
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].levelno == logging.WARNING
+    assert '"status": "error"' in caplog.records[0].getMessage()
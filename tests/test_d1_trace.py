@@ -0,0 +1,24 @@
+from app.d1_trace import current_trace, fingerprint, record_query, start_trace
+
+
+def test_fingerprint_normalizes_literals_and_whitespace():
+    a = fingerprint("SELECT *   FROM users\n WHERE id = 1 AND email = 'x@y.com'")
+    b = fingerprint("SELECT * FROM users WHERE id = 42 AND email = 'z@w.com'")
+    assert a == b == "SELECT * FROM users WHERE id = ? AND email = ?"
+
+    assert fingerprint("SELECT 1 FROM t WHERE id IN (?, ?, ?)") == fingerprint(
+        "SELECT 1 FROM t WHERE id IN (?,?)"
+    )
+
+
+def test_trace_records_queries_and_flags_repeats():
+    trace = start_trace()
+    record_query("SELECT * FROM users WHERE id = ?", 0.010, 1, True)
+    record_query("SELECT * FROM users WHERE id = ?", 0.020, 1, True)
+    record_query("INSERT INTO users (email) VALUES (?)", 0.030, 0, True)
+
+    assert current_trace() is trace
+    assert trace.count == 3
+    assert abs(trace.total_time - 0.060) < 1e-9
+    assert trace.repeated() == [("SELECT * FROM users WHERE id = ?", 2)]
+    assert "3 queries D1" in trace.summary()
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.utils.events import EventBroker, format_sse
+
+
+def test_local_fanout_only_reaches_user_connections():
+    async def scenario():
+        broker = EventBroker()
+        mine = broker.subscribe(1)
+        other = broker.subscribe(2)
+
+        await broker.publish(1, "calculation", {"id": 10})
+
+        assert mine.get_nowait() == ("calculation", {"id": 10})
+        assert other.empty()
+
+        broker.unsubscribe(1, mine)
+        broker.unsubscribe(2, other)
+        assert broker.connections == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_does_not_block_publish():
+    async def scenario():
+        broker = EventBroker(queue_size=1)
+        queue = broker.subscribe(1)
+
+        await broker.publish(1, "calculation", {"id": 1})
+        await broker.publish(1, "calculation", {"id": 2})
+
+        assert queue.qsize() == 1
+
+    asyncio.run(scenario())
+
+
+def test_sse_format():
+    assert format_sse("metrics", {"b": 3}) == 'event: metrics\ndata: {"b": 3}\n\n'
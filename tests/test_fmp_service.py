@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app.services.fmp_service import FMPService, FakeMarketDataProvider, MarketDataError, RateLimitedError
+
+
+def test_concurrent_requests_share_one_fetch():
+    async def scenario():
+        provider = FakeMarketDataProvider(latency=0.01)
+        service = FMPService(provider, persist=False)
+
+        results = await asyncio.gather(
+            *(service.get_daily_prices("abc", "2024-01-01", "2024-01-31") for _ in range(20))
+        )
+
+        assert provider.calls == 1
+        assert all(r is results[0] for r in results)
+
+        # Servido do cache dentro do TTL
+        await service.get_daily_prices("ABC", "2024-01-01", "2024-01-31")
+        assert provider.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_rate_limited_fetch_is_retried():
+    async def scenario():
+        provider = FakeMarketDataProvider(rate_limit_every=1)
+        service = FMPService(provider, persist=False, max_retries=2, backoff_base=0)
+
+        # Todas as chamadas falham com 429: esgota as tentativas
+        try:
+            await service.get_daily_prices("abc")
+            raised = False
+        except Exception:
+            raised = True
+
+        assert raised
+        assert provider.calls == 3
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_is_capped_and_backoff_frees_the_slot():
+    class ThrottledOnce(FakeMarketDataProvider):
+        async def fetch_daily(self, symbol, start_date, end_date):
+            if symbol == "SLOW" and self.calls == 0:
+                self.calls += 1
+                raise RateLimitedError(retry_after=3600)
+            return await super().fetch_daily(symbol, start_date, end_date)
+
+    async def scenario():
+        service = FMPService(ThrottledOnce(), persist=False, max_concurrency=1, max_backoff=0.2)
+
+        slow = asyncio.ensure_future(service.get_daily_prices("slow", "2024-01-01", "2024-01-31"))
+        await asyncio.sleep(0.01)
+        # A única vaga fica livre enquanto SLOW espera o backoff
+        other = await asyncio.wait_for(service.get_daily_prices("other", "2024-01-01", "2024-01-31"), 0.1)
+        assert other
+        assert await asyncio.wait_for(slow, 1)
+
+    asyncio.run(scenario())
+
+
+def test_cache_is_bounded():
+    async def scenario():
+        service = FMPService(FakeMarketDataProvider(), persist=False, cache_size=3)
+        for day in range(1, 10):
+            await service.get_daily_prices("abc", "2024-01-01", f"2024-01-{day:02d}")
+        assert len(service._cache) == 3
+
+    asyncio.run(scenario())
+
+
+def test_failed_write_through_is_not_cached(monkeypatch):
+    from app.repositories.prices import PricesQueryError, PricesRepository
+
+    writes = []
+
+    async def failing_upsert(bars):
+        writes.append(len(bars))
+        raise PricesQueryError("D1 indisponível")
+
+    monkeypatch.setattr(PricesRepository, "bulk_upsert", staticmethod(failing_upsert))
+
+    async def scenario():
+        provider = FakeMarketDataProvider()
+        service = FMPService(provider)
+        assert await service.get_daily_prices("abc", "2024-01-01", "2024-01-31")
+        assert await service.get_daily_prices("abc", "2024-01-01", "2024-01-31")
+        assert provider.calls == 2 and len(writes) == 2
+
+    asyncio.run(scenario())
+
+
+def test_get_many_reports_failed_symbols():
+    class Broken(FakeMarketDataProvider):
+        async def fetch_daily(self, symbol, start_date, end_date):
+            if symbol == "BAD":
+                raise RuntimeError("HTTP 500")
+            return await super().fetch_daily(symbol, start_date, end_date)
+
+    async def scenario():
+        service = FMPService(Broken(), persist=False)
+        with pytest.raises(MarketDataError) as error:
+            await service.get_many(["ok", "bad"], "2024-01-01", "2024-01-31")
+        assert error.value.symbols == ["BAD"]
+
+    asyncio.run(scenario())
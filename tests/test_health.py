@@ -5,7 +5,7 @@ from app.main import app
 client = TestClient(app)
 
 def test_health_check():
-    response = client.get("/health")
+    response = client.get("/api/health")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
@@ -0,0 +1,84 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.http_cache import (
+    CachedStaticFiles, CompressionMiddleware, ConditionalGetMiddleware,
+    etag_matches, static_url, strip_encoding_suffix
+)
+
+PAYLOAD = {"items": [{"id": i, "name": f"produto {i}"} for i in range(100)]}
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(ConditionalGetMiddleware)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    app.mount("/static", CachedStaticFiles(directory="app/static"), name="static")
+
+    @app.get("/data")
+    async def data():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_json_is_compressed_and_revalidated():
+    client = _client()
+
+    response = client.get("/data", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == PAYLOAD
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    not_modified = client.get("/data", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+
+def test_small_and_unaccepted_responses_are_not_compressed():
+    client = _client()
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/data", headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+
+def test_versioned_static_urls_are_immutable():
+    client = _client()
+    url = static_url("css/style.css")
+    assert "?v=" in url
+
+    versioned = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert "immutable" in versioned.headers["cache-control"]
+    assert versioned.headers["content-encoding"] == "gzip"
+
+    plain = client.get("/static/css/style.css", headers={"Accept-Encoding": "gzip"})
+    assert plain.headers["cache-control"] == "no-cache"
+    revalidated = client.get(
+        "/static/css/style.css",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == plain.headers["etag"]
+
+
+def test_uncompressed_small_body_keeps_the_same_etag_on_304():
+    client = _client()
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    revalidated = client.get("/small", headers={"Accept-Encoding": "gzip", "If-None-Match": small.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == small.headers["etag"]
+
+
+def test_etag_helpers():
+    assert strip_encoding_suffix('"abc-gzip", W/"def-br"') == '"abc", W/"def"'
+    assert etag_matches('W/"abc", "xyz"', '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
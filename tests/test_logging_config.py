@@ -0,0 +1,31 @@
+import json
+import logging
+import queue
+
+from app.logging_config import BoundedQueueHandler, JsonFormatter
+
+
+def _record(level: int, msg: str = "x") -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+def test_low_priority_records_dropped_above_high_water():
+    log_queue: queue.Queue = queue.Queue(maxsize=10)
+    handler = BoundedQueueHandler(log_queue, high_water=0.5)
+
+    for _ in range(8):
+        handler.emit(_record(logging.INFO))
+    assert log_queue.qsize() == 5
+
+    # Avisos e erros ainda entram até a fila encher
+    for _ in range(8):
+        handler.emit(_record(logging.ERROR))
+    assert log_queue.qsize() == 10
+
+
+def test_json_formatter_outputs_one_object_per_record():
+    line = JsonFormatter().format(_record(logging.WARNING, "olá"))
+    entry = json.loads(line)
+    assert entry["level"] == "WARNING"
+    assert entry["msg"] == "olá"
+    assert entry["logger"] == "test"
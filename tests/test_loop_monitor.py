@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+from app.loop_monitor import LoopMonitor
+from app.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+
+def _blocking_call(seconds):
+    time.sleep(seconds)
+
+
+def test_monitor_records_lag_and_blocking_stack():
+    monitor = LoopMonitor(interval=0.02, stall_threshold=0.05)
+    lag_samples = EVENT_LOOP_LAG.count()
+    stalls = EVENT_LOOP_STALLS.value()
+
+    async def scenario():
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        _blocking_call(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert not monitor.running
+    assert EVENT_LOOP_LAG.count() > lag_samples
+    assert EVENT_LOOP_STALLS.value() == stalls + 1
+
+    stall = monitor.stalls[-1]
+    assert stall["blocked_ms"] >= 150
+    assert any("_blocking_call" in line for line in stall["stack"])
@@ -0,0 +1,72 @@
+from app.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latência", ("route",), buckets=(0.1, 1.0))
+
+    latency.observe(0.05, "/a")
+    latency.observe(0.5, "/a")
+    latency.observe(5.0, "/a")
+
+    text = registry.render()
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_counter_and_gauge_with_escaped_labels():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits_total", "Acertos", ("cache",))
+    in_flight = registry.gauge("in_flight", "Em andamento")
+
+    hits.inc('a"b')
+    hits.inc('a"b', amount=2)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    text = registry.render()
+    assert 'hits_total{cache="a\\"b"} 3' in text
+    assert 'in_flight 1' in text
+
+
+def test_constant_labels_and_thread_safe_counter():
+    import threading
+
+    registry = MetricsRegistry()
+    dropped = registry.counter("dropped_total", "Descartados", ("level",), thread_safe=True)
+    latency = registry.histogram("lat_seconds", "Latência", buckets=(1.0,))
+
+    def hammer():
+        for _ in range(1000):
+            dropped.inc("INFO")
+
+    threads = [threading.Thread(target=hammer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latency.observe(0.5)
+
+    text = registry.render({"worker": "42"})
+    assert 'dropped_total{level="INFO",worker="42"} 4000' in text
+    assert 'lat_seconds_bucket{worker="42",le="1.0"} 1' in text
+    assert 'lat_seconds_count{worker="42"} 1' in text
+
+
+def test_metrics_endpoint_requires_token_or_loopback(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.config import settings
+    from app.main import app
+
+    client = TestClient(app)
+    assert client.get("/metrics").status_code == 404  # cliente "testclient", não loopback
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "segredo")
+    assert client.get("/metrics", headers={"Authorization": "Bearer errado"}).status_code == 404
+    response = client.get("/metrics", headers={"Authorization": "Bearer segredo"})
+    assert response.status_code == 200 and 'worker="' in response.text
@@ -0,0 +1,56 @@
+import asyncio
+import sqlite3
+
+from app import migrations
+
+
+class FakeD1:
+    """execute_sql sobre SQLite em memória, no formato de retorno do D1Client"""
+
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+        self.statements = []
+
+    async def execute_sql(self, sql, params=None):
+        # Cede o loop como uma chamada HTTP real: workers concorrentes intercalam
+        await asyncio.sleep(0)
+        self.statements.append(sql)
+        try:
+            cursor = self.conn.execute(sql, params or [])
+        except sqlite3.Error as e:
+            return {"success": False, "error": str(e)}
+        rows = [dict(row) for row in cursor.fetchall()]
+        self.conn.commit()
+        return {"success": True, "results": rows, "meta": {"last_row_id": cursor.lastrowid}}
+
+
+def test_migrate_applies_once_then_single_check(monkeypatch):
+    fake = FakeD1()
+    monkeypatch.setattr(migrations, "execute_sql", fake.execute_sql)
+
+    assert asyncio.run(migrations.migrate()) == migrations.LATEST_VERSION
+
+    indexes = {
+        row["name"] for row in
+        fake.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+    }
+    assert {"idx_pricing_data_user_created", "idx_competitive_analysis_user", "idx_webhook_logs_created"} <= indexes
+    assert fake.conn.execute("SELECT COUNT(*) FROM users WHERE profile = 2").fetchone()[0] == 1
+
+    # Segundo boot: apenas a consulta de versão
+    fake.statements.clear()
+    assert asyncio.run(migrations.migrate()) == migrations.LATEST_VERSION
+    assert len(fake.statements) == 1
+
+
+def test_concurrent_workers_converge(monkeypatch):
+    fake = FakeD1()
+    monkeypatch.setattr(migrations, "execute_sql", fake.execute_sql)
+
+    async def boot_workers():
+        return await asyncio.gather(*(migrations.migrate() for _ in range(3)))
+
+    assert asyncio.run(boot_workers()) == [migrations.LATEST_VERSION] * 3
+    assert fake.conn.execute("SELECT COUNT(*) FROM users WHERE profile = 2").fetchone()[0] == 1
+    assert fake.conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == len(migrations.MIGRATIONS)
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.repositories import named_queries as nq_module
+from app.repositories.named_queries import (
+    NAMED_QUERIES, NamedQueryRepository, QueryParamError, query_cache
+)
+
+
+def _fake_execute(calls):
+    async def execute_sql(sql, params=None, coalesce=False):
+        calls.append((sql, params))
+        return {"success": True, "results": [{"id": 1}]}
+    return execute_sql
+
+
+def test_bind_scopes_user_and_validates_params():
+    query = NAMED_QUERIES["pricing.recent"]
+
+    assert NamedQueryRepository.bind(query, 7, {}) == [7, 5]
+    assert NamedQueryRepository.bind(query, 7, {"limit": "10"}) == [7, 10]
+
+    with pytest.raises(QueryParamError):
+        NamedQueryRepository.bind(query, 7, {"limit": 1000})
+    with pytest.raises(QueryParamError):
+        NamedQueryRepository.bind(query, 7, {"user_id": 1})
+    with pytest.raises(QueryParamError):
+        NamedQueryRepository.bind(query, 7, {"limit": float("inf")})
+
+    assert NamedQueryRepository.bind(NAMED_QUERIES["prices.latest"], 7, {"symbol": "petr4"}) == ["PETR4"]
+
+
+def test_run_executes_once_and_caches_per_user(monkeypatch):
+    calls = []
+    monkeypatch.setattr(nq_module, "execute_sql", _fake_execute(calls))
+    query_cache.invalidate()
+
+    async def scenario():
+        first = await NamedQueryRepository.run("pricing.recent", 1, {})
+        second = await NamedQueryRepository.run("pricing.recent", 1, {})
+        other_user = await NamedQueryRepository.run("pricing.recent", 2, {})
+        return first, second, other_user
+
+    first, second, _ = asyncio.run(scenario())
+
+    assert first == second == {"success": True, "results": [{"id": 1}]}
+    assert len(calls) == 2
+
+    assert NamedQueryRepository.invalidate_user(1, "pricing.") == 1
+    asyncio.run(NamedQueryRepository.run("pricing.recent", 1, {}))
+    assert len(calls) == 3
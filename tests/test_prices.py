@@ -0,0 +1,97 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.repositories import prices as prices_module
+from app.repositories.prices import PricesQueryError, PricesRepository, RANGE_BATCH_SIZE, UPSERT_BATCH_SIZE
+from app.services.price_analytics import PriceAnalyticsService
+
+
+def test_moving_average_and_returns():
+    close = np.array([10.0, 11.0, 12.0, 13.0, 14.0])
+
+    ma = PriceAnalyticsService.moving_average(close, 3)
+    assert np.isnan(ma[:2]).all()
+    assert np.allclose(ma[2:], [11.0, 12.0, 13.0])
+
+    returns = PriceAnalyticsService.returns(close)
+    assert np.isnan(returns[0])
+    assert np.isclose(returns[1], 0.1)
+
+
+def test_rolling_volatility_matches_naive():
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 60)))
+    window = 10
+
+    vol = PriceAnalyticsService.rolling_volatility(close, window, annualize=False)
+    log_returns = np.diff(np.log(close))
+    expected = log_returns[-window:].std(ddof=1)
+
+    assert np.isnan(vol[:window]).all()
+    assert np.isclose(vol[-1], expected)
+
+
+def test_summarize_is_json_safe():
+    rows = [{"date": f"2024-01-0{i}", "close": 10.0 + i} for i in range(1, 6)]
+    summary = PriceAnalyticsService.summarize(rows, window=3)
+
+    assert summary["indicators"]["moving_average"][:2] == [None, None]
+    assert summary["stats"]["last_close"] == 15.0
+
+
+def test_bulk_upsert_batches_statements(monkeypatch):
+    calls = []
+
+    async def fake_execute_sql(sql, params=None):
+        calls.append((sql, params))
+        return {"success": True, "results": []}
+
+    monkeypatch.setattr(prices_module, "execute_sql", fake_execute_sql)
+
+    bars = [
+        {"symbol": "abc", "date": f"2024-01-{i:02d}", "close": i, "volume": 100}
+        for i in range(1, UPSERT_BATCH_SIZE + 6)
+    ]
+    written = asyncio.run(PricesRepository.bulk_upsert(bars))
+
+    assert written == len(bars)
+    assert len(calls) == 2
+    assert all(len(params) <= 100 for _, params in calls)
+    assert calls[0][1][0] == "ABC"
+
+    async def second_batch_fails(sql, params=None):
+        calls.append((sql, params))
+        return {"success": len(calls) % 2 == 1, "error": "D1 indisponível"}
+
+    calls.clear()
+    monkeypatch.setattr(prices_module, "execute_sql", second_batch_fails)
+    with pytest.raises(PricesQueryError, match="ABC"):
+        asyncio.run(PricesRepository.bulk_upsert(bars))
+    assert len(calls) == 2
+
+
+def test_get_ranges_batches_symbols_and_surfaces_failures(monkeypatch):
+    calls = []
+
+    async def fake_execute_sql(sql, params=None, coalesce=False):
+        calls.append(params)
+        return {"success": True, "results": [{"symbol": params[0], "date": "2024-01-02", "close": 1.0}]}
+
+    monkeypatch.setattr(prices_module, "execute_sql", fake_execute_sql)
+
+    symbols = [f"s{i}" for i in range(RANGE_BATCH_SIZE + 5)]
+    ranges = asyncio.run(PricesRepository.get_ranges(symbols, "2024-01-01", "2024-12-31"))
+
+    assert len(calls) == 2
+    assert all(len(params) <= 100 for params in calls)
+    assert calls[1][-2:] == ["2024-01-01", "2024-12-31"]
+    assert len(ranges) == len(symbols) and ranges["S0"][0]["close"] == 1.0
+
+    async def failing_execute_sql(sql, params=None, coalesce=False):
+        return {"success": False, "error": "too many SQL variables"}
+
+    monkeypatch.setattr(prices_module, "execute_sql", failing_execute_sql)
+    with pytest.raises(PricesQueryError):
+        asyncio.run(PricesRepository.get_ranges(["abc"]))
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app import profiling
+from app.config import settings
+from app.main import app
+from app.services.auth import create_access_token
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_cpu_profile_captures_loop_stacks():
+    async def scenario():
+        async def blocker():
+            await asyncio.sleep(0.02)
+            _busy(0.1)
+
+        task = asyncio.create_task(blocker())
+        profiler = await profiling.profile_cpu(0.2, interval=0.002)
+        await task
+        return profiler
+
+    profiler = asyncio.run(scenario())
+    assert profiler.samples > 0
+    assert any("_busy" in stack for stack in profiler.stacks)
+    assert profiling.folded(profiler.stacks).splitlines()[0].rsplit(" ", 1)[1].isdigit()
+
+
+def test_loop_profile_reports_slow_callbacks():
+    async def scenario():
+        async def blocker():
+            await asyncio.sleep(0.02)
+            _busy(0.06)
+
+        task = asyncio.create_task(blocker())
+        result = await profiling.profile_loop(0.15, slow_callback=0.03)
+        await task
+        return result, asyncio.get_running_loop().get_debug()
+
+    result, debug_after = asyncio.run(scenario())
+    assert result["lag_ms"]["max"] >= 30
+    assert any("blocker" in message for message in result["slow_callbacks"])
+    assert debug_after is False
+
+
+def test_memory_profile_reports_allocations():
+    kept = []
+
+    async def scenario():
+        async def allocate():
+            await asyncio.sleep(0.01)
+            kept.append([bytearray(1024) for _ in range(200)])
+
+        task = asyncio.create_task(allocate())
+        result = await profiling.profile_memory(0.05)
+        await task
+        return result
+
+    result = asyncio.run(scenario())
+    assert any("test_profiling.py" in line["location"] for line in result["top"])
+    assert result["stacks"]
+
+
+def test_profile_endpoints_require_admin_and_opt_in(monkeypatch):
+    client = TestClient(app)
+    user = create_access_token({"sub": "user@meucfo.ai", "user_id": 10, "is_admin": False})
+    admin = create_access_token({"sub": "admin@meucfo.ai", "user_id": 1, "is_admin": True})
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    response = client.get("/api/admin/profile/loop?seconds=0.5", headers={"Authorization": f"Bearer {user}"})
+    assert response.status_code == 403
+
+    response = client.get("/api/admin/profile/cpu?seconds=0.5", headers={"Authorization": f"Bearer {admin}"})
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    response = client.get("/api/admin/profile/loop?seconds=0.5", headers={"Authorization": f"Bearer {admin}"})
+    assert response.status_code == 404
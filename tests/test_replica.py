@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app import d1_client as d1_module
+from app.config import settings
+from app.migrations import migrate
+from app.replica import read_replica
+from app.repositories.users import UserRepository
+from app.utils.local_d1 import LocalD1Client
+
+
+class _Unreachable:
+    async def execute(self, sql, params=None):
+        raise AssertionError(f"leitura foi ao D1: {sql}")
+
+
+@pytest.fixture
+def d1(monkeypatch):
+    client = LocalD1Client()
+    monkeypatch.setattr(d1_module, "d1_client", client)
+    asyncio.run(migrate())
+    return client
+
+
+def _insert_user(d1, email, profile=0):
+    d1.conn.execute(
+        "INSERT INTO users (email, password, name, phone, type, profile, document) "
+        "VALUES (?, 'x', 'Novo', '', 'PF', ?, '')",
+        [email, profile]
+    )
+    d1.conn.commit()
+
+
+def test_changes_are_pulled_by_version_and_tombstone(d1, monkeypatch):
+    async def scenario():
+        await read_replica.start(refresh_interval=3600)
+        try:
+            _insert_user(d1, "novo@meucfo.ai")
+            assert read_replica.lookup("users", "email", "novo@meucfo.ai") is None
+
+            assert await read_replica.sync("users") == 1
+            row = read_replica.lookup("users", "email", "novo@meucfo.ai")
+            assert row["name"] == "Novo"
+
+            d1.conn.execute("UPDATE users SET name = 'Renomeado' WHERE id = ?", [row["id"]])
+            d1.conn.execute("DELETE FROM users WHERE email = ?", [settings.APP_ADMIN_MAIL])
+            d1.conn.commit()
+            await read_replica.sync("users")
+
+            assert read_replica.lookup("users", "id", row["id"])["name"] == "Renomeado"
+            assert read_replica.lookup("users", "email", settings.APP_ADMIN_MAIL) is None
+
+            # Linhas presentes na réplica não vão ao D1
+            monkeypatch.setattr(d1_module, "d1_client", _Unreachable())
+            user = await UserRepository.get_by_email("novo@meucfo.ai")
+            assert user.name == "Renomeado" and await UserRepository.email_exists("novo@meucfo.ai")
+        finally:
+            await read_replica.stop()
+
+    asyncio.run(scenario())
+
+
+def test_writes_invalidate_and_stale_replica_falls_back(d1, monkeypatch):
+    async def scenario():
+        _insert_user(d1, "pendente@meucfo.ai", profile=0)
+        await read_replica.start(refresh_interval=3600)
+        try:
+            user_id = read_replica.lookup("users", "email", "pendente@meucfo.ai")["id"]
+
+            assert await UserRepository.approve_users([user_id]) == 1
+            assert read_replica.lookup("users", "id", user_id) is None
+            assert (await UserRepository.get_by_id(user_id)).profile == 1
+
+            monkeypatch.setattr(settings, "REPLICA_MAX_STALENESS", 0.0)
+            assert read_replica.lookup("users", "email", settings.APP_ADMIN_MAIL) is None
+        finally:
+            await read_replica.stop()
+
+    asyncio.run(scenario())
+
+
+def test_old_tombstones_are_pruned_and_lagging_replica_resnapshots(d1):
+    async def scenario():
+        _insert_user(d1, "antigo@meucfo.ai")
+        _insert_user(d1, "recente@meucfo.ai")
+        await read_replica.start(refresh_interval=3600)
+        try:
+            assert read_replica.lookup("users", "email", "antigo@meucfo.ai") is not None
+            behind = read_replica.versions["users"]
+
+            # Exclusão antiga (fora da retenção) seguida de uma nova
+            d1.conn.execute("DELETE FROM users WHERE email = 'antigo@meucfo.ai'")
+            d1.conn.execute("UPDATE replica_tombstones SET deleted_at = 0")
+            d1.conn.execute("DELETE FROM users WHERE email = 'recente@meucfo.ai'")
+            d1.conn.commit()
+
+            tombstones = d1.conn.execute("SELECT COUNT(*) FROM replica_tombstones").fetchone()[0]
+            pruned = d1.conn.execute("SELECT pruned_version FROM replica_clock").fetchone()[0]
+            assert tombstones == 1 and pruned > behind
+
+            # O pull perderia a exclusão antiga: a réplica é copiada de novo
+            await read_replica.sync("users")
+            assert read_replica.lookup("users", "email", "antigo@meucfo.ai") is None
+            assert read_replica.lookup("users", "email", "recente@meucfo.ai") is None
+            assert read_replica.lookup("users", "email", settings.APP_ADMIN_MAIL) is not None
+        finally:
+            await read_replica.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.d1_client import D1Client
+from app.metrics import CIRCUIT_BREAKER_STATE, D1_HEDGED_READS, D1_RETRIES
+from app.resilience import CircuitBreaker, deadline, remaining
+
+OK_BODY = {"success": True, "result": [{"success": True, "results": [{"id": 1}], "meta": {}}]}
+
+
+@pytest.fixture(autouse=True)
+def fast_resilience(monkeypatch):
+    monkeypatch.setattr(settings, "D1_RETRY_BACKOFF", 0.001)
+    monkeypatch.setattr(settings, "D1_READ_RETRIES", 2)
+    monkeypatch.setattr(settings, "D1_HEDGE_AFTER", 0.0)
+
+
+def scripted_client(statuses, delays=None):
+    """D1Client cujo transporte responde com os status (e atrasos) na ordem dada"""
+    calls = []
+
+    async def respond(request):
+        index = len(calls)
+        calls.append(request)
+        if delays:
+            await asyncio.sleep(delays[min(index, len(delays) - 1)])
+        status = statuses[min(index, len(statuses) - 1)]
+        return httpx.Response(status, json=OK_BODY if status == 200 else {"success": False})
+
+    return D1Client(transport=httpx.MockTransport(respond)), calls
+
+
+def test_reads_retry_transient_errors_and_writes_do_not():
+    retries = D1_RETRIES.value()
+
+    client, calls = scripted_client([503, 429, 200])
+    result = asyncio.run(client.execute("SELECT id FROM users"))
+    assert result["results"] == [{"id": 1}]
+    assert len(calls) == 3
+    assert D1_RETRIES.value() == retries + 2
+
+    client, calls = scripted_client([503, 200])
+    result = asyncio.run(client.execute("INSERT INTO users (email) VALUES (?)", ["a@b.c"]))
+    assert result["success"] is False
+    assert len(calls) == 1
+
+
+
+def test_cte_writes_are_never_retried_hedged_or_coalesced(monkeypatch):
+    from app import d1_client as d1_module
+
+    sql = "WITH pending AS (SELECT id FROM users WHERE profile = 0) INSERT INTO audit (user_id) SELECT id FROM pending"
+    client, calls = scripted_client([503, 200], delays=[0.05, 0.0])
+    result = asyncio.run(client.execute(sql))
+    assert result["success"] is False
+    assert len(calls) == 1
+
+    client, calls = scripted_client([200], delays=[0.05])
+    monkeypatch.setattr(d1_module, "d1_client", client)
+
+    async def concurrent():
+        return await asyncio.gather(*(d1_module.execute_sql(sql, coalesce=True) for _ in range(3)))
+
+    asyncio.run(concurrent())
+    assert len(calls) == 3
+
+def test_breaker_fails_fast_then_recovers_through_half_open(monkeypatch):
+    monkeypatch.setattr(settings, "D1_READ_RETRIES", 0)
+    client, calls = scripted_client([500, 500, 200])
+    client.breaker = CircuitBreaker("d1_test", failure_threshold=2, recovery_time=0.05)
+
+    for _ in range(2):
+        asyncio.run(client.execute("SELECT 1"))
+    assert client.breaker.state == CircuitBreaker.OPEN
+    assert CIRCUIT_BREAKER_STATE.value("d1_test") == 2
+
+    result = asyncio.run(client.execute("SELECT 1"))
+    assert "circuito aberto" in result["error"]
+    assert len(calls) == 2
+
+    time.sleep(0.06)
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert asyncio.run(client.execute("SELECT 1"))["success"] is True
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    assert CIRCUIT_BREAKER_STATE.value("d1_test") == 0
+
+
+def test_slow_read_is_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "D1_HEDGE_AFTER", 0.05)
+    hedges = D1_HEDGED_READS.value()
+    client, calls = scripted_client([200], delays=[1.0, 0.0])
+
+    start = time.perf_counter()
+    result = asyncio.run(client.execute("SELECT id FROM users"))
+    assert result["success"] is True
+    assert time.perf_counter() - start < 0.5
+    assert len(calls) == 2
+    assert D1_HEDGED_READS.value() == hedges + 1
+
+
+def test_exhausted_deadline_skips_the_call():
+    client, calls = scripted_client([200])
+
+    async def scenario():
+        with deadline(10):
+            with deadline(0):
+                assert remaining() <= 0
+                return await client.execute("SELECT 1")
+
+    result = asyncio.run(scenario())
+    assert result["success"] is False
+    assert calls == []
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retry_after_is_capped_and_deadline_bounds_the_whole_call(monkeypatch):
+    monkeypatch.setattr(settings, "D1_RETRY_BACKOFF_MAX", 0.01)
+    calls = []
+
+    async def throttled(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "3600"}, json={"success": False})
+        return httpx.Response(200, json=OK_BODY)
+
+    client = D1Client(transport=httpx.MockTransport(throttled))
+    start = time.perf_counter()
+    assert asyncio.run(client.execute("SELECT 1"))["success"] is True
+    assert time.perf_counter() - start < 0.5
+
+    # Resposta que não termina: o prazo corta a chamada inteira, não só cada fase
+    client, calls = scripted_client([200], delays=[5.0])
+
+    async def scenario():
+        with deadline(0.1):
+            return await client.execute("SELECT 1")
+
+    start = time.perf_counter()
+    result = asyncio.run(scenario())
+    assert result["success"] is False and "Timeout" in result["error"]
+    assert time.perf_counter() - start < 0.5
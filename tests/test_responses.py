@@ -0,0 +1,28 @@
+import json
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+from app import responses
+from app.responses import FastJSONResponse
+
+
+class _Item(BaseModel):
+    name: str
+    price: float
+
+
+def test_model_is_serialized_directly():
+    body = FastJSONResponse(_Item(name="café", price=9.5)).body
+    assert json.loads(body) == {"name": "café", "price": 9.5}
+
+
+def test_nested_models_and_extra_types(monkeypatch):
+    payload = {"items": [_Item(name="a", price=1.0)], "total": Decimal("1.5"), 1: "x"}
+    expected = {"items": [{"name": "a", "price": 1.0}], "total": 1.5, "1": "x"}
+
+    assert json.loads(FastJSONResponse(payload).body) == expected
+
+    # Sem orjson, cai para o json da stdlib com o mesmo resultado
+    monkeypatch.setattr(responses, "orjson", None)
+    assert json.loads(FastJSONResponse(payload).body) == expected
@@ -0,0 +1,32 @@
+from app.models.user import UserResponse
+from app.repositories.rows import Row, UserRow
+
+
+def test_row_fields_follow_slots_across_subclasses():
+    class Base(Row):
+        __slots__ = ("id",)
+
+    class Child(Base):
+        __slots__ = ("name",)
+
+    assert Child.FIELDS == ("id", "name")
+    assert Child.columns() == "id, name"
+
+    row = Child.from_row({"id": 1, "name": "a", "ignored": True})
+    assert row.as_dict() == {"id": 1, "name": "a"}
+    assert not hasattr(row, "__dict__")
+
+
+def test_user_row_validates_at_api_boundary():
+    data = {
+        "id": 3, "email": "ana@meucfo.ai", "password": "hash", "profile": 2, "name": "Ana",
+        "phone": "1", "document": "", "type": "PF", "created_at": "2024-05-01 12:00:00"
+    }
+    row = UserRow.first({"success": True, "results": [data]})
+
+    assert row.is_admin and row.is_approved
+    assert "address" not in UserRow.columns()
+    assert UserRow.first({"success": True, "results": []}) is None
+
+    response = UserResponse.model_validate(row)
+    assert response.id == 3 and response.created_at.year == 2024
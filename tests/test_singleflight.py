@@ -0,0 +1,71 @@
+import asyncio
+
+from app import d1_client as d1_module
+
+
+def _counting_execute(monkeypatch):
+    calls = []
+
+    async def fake_execute(sql, params=None):
+        calls.append((sql, params))
+        await asyncio.sleep(0.01)
+        return {"success": True, "results": [{"id": 1}]}
+
+    monkeypatch.setattr(d1_module.d1_client, "execute", fake_execute)
+    return calls
+
+
+def test_identical_concurrent_reads_share_one_call(monkeypatch):
+    calls = _counting_execute(monkeypatch)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(d1_module.execute_sql("SELECT * FROM users WHERE id = ?", [1], coalesce=True) for _ in range(10)),
+            d1_module.execute_sql("SELECT * FROM users WHERE id = ?", [2], coalesce=True),
+        )
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert all(r is results[0] for r in results[:10])
+
+
+def test_reads_without_opt_in_and_writes_are_never_merged(monkeypatch):
+    calls = _counting_execute(monkeypatch)
+
+    async def scenario():
+        await asyncio.gather(
+            *(d1_module.execute_sql("SELECT * FROM users WHERE id = ?", [1]) for _ in range(3)),
+            *(d1_module.execute_sql("UPDATE users SET profile = 1 WHERE id = ?", [1], coalesce=True) for _ in range(3)),
+        )
+
+    asyncio.run(scenario())
+    assert len(calls) == 6
+
+
+def test_shared_read_ignores_leader_deadline_and_is_traced_per_caller(monkeypatch):
+    from app.d1_trace import start_trace
+    from app.resilience import deadline, remaining
+
+    budgets = []
+
+    async def fake_execute(sql, params=None):
+        budgets.append(remaining())
+        await asyncio.sleep(0.05)
+        return {"success": True, "results": [{"id": 1}]}
+
+    monkeypatch.setattr(d1_module.d1_client, "execute", fake_execute)
+    sql = "SELECT * FROM users WHERE id = ?"
+
+    async def caller(seconds):
+        trace = start_trace()
+        with deadline(seconds):
+            result = await d1_module.execute_sql(sql, [1], coalesce=True)
+        return result, trace
+
+    async def scenario():
+        return await asyncio.gather(caller(0.01), caller(5))
+
+    (leader, leader_trace), (joiner, joiner_trace) = asyncio.run(scenario())
+    assert len(budgets) == 1 and budgets[0] > 1
+    assert leader["success"] is False and joiner["success"] is True
+    assert leader_trace.count == 1 and joiner_trace.count == 1
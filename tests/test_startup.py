@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+
+def test_heavy_dependencies_are_not_imported_at_boot():
+    code = (
+        "import sys, app.main\n"
+        "heavy = ['jinja2', 'passlib', 'jose', 'httpx', 'numpy', 'redis']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ""
+
+
+def test_templates_are_shared():
+    from app.templating import get_templates
+
+    assert get_templates() is get_templates()
+
+
+def test_rendered_pages_are_cached(monkeypatch):
+    from fastapi.testclient import TestClient
+    from jinja2 import Template
+
+    from app import templating
+    from app.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "PAGE_CACHE_TTL", 60)
+    templating.clear_page_cache()
+
+    renders = []
+    original_render = Template.render
+
+    def counting_render(self, *args, **kwargs):
+        renders.append(self.name)
+        return original_render(self, *args, **kwargs)
+
+    monkeypatch.setattr(Template, "render", counting_render)
+
+    client = TestClient(app)
+    first = client.get("/dashboard")
+    second = client.get("/dashboard")
+
+    assert first.status_code == second.status_code == 200
+    assert first.text == second.text
+    assert renders == ["dashboard.html"]
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app import d1_client as d1_module
+from app.migrations import migrate
+from app.repositories.users import UserRepository, UsersQueryError
+from app.utils.local_d1 import LocalD1Client
+
+
+@pytest.fixture
+def d1(monkeypatch):
+    client = LocalD1Client()
+    monkeypatch.setattr(d1_module, "d1_client", client)
+    asyncio.run(migrate())
+    client.conn.executemany(
+        "INSERT INTO users (email, password, name, phone, type, profile, document) VALUES (?, 'x', ?, '', 'PF', ?, '')",
+        [(f"user{i:03d}@meucfo.ai", f"Usuário {i}", 0 if i % 2 else 1) for i in range(250)]
+    )
+    client.conn.commit()
+    return client
+
+
+def _all_pages(**kwargs):
+    async def collect():
+        seen, cursor = [], None
+        while True:
+            rows, cursor = await UserRepository.list_users(cursor=cursor, **kwargs)
+            seen.extend(rows)
+            if cursor is None:
+                return seen
+    return asyncio.run(collect())
+
+
+def test_keyset_pages_cover_all_users_without_password(d1):
+    users = _all_pages(limit=40)
+
+    assert len(users) == 251  # + admin
+    assert [u["id"] for u in users] == sorted((u["id"] for u in users), reverse=True)
+    assert "password" not in users[0]
+
+    pending = _all_pages(limit=40, pending_only=True)
+    assert len(pending) == 125 and all(u["profile"] == 0 for u in pending)
+
+
+def test_email_prefix_search_uses_index(d1):
+    users = _all_pages(limit=3, email_prefix="user01")
+    assert [u["email"] for u in users] == [f"user{i:03d}@meucfo.ai" for i in range(10, 20)]
+
+    plan = " ".join(row[3] for row in d1.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM users WHERE email >= ? AND email < ? ORDER BY email",
+        ["user01", "user01\U0010ffff"]
+    ))
+    assert "INDEX" in plan and "(email>? AND email<?)" in plan
+
+
+def test_invalid_cursor_is_rejected(d1):
+    with pytest.raises(ValueError):
+        asyncio.run(UserRepository.list_users(cursor="not-a-cursor"))
+
+
+def test_bulk_approve_and_reject(d1):
+    pending_ids = [row[0] for row in d1.conn.execute("SELECT id FROM users WHERE profile = 0")]
+    admin_id = d1.conn.execute("SELECT id FROM users WHERE profile = 2").fetchone()[0]
+
+    assert asyncio.run(UserRepository.approve_users(pending_ids + pending_ids[:5])) == 125
+    assert d1.conn.execute("SELECT COUNT(*) FROM users WHERE profile = 0").fetchone()[0] == 0
+
+    assert asyncio.run(UserRepository.reject_users(pending_ids[:110] + [admin_id])) == 110
+    assert d1.conn.execute("SELECT COUNT(*) FROM users WHERE profile = 2").fetchone()[0] == 1
+
+
+def test_d1_failures_are_raised_not_reported_as_empty(d1, monkeypatch):
+    async def failing(sql, params=None, **kwargs):
+        return {"success": False, "error": "D1 indisponível"}
+
+    monkeypatch.setattr("app.repositories.users.execute_sql", failing)
+
+    with pytest.raises(UsersQueryError):
+        asyncio.run(UserRepository.list_users())
+    with pytest.raises(UsersQueryError):
+        asyncio.run(UserRepository.approve_users([1, 2]))
+    with pytest.raises(UsersQueryError):
+        asyncio.run(UserRepository.reject_user(1))